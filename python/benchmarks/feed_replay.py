@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Feed replay benchmark for the Cloze SDK.
+
+Iterates People.iter_feed() against a recorded cassette and reports the
+client-side CPU time and peak memory, so parsing and pagination regressions
+can be measured offline and reproducibly. Record the cassette once against
+the live API with CLOZE_API_KEY set.
+
+Usage:
+    python benchmarks/feed_replay.py CASSETTE --record [--pagesize N]
+    python benchmarks/feed_replay.py CASSETTE [--runs N] [--latency-scale X] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cloze_sdk import CassetteAdapter, ClozeClient  # noqa: E402
+
+
+def iterate_feed(client: ClozeClient, pagesize: int) -> int:
+    """Iterate the whole feed and return the number of records."""
+    return sum(1 for _ in client.people.iter_feed(pagesize=pagesize))
+
+
+def run_once(path: str, latency_scale: float, pagesize: int) -> tuple:
+    """Replay the cassette once and return (records, cpu_ms, wall_ms, peak_kib)."""
+    client = ClozeClient(
+        api_key="benchmark",
+        adapter=CassetteAdapter(path, latency_scale=latency_scale),
+    )
+    tracemalloc.start()
+    cpu, wall = time.process_time(), time.perf_counter()
+    records = iterate_feed(client, pagesize)
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return records, cpu * 1000, wall * 1000, peak / 1024
+
+
+def main() -> int:
+    """Record a cassette or run the benchmark and report median figures."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("cassette", help="cassette file (.gz to compress)")
+    parser.add_argument("--record", action="store_true", help="record from the live API")
+    parser.add_argument("--pagesize", type=int, default=100, help="feed page size")
+    parser.add_argument("--runs", type=int, default=5, help="replays to run")
+    parser.add_argument(
+        "--latency-scale", type=float, default=0.0, help="recorded latency multiplier"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON for CI tracking")
+    args = parser.parse_args()
+
+    if args.record:
+        adapter = CassetteAdapter(args.cassette, record=True)
+        client = ClozeClient(api_key=os.environ["CLOZE_API_KEY"], adapter=adapter)
+        records = iterate_feed(client, args.pagesize)
+        adapter.save()
+        print(f"Recorded {len(adapter)} responses ({records} records) to {args.cassette}")
+        return 0
+
+    samples = [
+        run_once(args.cassette, args.latency_scale, args.pagesize)
+        for _ in range(args.runs)
+    ]
+    result = {
+        "runs": args.runs,
+        "records": samples[0][0],
+        "cpu_ms": round(statistics.median(s[1] for s in samples), 2),
+        "wall_ms": round(statistics.median(s[2] for s in samples), 2),
+        "peak_kib": round(statistics.median(s[3] for s in samples), 1),
+    }
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"records:     {result['records']}")
+        print(f"CPU time:    {result['cpu_ms']:.2f} ms (median of {args.runs})")
+        print(f"wall time:   {result['wall_ms']:.2f} ms")
+        print(f"peak memory: {result['peak_kib']:.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Startup benchmark for the Cloze SDK.
+
+Measures, in fresh interpreters, the time to import cloze_sdk and to create
+a client and touch one endpoint namespace, the work a short-lived process
+does before its first request. No network requests are made.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--json] [--max-import-ms MS]
+
+With --max-import-ms the script exits non-zero when the median import time
+exceeds the budget, so CI can fail on startup regressions.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import time
+started = time.perf_counter()
+import cloze_sdk
+imported = time.perf_counter()
+client = cloze_sdk.ClozeClient(api_key="benchmark")
+client.people
+ready = time.perf_counter()
+print((imported - started) * 1000, (ready - imported) * 1000)
+"""
+
+
+def run_probe() -> tuple:
+    """Run the probe in a new interpreter and return (import_ms, client_ms)."""
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+    import_ms, client_ms = output.split()
+    return float(import_ms), float(client_ms)
+
+
+def main() -> int:
+    """Run the benchmark and report median timings."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--runs", type=int, default=20, help="interpreters to start")
+    parser.add_argument("--json", action="store_true", help="print JSON for CI tracking")
+    parser.add_argument("--max-import-ms", type=float, help="fail above this median")
+    args = parser.parse_args()
+
+    samples = [run_probe() for _ in range(args.runs)]
+    result = {
+        "runs": args.runs,
+        "import_ms": round(statistics.median(s[0] for s in samples), 2),
+        "client_ms": round(statistics.median(s[1] for s in samples), 2),
+    }
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"import cloze_sdk:        {result['import_ms']:.2f} ms (median of {args.runs})")
+        print(f"client + first endpoint: {result['client_ms']:.2f} ms")
+
+    if args.max_import_ms is not None and result["import_ms"] > args.max_import_ms:
+        print(
+            f"Import time {result['import_ms']:.2f} ms exceeds budget "
+            f"{args.max_import_ms:.2f} ms",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
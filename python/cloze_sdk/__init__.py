@@ -19,14 +19,71 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+from typing import Any
+
+# Defined before the submodule imports, which read it
+__version__ = "1.0.0"
+
+from .auth import TokenProvider
+from .cache import (MemoryCacheBackend, ResponseCache,
+                    SQLiteCacheBackend)
+from .circuit import CircuitBreaker
 from .client import ClozeClient
+from .codec import JSONCodec
+from .concurrency import ConcurrencyLimiter
+from .deadline import deadline
 from .exceptions import (ClozeAPIError, ClozeAuthenticationError,
-                         ClozeRateLimitError)
+                         ClozeCircuitOpenError, ClozeRateLimitError,
+                         ClozeTimeoutError)
+from .hedging import HedgePolicy
+from .middleware import Middleware, RequestContext
+from .pool import ClozeClientPool
+from .ratelimit import FileRateLimiter, RateLimiter
+from .request_log import RequestLogger
+from .retry import RetryPolicy
+from .streaming import AsyncStreamedPage, StreamedPage
+from .tracing import trace_operation
 
-__version__ = "1.0.0"
 __all__ = [
+    "AsyncClozeClient",
+    "CassetteAdapter",
+    "CircuitBreaker",
+    "ConcurrencyLimiter",
     "ClozeClient",
+    "ClozeClientPool",
     "ClozeAPIError",
     "ClozeAuthenticationError",
+    "ClozeCircuitOpenError",
     "ClozeRateLimitError",
+    "ClozeTimeoutError",
+    "FileRateLimiter",
+    "HedgePolicy",
+    "JSONCodec",
+    "MemoryCacheBackend",
+    "Middleware",
+    "RateLimiter",
+    "RequestContext",
+    "ResponseCache",
+    "RequestLogger",
+    "RetryPolicy",
+    "SQLiteCacheBackend",
+    "AsyncStreamedPage",
+    "StreamedPage",
+    "TokenProvider",
+    "deadline",
+    "trace_operation",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # AsyncClozeClient pulls in httpx and asyncio; load it only when used
+    if name == "AsyncClozeClient":
+        from .async_client import AsyncClozeClient
+
+        return AsyncClozeClient
+    # CassetteAdapter is a requests transport adapter and pulls in requests
+    if name == "CassetteAdapter":
+        from .cassette import CassetteAdapter
+
+        return CassetteAdapter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
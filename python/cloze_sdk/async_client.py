@@ -0,0 +1,602 @@
+"""
+Asyncio client for Cloze API interactions.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx is an optional dependency
+    httpx = None  # type: ignore[assignment]
+
+from .auth import TokenProvider
+from .cache import CacheEntry, ResponseCache
+from .circuit import CircuitBreaker
+from .client import STREAM_CHUNK_SIZE, BaseClozeClient
+from .codec import JSONCodec
+from .concurrency import ConcurrencyLimiter
+from .deadline import remaining
+from .exceptions import ClozeAPIError
+from .hedging import HedgePolicy, can_win
+from .middleware import Middleware, RequestContext, _current
+from .ratelimit import RateLimiter
+from .request_log import RequestLogger
+from .retry import RetryPolicy
+from .singleflight import AsyncSingleFlight, request_key
+from .pagination import AsyncPageIterator
+from .streaming import AsyncStreamedPage
+
+
+async def _run_hook(hook: Callable[[RequestContext], Any], context: RequestContext) -> None:
+    """Call a middleware hook, awaiting it if it is a coroutine function."""
+    result = hook(context)
+    if inspect.isawaitable(result):
+        await result
+
+
+class AsyncClozeClient(BaseClozeClient):
+    """
+    Asyncio client for interacting with the Cloze API.
+
+    Exposes the same endpoint namespaces as ClozeClient; every endpoint method
+    returns an awaitable, e.g. ``await client.people.find(...)``. All requests
+    share one httpx connection pool. Requires the ``httpx`` package
+    (``pip install cloze-sdk[async]``).
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        oauth_token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: int = 30,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+        json_codec: Union[str, JSONCodec, None] = None,
+        compress_requests: Optional[str] = None,
+        compression_threshold: int = 1024,
+        connect_timeout: Optional[float] = None,
+        single_flight: bool = False,
+        cache: Optional[ResponseCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        middleware: Optional[List[Middleware]] = None,
+        tracing: bool = False,
+        request_logger: Optional[RequestLogger] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        token_provider: Optional[TokenProvider] = None,
+    ):
+        """
+        Initialize the asyncio Cloze client.
+
+        Args:
+            api_key: API key for authentication (can be used as query param or bearer token)
+            oauth_token: OAuth 2.0 access token
+            base_url: Custom base URL (defaults to https://api.cloze.com)
+            timeout: Request timeout in seconds (default: 30)
+            retry_policy: Optional RetryPolicy for transient failures (default: no retries)
+            rate_limiter: Optional RateLimiter (or FileRateLimiter) consulted before
+                every request, including retries
+            max_connections: Maximum concurrent connections in the pool (default: 100)
+            max_keepalive_connections: Idle connections kept alive (default: 20)
+            keepalive_expiry: Seconds an idle connection is kept (default: 5)
+            http2: If True, multiplex concurrent requests over HTTP/2, falling
+                back to HTTP/1.1 when the server does not negotiate it.
+                Requires ``cloze-sdk[http2]`` (default: False)
+            json_codec: JSON codec for request bodies and responses: a JSONCodec,
+                'json', 'orjson', 'msgspec' or 'auto' (fastest installed). None
+                leaves encoding and decoding to httpx (default: None)
+            compress_requests: Compress JSON request bodies with 'gzip' or 'zstd'
+                (default: None, no compression)
+            compression_threshold: Minimum body size in bytes to compress
+                (default: 1024)
+            connect_timeout: Seconds allowed to establish a connection; ``timeout``
+                then only bounds waiting for the response (default: None, use
+                ``timeout`` for both)
+            single_flight: If True, concurrent identical GET requests (same
+                endpoint and parameters) share one API call and the same
+                decoded result object (default: False)
+            cache: Optional ResponseCache for GET responses. Backend calls
+                run on the event loop, so prefer MemoryCacheBackend (default: None)
+            circuit_breaker: Optional CircuitBreaker that fails fast on
+                endpoint groups that keep failing (default: None)
+            hedge_policy: Optional HedgePolicy sending a duplicate of slow
+                GET requests to selected endpoints (default: None)
+            middleware: Middleware run around every request, outermost first;
+                more can be appended to ``client.middleware`` (default: None)
+            tracing: If True and opentelemetry is installed, report a span for
+                every API call and page iteration (default: False)
+            request_logger: Optional RequestLogger writing sampled, redacted
+                request and response records to the ``cloze_sdk`` logger
+                (default: None)
+            concurrency_limiter: Optional ConcurrencyLimiter adapting the
+                number of requests in flight to latency and 429 responses; may
+                be shared by several clients (default: None)
+            token_provider: Optional TokenProvider supplying expiring OAuth
+                tokens, used instead of ``api_key`` and ``oauth_token``. A
+                request answered with 401 is replayed once with a refreshed
+                token (default: None)
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncClozeClient requires httpx. Install it with "
+                "'pip install cloze-sdk[async]'."
+            )
+
+        super().__init__(
+            api_key=api_key,
+            oauth_token=oauth_token,
+            base_url=base_url,
+            timeout=timeout,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
+            compress_requests=compress_requests,
+            compression_threshold=compression_threshold,
+            connect_timeout=connect_timeout,
+            cache=cache,
+            circuit_breaker=circuit_breaker,
+            hedge_policy=hedge_policy,
+            middleware=middleware,
+            tracing=tracing,
+            request_logger=request_logger,
+            concurrency_limiter=concurrency_limiter,
+            token_provider=token_provider,
+        )
+
+        self._raw_body_kwarg = "content"
+        self._flights = AsyncSingleFlight() if single_flight else None
+        self._split_timeout = lambda connect, read: httpx.Timeout(read, connect=connect)
+        self.http2 = http2
+        self._limits = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+        }
+        self.session = self._new_session(self._default_headers())
+
+    def _new_session(self, headers: Any) -> Any:
+        """Create the httpx client requests are sent through."""
+        if self.http2:
+            from .transport import create_http2_session
+
+            return create_http2_session(headers, asynchronous=True, **self._limits)
+        return httpx.AsyncClient(headers=headers, limits=httpx.Limits(**self._limits))
+
+    def _reset_transport(self) -> None:
+        """Replace connections and coalesced calls inherited from a parent process."""
+        # The parent's client is abandoned rather than closed, so its
+        # connections stay usable in the parent
+        self.session = self._new_session(self.session.headers)
+        if self._flights is not None:
+            self._flights = AsyncSingleFlight()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self.session.aclose()
+
+    async def __aenter__(self) -> "AsyncClozeClient":
+        """Enter the async context manager."""
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the connection pool on exit."""
+        await self.aclose()
+
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        use_api_key_param: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Make an HTTP request to the Cloze API.
+
+        Args:
+            method: HTTP method (GET, POST, DELETE, etc.)
+            endpoint: API endpoint path (e.g., '/v1/user/profile')
+            params: Query parameters
+            data: Form data
+            json_data: JSON body data
+            use_api_key_param: If True, add api_key as query parameter instead of header
+
+        Returns:
+            Response JSON data
+
+        Raises:
+            ClozeAPIError: For API errors
+            ClozeAuthenticationError: For authentication errors
+            ClozeRateLimitError: For rate limit errors
+        """
+        if not self.middleware:
+            return await self._dispatch(
+                method, endpoint, params, data, json_data, use_api_key_param
+            )
+
+        context = RequestContext(
+            method, endpoint, params, json_data if json_data is not None else data
+        )
+        try:
+            for middleware in self.middleware:
+                await _run_hook(middleware.before_request, context)
+            if json_data is not None:
+                json_data = context.body
+            else:
+                data = context.body
+            token = _current.set(context)
+            try:
+                context.result = await self._dispatch(
+                    method, endpoint, context.params, data, json_data, use_api_key_param
+                )
+            finally:
+                _current.reset(token)
+        except Exception as e:
+            await self._end_call(context, e)
+            raise
+        await self._end_call(context)
+        return context.result  # type: ignore[return-value]
+
+    async def _end_call(
+        self, context: RequestContext, error: Optional[BaseException] = None
+    ) -> None:
+        """Run the after_response, or on_error, hooks of a finished call."""
+        context.elapsed = time.monotonic() - context.started_at
+        if error is None:
+            for middleware in reversed(self.middleware):
+                await _run_hook(middleware.after_response, context)
+            return
+        context.error = error
+        for middleware in reversed(self.middleware):
+            await _run_hook(middleware.on_error, context)
+
+    async def _dispatch(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        use_api_key_param: bool,
+    ) -> Dict[str, Any]:
+        """Serve a request from the cache or the API, without middleware."""
+        cache_key = self._cache_key(method, endpoint, params)
+        stale = None
+        if cache_key is not None:
+            cached, stale = self.cache.lookup(cache_key)  # type: ignore[union-attr]
+            if cached is not None:
+                return cached
+
+        request_kwargs = self._prepare_request(
+            method, endpoint, params, data, json_data, use_api_key_param
+        )
+        if stale is not None:
+            request_kwargs.setdefault("headers", {}).update(
+                self.cache.conditional_headers(stale)  # type: ignore[union-attr]
+            )
+        if self._flights is not None and method == "GET":
+            result, shared = await self._flights.do(
+                request_key(method, endpoint, params),
+                lambda: self._fetch(method, endpoint, request_kwargs, cache_key, stale),
+                timeout=remaining(),
+            )
+            if shared:
+                self.metrics.increment("single_flight_shared", endpoint=endpoint)
+            return result
+        return await self._fetch(method, endpoint, request_kwargs, cache_key, stale)
+
+    async def _fetch(
+        self,
+        method: str,
+        endpoint: str,
+        request_kwargs: Dict[str, Any],
+        cache_key: Optional[str] = None,
+        stale: Optional[CacheEntry] = None,
+    ) -> Dict[str, Any]:
+        """Send a prepared request, decode its response and cache it if keyed."""
+        if self.hedge_policy is not None and self.hedge_policy.applies(method, endpoint):
+            response = await self._send_hedged(method, endpoint, request_kwargs)
+        else:
+            response = await self._send(method, endpoint, request_kwargs)
+        return self._complete(method, endpoint, response, cache_key, stale)
+
+    async def _send_hedged(
+        self, method: str, endpoint: str, request_kwargs: Dict[str, Any]
+    ) -> Any:
+        """
+        Send a request, racing a duplicate against it if it is slow.
+
+        The first copy to return a successful response wins and the other is
+        cancelled. A 5xx or 429 response does not win while the other copy is
+        still pending.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            request_kwargs: Keyword arguments from _prepare_request()
+
+        Returns:
+            httpx response
+        """
+        policy = self.hedge_policy
+        assert policy is not None
+        policy.start()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        primary = asyncio.ensure_future(self._send(method, endpoint, dict(request_kwargs)))
+
+        def observe(task: "asyncio.Future[Any]") -> None:
+            if not task.cancelled() and task.exception() is None:
+                policy.observe(endpoint, loop.time() - started)
+
+        primary.add_done_callback(observe)
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=policy.delay_for(endpoint))
+            if done or not policy.try_hedge():
+                return await primary
+
+            self.metrics.increment("hedges_sent", endpoint=endpoint)
+            hedge = asyncio.ensure_future(self._send(method, endpoint, dict(request_kwargs)))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None and can_win(task.result()):
+                        if task is hedge:
+                            self.metrics.increment("hedge_wins", endpoint=endpoint)
+                        return task.result()
+            # Neither copy succeeded; prefer the first copy's outcome
+            if primary.exception() is not None and hedge.exception() is None:
+                return hedge.result()
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if task is None:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark a losing copy's exception as retrieved
+                    task.exception()
+
+    async def _stream_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_api_key_param: bool = False,
+    ) -> AsyncStreamedPage:
+        """
+        Make an HTTP request whose list response is parsed incrementally.
+
+        Middleware see the call like any other, except that their
+        after_response or on_error hooks run once the page has been iterated
+        or closed. Streamed responses are never cached, coalesced or hedged.
+
+        Args:
+            method: HTTP method (usually GET)
+            endpoint: API endpoint path (e.g., '/v1/people/feed')
+            params: Query parameters
+            use_api_key_param: If True, add api_key as query parameter instead of header
+
+        Returns:
+            AsyncStreamedPage yielding one record at a time
+
+        Raises:
+            ClozeAPIError: For transport errors
+            ClozeAuthenticationError: For authentication errors
+            ClozeRateLimitError: For rate limit errors
+        """
+        if not self.middleware:
+            return await self._open_stream(method, endpoint, params, use_api_key_param)
+
+        context = RequestContext(method, endpoint, params, stream=True)
+
+        async def finish(error: Optional[BaseException]) -> None:
+            context.response_bytes = page.bytes_read
+            await self._end_call(context, error)
+
+        try:
+            for middleware in self.middleware:
+                await _run_hook(middleware.before_request, context)
+            token = _current.set(context)
+            try:
+                page = await self._open_stream(
+                    method, endpoint, context.params, use_api_key_param, finish
+                )
+            finally:
+                _current.reset(token)
+        except Exception as e:
+            await self._end_call(context, e)
+            raise
+        context.result = page
+        return page
+
+    async def _open_stream(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        use_api_key_param: bool,
+        on_finish: Optional[Callable[[Optional[BaseException]], Any]] = None,
+    ) -> AsyncStreamedPage:
+        """Send a streamed request and wrap its response, without middleware."""
+        request_kwargs = self._prepare_request(
+            method, endpoint, params, use_api_key_param=use_api_key_param
+        )
+        response = await self._send(method, endpoint, request_kwargs, stream=True)
+        try:
+            self._check_status(response)
+        except ClozeAPIError:
+            await response.aclose()
+            raise
+
+        return AsyncStreamedPage(
+            response.aiter_bytes(STREAM_CHUNK_SIZE),
+            response=response,
+            close=response.aclose,
+            on_complete=self._record_stream_decode,
+            on_finish=on_finish,
+        )
+
+    def _paginate(
+        self,
+        fetch: Callable[..., Any],
+        record_key: str,
+        params: Dict[str, Any],
+        cursor: bool,
+        timeout: Optional[float] = None,
+    ) -> AsyncPageIterator:
+        """
+        Iterate over the records of every page of a find or feed query.
+
+        Args:
+            fetch: Endpoint coroutine function returning one page
+            record_key: Response field holding the records
+            params: Keyword arguments for the first fetch
+            cursor: If True, follow ``cursor``; otherwise advance ``pagenumber``
+            timeout: Seconds allowed for the whole iteration
+
+        Returns:
+            AsyncPageIterator yielding records
+        """
+        return AsyncPageIterator(
+            fetch, record_key, params, cursor, timeout, self._tracer
+        )
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        request_kwargs: Dict[str, Any],
+        stream: bool = False,
+    ) -> Any:
+        """
+        Send a prepared request, applying rate limiting and retries.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            request_kwargs: Keyword arguments from _prepare_request()
+            stream: If True, return before the response body is read
+
+        Returns:
+            httpx response
+
+        Raises:
+            ClozeAPIError: If the transport fails and retries are exhausted
+            ClozeTimeoutError: If the request times out or the deadline passes
+            ClozeCircuitOpenError: If the endpoint's circuit is open
+        """
+        policy = self.retry_policy
+        # Decided once so retries of a sampled request are logged together
+        log = self.request_logger is not None and self.request_logger.sample()
+        replayed = False
+        attempt = 0
+        while True:
+            attempt += 1
+            # Before reserving any capacity, so an open circuit fails fast
+            # without waiting for or holding a rate-limit token or a slot
+            self._circuit_admit(endpoint)
+            if self.rate_limiter is not None:
+                # A token due after the deadline is not taken, so a request
+                # that times out here leaves the budget to others
+                budget = remaining()
+                wait = self.rate_limiter.reserve(self._credential_key, endpoint, budget)
+                self._check_rate_limit_wait(wait, budget, endpoint)
+                if wait > 0:
+                    self.metrics.increment_request(method, endpoint, "rate_limit_waits")
+                    await asyncio.sleep(wait)
+            if self.concurrency_limiter is not None and not (
+                await self.concurrency_limiter.acquire_async(remaining())
+            ):
+                raise self._slot_timeout(method, endpoint)
+            try:
+                if self.token_provider is not None:
+                    token = await self.token_provider.token_async()
+                    self._authorize(request_kwargs, token)
+                budget = self._deadline_budget(method, endpoint)
+                if budget is not None:
+                    request_kwargs["timeout"] = self._request_timeout(budget)
+            except BaseException:
+                self._release_slot(endpoint)
+                raise
+            started = time.monotonic()
+            try:
+                if stream:
+                    response = await self.session.send(
+                        self.session.build_request(**request_kwargs), stream=True
+                    )
+                else:
+                    response = await self.session.request(**request_kwargs)
+            except httpx.HTTPError as e:
+                self._after_attempt(method, endpoint, started)
+                if log:
+                    self._log_attempt(request_kwargs, attempt, started, error=e)
+                if policy is not None and policy.should_retry_exception(
+                    method, e, attempt
+                ):
+                    delay = policy.backoff(attempt)
+                    if self._fits_deadline(delay):
+                        self.metrics.increment_request(method, endpoint, "retries")
+                        await asyncio.sleep(delay)
+                        continue
+                raise self._transport_error(e)
+            except BaseException:
+                self._release_slot(endpoint)
+                raise
+
+            self._after_attempt(method, endpoint, started, response)
+            if log:
+                self._log_attempt(
+                    request_kwargs, attempt, started, response, stream=stream
+                )
+            if (
+                response.status_code == 401
+                and self.token_provider is not None
+                and not replayed
+            ):
+                # The token was revoked or expired early: refresh and replay once
+                replayed = True
+                self.token_provider.invalidate(token)
+                self.metrics.increment("auth_replays", endpoint=endpoint)
+                await response.aclose()
+                continue
+            if policy is not None and policy.should_retry_response(
+                method, response, attempt
+            ):
+                delay = policy.delay_for_response(response, attempt)
+                if delay is not None and self._fits_deadline(delay):
+                    self.metrics.increment_request(method, endpoint, "retries")
+                    await response.aclose()
+                    await asyncio.sleep(delay)
+                    continue
+
+            return response
@@ -0,0 +1,186 @@
+"""
+Expiring access tokens with single-flight refresh.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from .exceptions import ClozeAuthenticationError
+
+
+class TokenProvider:
+    """
+    Supplies OAuth access tokens to a client, refreshing them before they expire.
+
+    ``fetch`` returns a new token and the seconds until it expires (None if
+    it does not). Within ``refresh_margin`` seconds of expiry one caller
+    refreshes the token while the others keep using the current one; once it
+    has expired, callers wait for that single refresh. A token the API
+    rejected with 401 is passed to invalidate(), and is refreshed once no
+    matter how many requests it failed.
+
+    Subclasses may override fetch_token() instead of passing ``fetch``.
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[Callable[[], Tuple[str, Optional[float]]]] = None,
+        refresh_margin: float = 60.0,
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            fetch: Function returning ``(access_token, expires_in_seconds)``,
+                e.g. by calling your OAuth token endpoint with a refresh token
+            refresh_margin: Seconds before expiry to start refreshing
+                (default: 60)
+        """
+        self._fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self._token: Optional[str] = None
+        self._expires_at: Optional[float] = None
+        self._refreshing = False
+        # Incremented when a refresh finishes; waiters use it to see theirs end
+        self._generation = 0
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    def fetch_token(self) -> Tuple[str, Optional[float]]:
+        """
+        Get a new access token from the authorization server.
+
+        Returns:
+            Tuple of the access token and seconds until it expires, or None
+
+        Raises:
+            NotImplementedError: If no ``fetch`` function was given
+        """
+        if self._fetch is None:
+            raise NotImplementedError("Pass fetch or override fetch_token()")
+        return self._fetch()
+
+    def _usable(self, now: float) -> bool:
+        """Check whether the current token has not expired; the caller holds the lock."""
+        return self._token is not None and (
+            self._expires_at is None or now < self._expires_at
+        )
+
+    def current(self) -> Optional[str]:
+        """
+        Get the current token if it needs no refresh, without blocking.
+
+        Returns:
+            Access token, or None if it is missing or due for refresh
+        """
+        token, expires_at = self._token, self._expires_at
+        if token is None:
+            return None
+        if expires_at is not None and time.monotonic() >= expires_at - self.refresh_margin:
+            return None
+        return token
+
+    def token(self) -> str:
+        """
+        Get a valid access token, refreshing it if it is due.
+
+        Returns:
+            Access token
+
+        Raises:
+            ClozeAuthenticationError: If the token had expired and refreshing failed
+        """
+        token = self.current()
+        if token is not None:
+            return token
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._refreshing:
+                    if self._usable(now):
+                        # Someone else is refreshing early; keep using this one
+                        return self._token  # type: ignore[return-value]
+                    generation = self._generation
+                    self._cond.wait_for(lambda: self._generation != generation)
+                    if self._error is not None:
+                        raise ClozeAuthenticationError(
+                            f"Token refresh failed: {self._error}"
+                        ) from self._error
+                    continue
+                if self._usable(now) and (
+                    self._expires_at is None
+                    or now < self._expires_at - self.refresh_margin
+                ):
+                    return self._token  # type: ignore[return-value]
+                self._refreshing = True
+                break
+
+        started = time.monotonic()
+        error: Optional[BaseException] = None
+        try:
+            token, expires_in = self.fetch_token()
+        except Exception as e:
+            error = e
+        with self._cond:
+            self._refreshing = False
+            self._generation += 1
+            self._error = error
+            if error is None:
+                self.refreshes += 1
+                self._token = token
+                self._expires_at = None if expires_in is None else started + expires_in
+            self._cond.notify_all()
+            if error is None:
+                return token
+            if self._usable(time.monotonic()):
+                # An early refresh failed; the current token is still good
+                return self._token  # type: ignore[return-value]
+        raise ClozeAuthenticationError(f"Token refresh failed: {error}") from error
+
+    async def token_async(self) -> str:
+        """
+        Get a valid access token without blocking the event loop.
+
+        Refreshes run on the default executor, and share the single flight
+        with threads calling token().
+
+        Returns:
+            Access token
+        """
+        token = self.current()
+        if token is not None:
+            return token
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(None, self.token)
+
+    def invalidate(self, token: str) -> None:
+        """
+        Mark a token the API rejected, so the next token() call refreshes it.
+
+        Tokens other than the current one are ignored, so requests that fail
+        with an already replaced token do not cause another refresh.
+
+        Args:
+            token: Rejected access token
+        """
+        with self._cond:
+            if token == self._token:
+                self._token = None
@@ -0,0 +1,524 @@
+"""
+Response caching for Cloze API GET endpoints.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .codec import JSONCodec
+
+# Seconds to cache slow-changing endpoints for, by path prefix
+DEFAULT_TTLS: Dict[str, float] = {
+    "/v1/user/": 300.0,
+    "/v1/team/": 300.0,
+    "/v1/people/get": 60.0,
+    "/v1/companies/get": 60.0,
+}
+
+
+class CacheEntry(NamedTuple):
+    """A stored response and the validators used to revalidate it."""
+
+    payload: bytes
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[str] = None
+
+
+class CacheBackend:
+    """
+    Storage for cache entries.
+
+    Backends keep entries past their expiry until evicted, so that stale
+    entries can be revalidated; the ResponseCache decides what expiry means.
+    """
+
+    def __init__(self):
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up an entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            CacheEntry, or None if absent
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """
+        Store an entry, evicting others if the backend is full.
+
+        Args:
+            key: Cache key
+            entry: Entry to store
+        """
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        Remove every entry whose key starts with a prefix.
+
+        Args:
+            prefix: Key prefix
+
+        Returns:
+            Number of entries removed
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        raise NotImplementedError
+
+    def reset_after_fork(self) -> None:
+        """
+        Drop state inherited from the process this one was forked from.
+
+        Clients call this in a forked child before it runs any other code;
+        backends holding connections override it.
+        """
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU backend holding at most ``max_entries`` entries."""
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize the backend.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    LRU backend in a SQLite database, shared by every process using the file.
+
+    The database runs in WAL mode so concurrent workers on a host can read
+    while one writes. Eviction counts are per process. A hit records its
+    access time only when the recorded one is ``touch_interval`` seconds old,
+    so most hits are plain reads and recency is tracked to that precision.
+    """
+
+    def __init__(
+        self, path: str, max_entries: int = 10000, touch_interval: float = 60.0
+    ):
+        """
+        Initialize the backend, creating the database if needed.
+
+        Args:
+            path: Database file path
+            max_entries: Entries kept before the least recently used are evicted
+            touch_interval: Seconds before a hit updates an entry's access
+                time again (default: 60)
+        """
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        # Connections of parent processes, kept open; see reset_after_fork()
+        self._inherited: List[Any] = []
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, payload BLOB NOT NULL, expires_at REAL NOT NULL, "
+            "etag TEXT, last_modified TEXT, digest TEXT, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_accessed "
+            "ON cache_entries (accessed_at)"
+        )
+
+    def _connect(self) -> Any:
+        """Open a connection to the database in WAL mode."""
+        import sqlite3
+
+        conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def reset_after_fork(self) -> None:
+        """
+        Open a connection of this process's own if it was forked from the
+        one that opened the current connection.
+
+        SQLite connections must not be used across fork(). The inherited one
+        is left open rather than closed, since closing it in the child could
+        disturb the parent's locks on the file. Runs once per process,
+        however many clients share the backend.
+        """
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        self._pid = pid
+        # The lock may have been held by a parent thread that does not exist here
+        self._lock = threading.Lock()
+        self._inherited.append(self._conn)
+        self._conn = self._connect()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at, etag, last_modified, digest, accessed_at "
+                "FROM cache_entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            # A write takes the database lock, so it is skipped for entries
+            # touched recently enough for eviction order
+            now = time.time()
+            if now - row[5] >= self.touch_interval:
+                self._conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+        return CacheEntry(bytes(row[0]), *row[1:5])
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, *entry, time.time()),
+                )
+                excess = self._conn.execute(
+                    "SELECT COUNT(*) FROM cache_entries"
+                ).fetchone()[0]
+                excess -= self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM cache_entries WHERE key IN (SELECT key FROM "
+                        "cache_entries ORDER BY accessed_at LIMIT ?)",
+                        (excess,),
+                    )
+                    self.evictions += excess
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+def _header(headers: Any, name: str) -> Optional[str]:
+    """Read a string header value, ignoring anything else."""
+    value = headers.get(name) if headers else None
+    return value if isinstance(value, str) else None
+
+
+class ResponseCache:
+    """
+    Cache of decoded GET responses with per-endpoint TTLs.
+
+    Only endpoints with a TTL are cached: the longest prefix in ``ttls``
+    matching the request path wins, falling back to ``default_ttl``.
+    Responses are stored encoded, so every hit returns a fresh copy that
+    callers may modify.
+
+    Expired entries are revalidated rather than dropped. The client sends
+    their ``ETag``/``Last-Modified`` validators as ``If-None-Match``/
+    ``If-Modified-Since``, and a 304 reply is served from the cache. When the
+    server sends no validators, a digest of the response body detects
+    unchanged content.
+
+    Clients invalidate entries after a successful write: a POST or DELETE to
+    ``/v1/people/update`` drops the cached responses of every endpoint under
+    ``/v1/people/`` for the client's credential.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: Optional[float] = None,
+        codec: Optional[JSONCodec] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Entry storage (default: MemoryCacheBackend())
+            ttls: Mapping of endpoint path prefix to seconds entries stay fresh
+                (default: DEFAULT_TTLS)
+            default_ttl: TTL for endpoints matching no prefix (default: None,
+                not cached)
+            codec: Codec used to store responses (default: JSONCodec())
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.codec = codec or JSONCodec()
+        # Longest prefix first so the most specific TTL wins
+        self._prefixes: List[str] = sorted(self.ttls, key=len, reverse=True)
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._revalidated = 0
+        self._unchanged = 0
+        self._lock = threading.Lock()
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        """
+        Get the TTL for an endpoint.
+
+        Args:
+            endpoint: API endpoint path
+
+        Returns:
+            Seconds responses stay fresh, or None if the endpoint is not cached
+        """
+        for prefix in self._prefixes:
+            if endpoint.startswith(prefix):
+                return self.ttls[prefix] or None
+        return self.default_ttl or None
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], Optional[CacheEntry]]:
+        """
+        Look up a response.
+
+        A fresh entry counts as a hit. An expired entry is returned for
+        revalidation and counts as a hit or a miss once revalidated() or
+        set() resolves it.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (decoded response, None) for a fresh entry,
+            (None, stale entry) for an expired one and (None, None) on a miss
+        """
+        entry = self.backend.get(key)
+        fresh = entry is not None and entry.expires_at > time.time()
+        with self._lock:
+            if fresh:
+                self._hits += 1
+            elif entry is not None:
+                self._expired += 1
+            else:
+                self._misses += 1
+        if entry is None:
+            return None, None
+        if not fresh:
+            return None, entry
+        return self.codec.loads(entry.payload), None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a fresh response; an expired entry counts as a miss.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decoded response, or None on a miss or an expired entry
+        """
+        value, stale = self.lookup(key)
+        if stale is not None:
+            with self._lock:
+                self._misses += 1
+        return value
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> Dict[str, str]:
+        """
+        Build the request headers revalidating a stale entry.
+
+        Args:
+            entry: Stale entry
+
+        Returns:
+            If-None-Match and/or If-Modified-Since headers (may be empty)
+        """
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidated(self, key: str, endpoint: str, entry: CacheEntry) -> Any:
+        """
+        Renew a stale entry the server reported unchanged (304) and serve it.
+
+        Args:
+            key: Cache key
+            endpoint: API endpoint path
+            entry: Stale entry sent for revalidation
+
+        Returns:
+            Decoded cached response
+        """
+        with self._lock:
+            self._hits += 1
+            self._revalidated += 1
+        self._renew(key, endpoint, entry)
+        return self.codec.loads(entry.payload)
+
+    def set(
+        self,
+        key: str,
+        endpoint: str,
+        value: Any,
+        response: Any = None,
+        stale: Optional[CacheEntry] = None,
+    ) -> None:
+        """
+        Store a response for the endpoint's TTL.
+
+        Args:
+            key: Cache key
+            endpoint: API endpoint path the response came from
+            value: Decoded response
+            response: HTTP response, to read validators and the body digest from
+            stale: Expired entry this response replaces, if any
+        """
+        ttl = self.ttl_for(endpoint)
+        if ttl is None:
+            return
+        headers = getattr(response, "headers", None)
+        content = getattr(response, "content", None)
+        digest = hashlib.sha256(content).hexdigest() if isinstance(content, bytes) else None
+        if stale is not None:
+            unchanged = digest is not None and digest == stale.digest
+            with self._lock:
+                self._misses += 1
+                if unchanged:
+                    self._unchanged += 1
+            if unchanged:
+                self._renew(key, endpoint, stale)
+                return
+        self.backend.set(
+            key,
+            CacheEntry(
+                self.codec.dumps(value),
+                time.time() + ttl,
+                etag=_header(headers, "ETag"),
+                last_modified=_header(headers, "Last-Modified"),
+                digest=digest,
+            ),
+        )
+
+    def _renew(self, key: str, endpoint: str, entry: CacheEntry) -> None:
+        """Store an entry again with a fresh expiry."""
+        ttl = self.ttl_for(endpoint) or 0.0
+        self.backend.set(key, entry._replace(expires_at=time.time() + ttl))
+
+    def invalidate(self, prefix: str) -> int:
+        """
+        Remove the entries whose keys start with a prefix.
+
+        Args:
+            prefix: Key prefix
+
+        Returns:
+            Number of entries removed
+        """
+        return self.backend.delete_prefix(prefix)
+
+    def clear(self) -> None:
+        """Remove all entries; counters are kept."""
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, expired (stale entries looked up),
+            revalidated (304 replies served from cache), unchanged (refetched
+            bodies matching the stale entry's digest), evictions and entries
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "revalidated": self._revalidated,
+                "unchanged": self._unchanged,
+                "evictions": self.backend.evictions,
+                "entries": len(self.backend),
+            }
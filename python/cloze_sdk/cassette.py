@@ -0,0 +1,224 @@
+"""
+Record and replay API traffic for deterministic tests and benchmarks.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import base64
+import gzip
+import io
+import json
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from urllib3.response import HTTPResponse
+
+from .exceptions import ClozeAPIError
+from .transport import PoolingHTTPAdapter
+
+# Query parameters never written to a cassette or used for matching
+SECRET_PARAMS = ("api_key",)
+
+# Response headers describing the original connection or encoding rather
+# than the (already decoded) body that is recorded, plus cookies
+DROPPED_HEADERS = (
+    "connection",
+    "content-encoding",
+    "content-length",
+    "keep-alive",
+    "set-cookie",
+    "transfer-encoding",
+)
+
+Key = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+
+def request_key(method: str, url: str) -> Key:
+    """
+    Build the key a request is matched on.
+
+    Args:
+        method: HTTP method
+        url: Full request URL
+
+    Returns:
+        Tuple of the method, the URL path and the sorted query parameters,
+        without credentials
+    """
+    parts = urlsplit(url)
+    params = tuple(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if name not in SECRET_PARAMS
+        )
+    )
+    return method.upper(), parts.path, params
+
+
+def _open(path: str, mode: str) -> Any:
+    """Open a cassette file, gzip-compressed if its name ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class CassetteAdapter(PoolingHTTPAdapter):
+    """
+    Transport adapter that records responses to a file, or replays them.
+
+    A cassette holds one JSON line per response, with the request's method,
+    path and query parameters, and the response's status, headers, body and
+    latency. Credentials are never written: ``api_key`` is dropped from the
+    parameters and request headers are not recorded. Paths ending in
+    ``.gz`` are gzip-compressed.
+
+    When replaying, requests are matched on method, path and query
+    parameters, ignoring their order and the base URL. Responses recorded
+    for the same request are served in the order they were recorded,
+    starting over once all have been served. Request bodies are not
+    compared.
+
+    Pass the adapter to ``ClozeClient(adapter=...)``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        record: bool = False,
+        latency_scale: float = 1.0,
+        **pool_options: Any,
+    ):
+        """
+        Initialize the adapter.
+
+        Args:
+            path: Cassette file
+            record: If True, send requests to the API and record the
+                responses; otherwise replay them from ``path`` (default: False)
+            latency_scale: Multiplier for the recorded latency when replaying;
+                0 replays without waiting (default: 1.0, original latency)
+            **pool_options: PoolingHTTPAdapter arguments, used when recording
+
+        Raises:
+            FileNotFoundError: If replaying and the cassette does not exist
+        """
+        super().__init__(**pool_options)
+        self.path = path
+        self.record = record
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._recorded: List[Dict[str, Any]] = []
+        self._responses: Dict[Key, List[Dict[str, Any]]] = {}
+        self._served: Dict[Key, int] = {}
+        if not record:
+            with _open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        key = (
+                            entry["method"],
+                            entry["path"],
+                            tuple((name, value) for name, value in entry["params"]),
+                        )
+                        self._responses.setdefault(key, []).append(entry)
+
+    def __len__(self) -> int:
+        """Number of responses recorded or loaded."""
+        if self.record:
+            return len(self._recorded)
+        return sum(len(entries) for entries in self._responses.values())
+
+    def send(self, request, **kwargs):  # type: ignore[override]
+        """Send a request and record the response, or replay a recorded one."""
+        if self.record:
+            return self._record(request, **kwargs)
+        return self._replay(request)
+
+    def _record(self, request, **kwargs):
+        """Send a request through the pool and keep its response."""
+        started = time.monotonic()
+        response = super().send(request, **kwargs)
+        # Read streamed bodies too; iter_content() then yields the read bytes
+        body = response.content
+        elapsed = time.monotonic() - started
+
+        method, path, params = request_key(request.method, request.url)
+        entry: Dict[str, Any] = {
+            "method": method,
+            "path": path,
+            "params": [list(param) for param in params],
+            "status": response.status_code,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in DROPPED_HEADERS
+            },
+            "elapsed": round(elapsed, 6),
+        }
+        try:
+            entry["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_base64"] = base64.b64encode(body).decode("ascii")
+        with self._lock:
+            self._recorded.append(entry)
+        return response
+
+    def _replay(self, request):
+        """Build the recorded response for a request."""
+        key = request_key(request.method, request.url)
+        with self._lock:
+            entries = self._responses.get(key)
+            if not entries:
+                raise ClozeAPIError(
+                    f"No recorded response for {key[0]} {key[1]} "
+                    f"with parameters {dict(key[2])} in {self.path}"
+                )
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            entry = entries[served % len(entries)]
+
+        delay = entry["elapsed"] * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+        if "body" in entry:
+            body = entry["body"].encode("utf-8")
+        else:
+            body = base64.b64decode(entry["body_base64"])
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=entry["headers"],
+            status=entry["status"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+    def save(self) -> None:
+        """Write the recorded responses to the cassette file."""
+        with self._lock:
+            entries = list(self._recorded)
+        with _open(self.path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        """Save the recording, if any, and close the pooled connections."""
+        if self.record:
+            self.save()
+        super().close()
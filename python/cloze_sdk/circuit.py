@@ -0,0 +1,228 @@
+"""
+Per-endpoint circuit breaking for Cloze API requests.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .exceptions import ClozeCircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Circuit:
+    """State of one endpoint group."""
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+
+
+class CircuitBreaker:
+    """
+    Fail fast on endpoint groups that keep failing.
+
+    Each endpoint group has its own circuit. A circuit opens after
+    ``failure_threshold`` consecutive failures (transport errors and 5xx
+    responses); requests to an open circuit raise ClozeCircuitOpenError
+    without being sent. After ``recovery_timeout`` seconds the circuit turns
+    half-open and lets ``half_open_max_calls`` probe requests through: a
+    successful probe closes it, a failed one opens it again.
+
+    Endpoints are grouped by the longest matching prefix in ``prefixes``, or
+    else by their first two path segments (e.g. ``/v1/analytics/``).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        prefixes: Optional[List[str]] = None,
+        on_state_change: Optional[Callable[[str, str, str], None]] = None,
+    ):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open a circuit
+                (default: 5)
+            recovery_timeout: Seconds a circuit stays open before probing
+                (default: 30)
+            half_open_max_calls: Probe requests allowed at once while half-open
+                (default: 1)
+            prefixes: Endpoint path prefixes to group circuits by
+            on_state_change: Called with (group, old_state, new_state) on
+                every transition
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+        # Longest prefix first so the most specific group wins
+        self._prefixes = sorted(prefixes or [], key=len, reverse=True)
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def group_for(self, endpoint: str) -> str:
+        """
+        Get the circuit group an endpoint belongs to.
+
+        Args:
+            endpoint: API endpoint path
+
+        Returns:
+            Group name (a path prefix)
+        """
+        for prefix in self._prefixes:
+            if endpoint.startswith(prefix):
+                return prefix
+        return "/".join(endpoint.split("/")[:3]) + "/"
+
+    def before_request(self, endpoint: str) -> None:
+        """
+        Admit a request or fail fast.
+
+        Args:
+            endpoint: API endpoint path
+
+        Raises:
+            ClozeCircuitOpenError: If the endpoint's circuit is open, or
+                half-open with all probe slots taken
+        """
+        group = self.group_for(endpoint)
+        transition = None
+        with self._lock:
+            circuit = self._circuits.get(group)
+            if circuit is None or circuit.state == CLOSED:
+                return
+            now = time.monotonic()
+            retry_after = circuit.opened_at + self.recovery_timeout - now
+            if circuit.state == OPEN:
+                if retry_after > 0:
+                    raise ClozeCircuitOpenError(
+                        f"Circuit open for {group}", circuit=group, retry_after=retry_after
+                    )
+                transition = self._move(group, circuit, HALF_OPEN)
+                circuit.probes = 0
+            elif circuit.probes >= self.half_open_max_calls:
+                if retry_after > 0:
+                    raise ClozeCircuitOpenError(
+                        f"Circuit half-open for {group}, probe in flight",
+                        circuit=group,
+                        retry_after=retry_after,
+                    )
+                # A probe never reported back; let another one through
+                circuit.probes = 0
+            circuit.probes += 1
+            # Restart the clock so an abandoned probe is only waited for once
+            circuit.opened_at = now
+        self._notify(transition)
+
+    def record_success(self, endpoint: str, started: Optional[float] = None) -> None:
+        """
+        Record a request that reached the API and got a non-5xx response.
+
+        Successes are ignored while the circuit is open: they come from
+        requests admitted before it tripped. A half-open circuit is closed
+        only by a probe, i.e. a request sent after it turned half-open.
+
+        Args:
+            endpoint: API endpoint path
+            started: time.monotonic() when the request was sent; if None,
+                a success while half-open is taken to be a probe's
+        """
+        group = self.group_for(endpoint)
+        transition = None
+        with self._lock:
+            circuit = self._circuits.get(group)
+            if circuit is None or circuit.state == OPEN:
+                return
+            if circuit.state == HALF_OPEN:
+                if started is not None and started < circuit.opened_at:
+                    return
+                transition = self._move(group, circuit, CLOSED)
+            circuit.failures = 0
+        self._notify(transition)
+
+    def record_failure(self, endpoint: str) -> None:
+        """
+        Record a transport error or 5xx response.
+
+        Args:
+            endpoint: API endpoint path
+        """
+        group = self.group_for(endpoint)
+        transition = None
+        with self._lock:
+            circuit = self._circuits.setdefault(group, _Circuit())
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or (
+                circuit.state == CLOSED and circuit.failures >= self.failure_threshold
+            ):
+                transition = self._move(group, circuit, OPEN)
+                circuit.opened_at = time.monotonic()
+        self._notify(transition)
+
+    def state(self, endpoint: str) -> str:
+        """
+        Get the state of an endpoint's circuit.
+
+        Args:
+            endpoint: API endpoint path or group prefix
+
+        Returns:
+            'closed', 'open' or 'half_open'
+        """
+        with self._lock:
+            circuit = self._circuits.get(self.group_for(endpoint))
+            return circuit.state if circuit is not None else CLOSED
+
+    def states(self) -> Dict[str, str]:
+        """
+        Get the state of every circuit that has seen a failure.
+
+        Returns:
+            Mapping of group to state
+        """
+        with self._lock:
+            return {group: c.state for group, c in self._circuits.items()}
+
+    def reset(self) -> None:
+        """Close every circuit and forget failure counts."""
+        with self._lock:
+            self._circuits.clear()
+
+    @staticmethod
+    def _move(group: str, circuit: _Circuit, state: str) -> Tuple[str, str, str]:
+        """Change a circuit's state and describe the transition."""
+        old, circuit.state = circuit.state, state
+        return group, old, state
+
+    def _notify(self, transition: Optional[Tuple[str, str, str]]) -> None:
+        """Report a transition to the callback, outside the lock."""
+        if transition is not None and self.on_state_change is not None:
+            self.on_state_change(*transition)
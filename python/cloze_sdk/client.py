@@ -17,84 +17,287 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-from typing import Any, Dict, Optional
-
-import requests
+import hashlib
+import importlib
+import os
+import sys
+import threading
+import time
+import weakref
+from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple,
+                    Type, Union)
 
+from . import __version__
+from .auth import TokenProvider
+from .cache import CacheEntry, ResponseCache
+from .circuit import CircuitBreaker
+from .codec import JSONCodec, get_codec
+from .compression import RequestCompressor, requests_accept_encoding
+from .concurrency import ConcurrencyLimiter
+from .deadline import remaining
 from .exceptions import (ClozeAPIError, ClozeAuthenticationError,
-                         ClozeRateLimitError)
+                         ClozeCircuitOpenError, ClozeRateLimitError,
+                         ClozeTimeoutError)
+from .hedging import (HedgePolicy, HedgeTimer, Interrupt, can_win,
+                      current_interrupt)
+from .middleware import Middleware, RequestContext, _current
+from .metrics import ClientMetrics
+from .pagination import PageIterator
+from .ratelimit import RateLimiter
+from .request_log import RequestLogger
+from .retry import RetryPolicy, parse_retry_after
+from .singleflight import SingleFlight, request_key
+from .streaming import StreamedPage
+from .tracing import TracingMiddleware, get_tracer
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .transport import PoolingHTTPAdapter
+
+# Bytes read from the socket per parser step when streaming responses
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Used to encode bodies for compression when no codec is configured
+_STDLIB_CODEC = JSONCodec()
+
+USER_AGENT = f"cloze-sdk-python/{__version__}"
+
+# Clients of this process, reset in a forked child before it runs any code
+_live_clients: "weakref.WeakSet[BaseClozeClient]" = weakref.WeakSet()
+
+
+def _reset_clients_after_fork() -> None:
+    """Drop the state every live client inherited from the parent process."""
+    for client in list(_live_clients):
+        client._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_clients_after_fork)
+
+
+def _is_timeout(error: BaseException) -> bool:
+    """Check whether a transport exception is a connect or read timeout."""
+    requests = sys.modules.get("requests")
+    if requests is not None and isinstance(error, requests.exceptions.Timeout):
+        return True
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(error, httpx.TimeoutException)
+
+
+def _close_response(future: Any) -> None:
+    """Release the connection held by a losing hedged request."""
+    if future.exception() is None:
+        future.result().close()
+
+
+class _Endpoint:
+    """
+    Endpoint namespace built on first attribute access.
+
+    The endpoint module is imported and its class instantiated the first
+    time the attribute is read on a client; the instance is then stored on
+    the client, so later reads are plain attribute lookups.
+    """
+
+    def __init__(self, module: str, class_name: str):
+        """
+        Initialize the descriptor.
+
+        Args:
+            module: Module name relative to the cloze_sdk package
+            class_name: Endpoint class in that module
+        """
+        self.module = module
+        self.class_name = class_name
+        self.name = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, client: Any, owner: Optional[type] = None) -> Any:
+        if client is None:
+            return self
+        module = importlib.import_module(self.module, __package__)
+        namespace = getattr(module, self.class_name)(client)
+        # Threads racing on first access all get the same instance
+        return client.__dict__.setdefault(self.name, namespace)
 
-class ClozeClient:
-    """Main client for interacting with the Cloze API."""
+
+class BaseClozeClient:
+    """
+    Transport-independent base for the synchronous and asyncio clients.
+
+    Holds credentials and policies, builds request arguments and maps
+    responses to results or exceptions. Subclasses provide the transport and
+    ``_make_request``.
+    """
 
     BASE_URL = "https://api.cloze.com"
     API_VERSION = "2025.10"
 
+    analytics = _Endpoint(".analytics", "Analytics")
+    team = _Endpoint(".team", "Team")
+    account = _Endpoint(".account", "Account")
+    projects = _Endpoint(".projects", "Projects")
+    people = _Endpoint(".people", "People")
+    companies = _Endpoint(".companies", "Companies")
+    timeline = _Endpoint(".timeline", "Timeline")
+    webhooks = _Endpoint(".webhooks", "Webhooks")
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         oauth_token: Optional[str] = None,
         base_url: Optional[str] = None,
         timeout: int = 30,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        json_codec: Union[str, JSONCodec, None] = None,
+        compress_requests: Optional[str] = None,
+        compression_threshold: int = 1024,
+        connect_timeout: Optional[float] = None,
+        cache: Optional[ResponseCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        middleware: Optional[List[Middleware]] = None,
+        tracing: bool = False,
+        request_logger: Optional[RequestLogger] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        token_provider: Optional[TokenProvider] = None,
     ):
         """
-        Initialize the Cloze client.
+        Initialize credentials and policies.
+
+        Endpoint namespaces (``people``, ``companies``, ...) are built on
+        first access.
 
         Args:
             api_key: API key for authentication (can be used as query param or bearer token)
             oauth_token: OAuth 2.0 access token
             base_url: Custom base URL (defaults to https://api.cloze.com)
             timeout: Request timeout in seconds (default: 30)
+            retry_policy: Optional RetryPolicy for transient failures (default: no retries)
+            rate_limiter: Optional RateLimiter (or FileRateLimiter) consulted before
+                every request, including retries
+            json_codec: JSON codec for request bodies and responses: a JSONCodec,
+                'json', 'orjson', 'msgspec' or 'auto' (fastest installed). None
+                leaves encoding and decoding to the HTTP library (default: None)
+            compress_requests: Compress JSON request bodies with 'gzip' or 'zstd'
+                (default: None, no compression)
+            compression_threshold: Minimum body size in bytes to compress
+                (default: 1024)
+            connect_timeout: Seconds allowed to establish a connection; ``timeout``
+                then only bounds waiting for the response (default: None, use
+                ``timeout`` for both)
+            cache: Optional ResponseCache for GET responses (default: None)
+            circuit_breaker: Optional CircuitBreaker that fails fast on
+                endpoint groups that keep failing (default: None)
+            hedge_policy: Optional HedgePolicy sending a duplicate of slow
+                GET requests to selected endpoints (default: None)
+            middleware: Middleware run around every request, outermost first;
+                more can be appended to ``client.middleware`` (default: None)
+            tracing: If True and opentelemetry is installed, report a span for
+                every API call and page iteration (default: False)
+            request_logger: Optional RequestLogger writing sampled, redacted
+                request and response records to the ``cloze_sdk`` logger
+                (default: None)
+            concurrency_limiter: Optional ConcurrencyLimiter adapting the
+                number of requests in flight to latency and 429 responses; may
+                be shared by several clients (default: None)
+            token_provider: Optional TokenProvider supplying expiring OAuth
+                tokens, used instead of ``api_key`` and ``oauth_token``. A
+                request answered with 401 is replayed once with a refreshed
+                token (default: None)
         """
-        if not api_key and not oauth_token:
-            raise ValueError("Either api_key or oauth_token must be provided")
+        if not api_key and not oauth_token and token_provider is None:
+            raise ValueError(
+                "Either api_key, oauth_token or token_provider must be provided"
+            )
 
         self.api_key = api_key
         self.oauth_token = oauth_token
+        self.token_provider = token_provider
         self.base_url = base_url or self.BASE_URL
         self.timeout = timeout
-
-        self.session = requests.Session()
-        self._setup_session()
-
-        # Initialize endpoint modules
-        from .account import Account
-        from .analytics import Analytics
-        from .companies import Companies
-        from .people import People
-        from .projects import Projects
-        from .team import Team
-        from .timeline import Timeline
-        from .webhooks import Webhooks
-
-        self.analytics = Analytics(self)
-        self.team = Team(self)
-        self.account = Account(self)
-        self.projects = Projects(self)
-        self.people = People(self)
-        self.companies = Companies(self)
-        self.timeline = Timeline(self)
-        self.webhooks = Webhooks(self)
-
-    def _setup_session(self):
-        """Configure the requests session with default headers."""
-        self.session.headers.update(
-            {
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-                "User-Agent": f"cloze-sdk-python/{__import__('cloze_sdk').__version__}",
-            }
+        self.connect_timeout = connect_timeout
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.circuit_breaker = circuit_breaker
+        self.hedge_policy = hedge_policy
+        self.middleware: List[Middleware] = list(middleware or [])
+        self.request_logger = request_logger
+        self._tracer = get_tracer() if tracing else None
+        if self._tracer is not None:
+            # Outermost, so the span covers the other middleware too
+            self.middleware.insert(0, TracingMiddleware(self._tracer))
+        self.json_codec = get_codec(json_codec) if json_codec is not None else None
+        _live_clients.add(self)
+        self.metrics = ClientMetrics()
+        self.concurrency_limiter = concurrency_limiter
+        if concurrency_limiter is not None:
+            self.metrics.gauge("concurrency_limit", lambda: concurrency_limiter.limit)
+            self.metrics.gauge(
+                "concurrency_in_flight", lambda: concurrency_limiter.stats()["in_flight"]
+            )
+        self._compressor = (
+            RequestCompressor(compress_requests, compression_threshold)
+            if compress_requests is not None
+            else None
+        )
+        # Keyword the transport expects for a pre-encoded body
+        self._raw_body_kwarg = "data"
+        # Builds the transport's timeout value from (connect, read) seconds
+        self._split_timeout: Callable[[float, float], Any] = (
+            lambda connect, read: (connect, read)
         )
+        # Rate-limit budgets are keyed by a digest so secrets never reach state files
+        credential = oauth_token or api_key or f"token-provider:{id(token_provider)}"
+        self._credential_key = hashlib.sha256(
+            credential.encode("utf-8")
+        ).hexdigest()[:16]
+
+    def _default_headers(self) -> Dict[str, str]:
+        """Build the default headers sent with every request."""
+        headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "User-Agent": USER_AGENT,
+        }
 
         # Set authentication
         if self.oauth_token:
-            self.session.headers["Authorization"] = f"Bearer {self.oauth_token}"
+            headers["Authorization"] = f"Bearer {self.oauth_token}"
         elif self.api_key:
             # Use bearer token format by default
-            self.session.headers["Authorization"] = f"Bearer {self.api_key}"
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
 
-    def _make_request(
+    def _after_fork(self) -> None:
+        """
+        Rebuild the transport in a forked child; see _reset_clients_after_fork().
+
+        A client created before fork() (e.g. at import time under gunicorn or
+        Celery prefork) would otherwise share pooled sockets, and a SQLite
+        cache connection, with its parent, and count the parent's requests in
+        flight against its concurrency limit.
+        """
+        self._reset_transport()
+        if self.cache is not None:
+            self.cache.backend.reset_after_fork()
+        if self.concurrency_limiter is not None:
+            self.concurrency_limiter.reset_after_fork()
+
+    def _reset_transport(self) -> None:
+        """Replace connections and worker state inherited from a parent process."""
+
+    def _authorize(self, request_kwargs: Dict[str, Any], token: str) -> None:
+        """Send a request with a token from the token provider."""
+        headers = dict(request_kwargs.get("headers") or {})
+        headers["Authorization"] = f"Bearer {token}"
+        request_kwargs["headers"] = headers
+
+    def _prepare_request(
         self,
         method: str,
         endpoint: str,
@@ -104,7 +307,7 @@ class ClozeClient:
         use_api_key_param: bool = False,
     ) -> Dict[str, Any]:
         """
-        Make an HTTP request to the Cloze API.
+        Build keyword arguments for the transport's request method.
 
         Args:
             method: HTTP method (GET, POST, DELETE, etc.)
@@ -115,12 +318,7 @@ class ClozeClient:
             use_api_key_param: If True, add api_key as query parameter instead of header
 
         Returns:
-            Response JSON data
-
-        Raises:
-            ClozeAPIError: For API errors
-            ClozeAuthenticationError: For authentication errors
-            ClozeRateLimitError: For rate limit errors
+            Request keyword arguments
         """
         url = f"{self.base_url}{endpoint}"
 
@@ -134,38 +332,254 @@ class ClozeClient:
             "method": method,
             "url": url,
             "params": request_params,
-            "timeout": self.timeout,
+            "timeout": self._request_timeout(),
         }
 
         if json_data:
-            request_kwargs["json"] = json_data
+            if self.json_codec is None and self._compressor is None:
+                request_kwargs["json"] = json_data
+            else:
+                codec = self.json_codec or _STDLIB_CODEC
+                started = time.thread_time()
+                body = codec.dumps(json_data)
+                self.metrics.observe("encode", time.thread_time() - started)
+                if self._compressor is not None:
+                    body = self._compress_body(endpoint, body, request_kwargs)
+                request_kwargs[self._raw_body_kwarg] = body
         elif data:
             request_kwargs["data"] = data
 
+        return request_kwargs
+
+    def _cache_key(
+        self, method: str, endpoint: str, params: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """
+        Get the key a response is cached under.
+
+        Keys include a digest of the credential, so clients with different
+        credentials sharing a cache backend never see each other's entries.
+
+        Returns:
+            Cache key, or None if the request is not cacheable
+        """
+        if self.cache is None or method != "GET" or self.cache.ttl_for(endpoint) is None:
+            return None
+        return f"{self._credential_key}:{request_key(method, endpoint, params)}"
+
+    def _request_timeout(self, budget: Optional[float] = None) -> Any:
+        """
+        Build the transport timeout for one request.
+
+        Args:
+            budget: Seconds left on the current deadline, capping both timeouts
+
+        Returns:
+            ``timeout`` as is when neither a connect timeout nor a budget
+            applies, otherwise a transport-specific (connect, read) timeout
+        """
+        if self.connect_timeout is None and budget is None:
+            return self.timeout
+        connect = self.timeout if self.connect_timeout is None else self.connect_timeout
+        read = self.timeout
+        if budget is not None:
+            connect = min(connect, budget)
+            read = min(read, budget)
+        return self._split_timeout(connect, read)
+
+    def _deadline_budget(self, method: str, endpoint: str) -> Optional[float]:
+        """
+        Get the time left for a request on the current deadline.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+
+        Returns:
+            Seconds left, or None without a deadline
+
+        Raises:
+            ClozeTimeoutError: If the deadline has already passed
+        """
+        budget = remaining()
+        if budget is not None and budget <= 0:
+            raise ClozeTimeoutError(f"Deadline exceeded before {method} {endpoint}")
+        return budget
+
+    def _fits_deadline(self, delay: float) -> bool:
+        """Check whether waiting ``delay`` seconds leaves time before the deadline."""
+        budget = remaining()
+        return budget is None or delay < budget
+
+    def _check_rate_limit_wait(
+        self, wait: float, budget: Optional[float], endpoint: str
+    ) -> None:
+        """
+        Raise ClozeTimeoutError if a rate-limit wait would overrun the deadline.
+
+        ``budget`` is the remaining() the token was reserved with, so this
+        raises exactly when the limiter declined to reserve it.
+        """
+        if wait > 0 and budget is not None and wait >= budget:
+            raise ClozeTimeoutError(
+                f"Deadline exceeded waiting {wait:.2f}s for rate limit on {endpoint}"
+            )
+
+    def _release_slot(
+        self, endpoint: str, started: Optional[float] = None, response: Any = None
+    ) -> None:
+        """
+        Return a concurrency slot, reporting the attempt's outcome.
+
+        Only responses below 500 carry a latency sample; 429 cuts the limit.
+        Without ``started`` the slot is returned without a sample.
+        """
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            return
+        if started is None:
+            limiter.release(endpoint, time.monotonic())
+            return
+        status = response.status_code if response is not None else None
+        latency = None
+        if status is not None and status < 500 and status != 429:
+            latency = time.monotonic() - started
+        limiter.release(endpoint, started, latency, rate_limited=status == 429)
+
+    def _slot_timeout(self, method: str, endpoint: str) -> ClozeTimeoutError:
+        """Build the error for a deadline passing while waiting for a slot."""
+        return ClozeTimeoutError(
+            f"Deadline exceeded waiting for a concurrency slot for {method} {endpoint}"
+        )
+
+    def _circuit_admit(self, endpoint: str) -> None:
+        """Fail fast if the endpoint's circuit is open."""
+        if self.circuit_breaker is None:
+            return
         try:
-            response = self.session.request(**request_kwargs)  # type: ignore[arg-type]
-            return self._handle_response(response)
-        except requests.exceptions.RequestException as e:
-            raise ClozeAPIError(f"Request failed: {str(e)}")
+            self.circuit_breaker.before_request(endpoint)
+        except ClozeCircuitOpenError:
+            self.metrics.increment("circuit_open_rejections", endpoint=endpoint)
+            raise
+
+    def _circuit_record(self, endpoint: str, started: float, response: Any = None) -> None:
+        """Report a response, or a transport failure if None, to the circuit breaker."""
+        if self.circuit_breaker is None:
+            return
+        if response is None or response.status_code >= 500:
+            self.circuit_breaker.record_failure(endpoint)
+        else:
+            self.circuit_breaker.record_success(endpoint, started)
+
+    def _after_attempt(
+        self, method: str, endpoint: str, started: float, response: Any = None
+    ) -> None:
+        """Record an HTTP attempt's outcome; a None response means the transport failed."""
+        status = response.status_code if response is not None else None
+        self.metrics.observe_request(method, endpoint, time.monotonic() - started, status)
+        context = _current.get()
+        if context is not None:
+            context.attempts += 1
+            context.status = status
+        if status == 429:
+            self.metrics.increment_request(method, endpoint, "rate_limited")
+        self._circuit_record(endpoint, started, response)
+        self._release_slot(endpoint, started, response)
+
+    def _log_attempt(
+        self,
+        request_kwargs: Dict[str, Any],
+        attempt: int,
+        started: float,
+        response: Any = None,
+        error: Optional[BaseException] = None,
+        stream: bool = False,
+    ) -> None:
+        """Write an attempt of a sampled request to the request logger."""
+        self.request_logger.log_attempt(  # type: ignore[union-attr]
+            request_kwargs,
+            getattr(self.session, "headers", {}),
+            attempt,
+            time.monotonic() - started,
+            response=response,
+            error=error,
+            stream=stream,
+        )
+
+    def _transport_error(self, error: BaseException) -> ClozeAPIError:
+        """Wrap a transport exception, mapping timeouts to ClozeTimeoutError."""
+        message = f"Request failed: {str(error)}"
+        if _is_timeout(error):
+            return ClozeTimeoutError(message)
+        return ClozeAPIError(message)
 
-    def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
+    def _paginate(
+        self,
+        fetch: Callable[..., Any],
+        record_key: str,
+        params: Dict[str, Any],
+        cursor: bool,
+        timeout: Optional[float] = None,
+    ) -> PageIterator:
         """
-        Handle API response and raise appropriate exceptions.
+        Iterate over the records of every page of a find or feed query.
 
         Args:
-            response: Requests response object
+            fetch: Endpoint method returning one page
+            record_key: Response field holding the records
+            params: Keyword arguments for the first fetch
+            cursor: If True, follow ``cursor``; otherwise advance ``pagenumber``
+            timeout: Seconds allowed for the whole iteration
 
         Returns:
-            Response JSON data
+            PageIterator yielding records
+        """
+        return PageIterator(fetch, record_key, params, cursor, timeout, self._tracer)
+
+    def _compress_body(
+        self, endpoint: str, body: bytes, request_kwargs: Dict[str, Any]
+    ) -> bytes:
+        """
+        Compress an encoded body and record the bytes saved.
+
+        Args:
+            endpoint: API endpoint path, used to attribute the savings
+            body: Encoded request body
+            request_kwargs: Request keyword arguments to add Content-Encoding to
+
+        Returns:
+            Body to send
+        """
+        compressor = self._compressor
+        assert compressor is not None
+        compressed = compressor.compress(body)
+        self.metrics.increment("request_body_bytes", len(body), endpoint=endpoint)
+        if compressed is None:
+            return body
+        request_kwargs["headers"] = {"Content-Encoding": compressor.encoding}
+        self.metrics.increment(
+            "compression_saved_bytes", len(body) - len(compressed), endpoint=endpoint
+        )
+        return compressed
+
+    def _check_status(self, response: Any) -> None:
+        """
+        Raise for HTTP statuses that never carry a usable body.
+
+        Args:
+            response: Response object (requests or httpx)
 
         Raises:
-            ClozeAPIError: For API errors
             ClozeAuthenticationError: For authentication errors
             ClozeRateLimitError: For rate limit errors
         """
         # Handle rate limiting
         if response.status_code == 429:
-            raise ClozeRateLimitError("Rate limit exceeded", response=response)
+            raise ClozeRateLimitError(
+                "Rate limit exceeded",
+                response=response,
+                retry_after=parse_retry_after(getattr(response, "headers", None)),
+            )
 
         # Handle authentication errors
         if response.status_code == 401:
@@ -174,19 +588,57 @@ class ClozeClient:
                 response=response,
             )
 
+    def _record_stream_decode(self, seconds: float) -> None:
+        """Record the parse time of a completed streamed page."""
+        self.metrics.observe("decode", seconds)
+
+    def _handle_response(
+        self, response: Any, method: Optional[str] = None, endpoint: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Handle API response and raise appropriate exceptions.
+
+        Args:
+            response: Response object (requests or httpx)
+            method: HTTP method, to attribute decode time and errors to
+            endpoint: API endpoint path, to attribute decode time and errors to
+
+        Returns:
+            Response JSON data
+
+        Raises:
+            ClozeAPIError: For API errors
+            ClozeAuthenticationError: For authentication errors
+            ClozeRateLimitError: For rate limit errors
+        """
+        self._check_status(response)
+
         # Parse JSON response
+        started = time.thread_time()
         try:
-            data = response.json()
+            if self.json_codec is not None:
+                data = self.json_codec.loads(response.content)
+            else:
+                data = response.json()
         except ValueError:
             # If response is not JSON, raise with status code
             raise ClozeAPIError(
                 f"Invalid response format. Status: {response.status_code}",
                 response=response,
             )
+        finally:
+            elapsed = time.thread_time() - started
+            self.metrics.observe("decode", elapsed)
+            if endpoint is not None:
+                self.metrics.increment_request(
+                    method, endpoint, "decode_seconds", elapsed  # type: ignore[arg-type]
+                )
 
         # Check for API errors in response
         errorcode = data.get("errorcode", 0)
         if errorcode != 0:
+            if endpoint is not None:
+                self.metrics.record_error(method, endpoint, errorcode)  # type: ignore
             message = data.get("message", "Unknown API error")
             raise ClozeAPIError(
                 f"API error: {message}", errorcode=errorcode, response=response
@@ -194,3 +646,699 @@ class ClozeClient:
 
         # Return successful response
         return data
+
+    def _record_sizes(self, method: str, endpoint: str, response: Any) -> None:
+        """Record the request and response body sizes of a completed request."""
+        content = getattr(response, "content", None)
+        context = _current.get()
+        if isinstance(content, bytes):
+            self.metrics.increment_request(method, endpoint, "response_bytes", len(content))
+            if context is not None:
+                context.response_bytes = len(content)
+        request = getattr(response, "request", None)
+        # requests exposes the sent body as .body, httpx as .content
+        body = getattr(request, "body", None) or getattr(request, "content", None)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if isinstance(body, bytes) and body:
+            self.metrics.increment_request(method, endpoint, "request_bytes", len(body))
+            if context is not None:
+                context.request_bytes = len(body)
+
+    def _complete(
+        self,
+        method: str,
+        endpoint: str,
+        response: Any,
+        cache_key: Optional[str],
+        stale: Optional[CacheEntry],
+    ) -> Dict[str, Any]:
+        """
+        Decode a response, serving 304 replies from the cache and caching the rest.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            response: Response object (requests or httpx)
+            cache_key: Cache key, or None if the request is not cacheable
+            stale: Expired entry the request revalidates, if any
+
+        Returns:
+            Response JSON data
+        """
+        if stale is not None and response.status_code == 304:
+            return self.cache.revalidated(cache_key, endpoint, stale)  # type: ignore
+        self._record_sizes(method, endpoint, response)
+        result = self._handle_response(response, method, endpoint)
+        if cache_key is not None:
+            self.cache.set(  # type: ignore[union-attr]
+                cache_key, endpoint, result, response=response, stale=stale
+            )
+        elif self.cache is not None and method != "GET":
+            # A write to /v1/people/update makes cached /v1/people/* reads
+            # stale; keys are "<credential>:GET <endpoint>?<params>"
+            parent = endpoint.rsplit("/", 1)[0]
+            self.cache.invalidate(f"{self._credential_key}:GET {parent}/")
+        return result
+
+
+class ClozeClient(BaseClozeClient):
+    """Main client for interacting with the Cloze API."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        oauth_token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: int = 30,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        tcp_keepalive: Optional[float] = None,
+        http2: bool = False,
+        json_codec: Union[str, JSONCodec, None] = None,
+        compress_requests: Optional[str] = None,
+        compression_threshold: int = 1024,
+        connect_timeout: Optional[float] = None,
+        single_flight: bool = False,
+        cache: Optional[ResponseCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        middleware: Optional[List[Middleware]] = None,
+        tracing: bool = False,
+        request_logger: Optional[RequestLogger] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        token_provider: Optional[TokenProvider] = None,
+        adapter: Optional["PoolingHTTPAdapter"] = None,
+    ):
+        """
+        Initialize the Cloze client.
+
+        Args:
+            api_key: API key for authentication (can be used as query param or bearer token)
+            oauth_token: OAuth 2.0 access token
+            base_url: Custom base URL (defaults to https://api.cloze.com)
+            timeout: Request timeout in seconds (default: 30)
+            retry_policy: Optional RetryPolicy for transient failures (default: no retries)
+            rate_limiter: Optional RateLimiter (or FileRateLimiter) consulted before
+                every request, including retries
+            pool_connections: Number of per-host connection pools to cache (default: 10)
+            pool_maxsize: Maximum pooled connections per host; size this to the
+                number of threads sharing the client (default: 10)
+            pool_block: If True, wait for a free pooled connection instead of
+                opening a throwaway one when the pool is exhausted (default: False)
+            tcp_keepalive: Idle seconds before TCP keep-alive probes are sent on
+                pooled connections (default: None, OS defaults)
+            http2: If True, use an httpx transport that multiplexes concurrent
+                requests over HTTP/2 and falls back to HTTP/1.1 when the server
+                does not negotiate it. Requires ``cloze-sdk[http2]``.
+                ``pool_maxsize`` then caps idle connections, and also open
+                connections if ``pool_block`` is set; ``tcp_keepalive`` applies
+                to new connections. ``pool_connections`` has no httpx
+                equivalent and must be left at its default (default: False)
+            json_codec: JSON codec for request bodies and responses: a JSONCodec,
+                'json', 'orjson', 'msgspec' or 'auto' (fastest installed). None
+                leaves encoding and decoding to requests (default: None)
+            compress_requests: Compress JSON request bodies with 'gzip' or 'zstd'
+                (default: None, no compression)
+            compression_threshold: Minimum body size in bytes to compress
+                (default: 1024)
+            connect_timeout: Seconds allowed to establish a connection; ``timeout``
+                then only bounds waiting for the response (default: None, use
+                ``timeout`` for both)
+            single_flight: If True, concurrent identical GET requests (same
+                endpoint and parameters) share one API call and the same
+                decoded result object (default: False)
+            cache: Optional ResponseCache for GET responses (default: None)
+            circuit_breaker: Optional CircuitBreaker that fails fast on
+                endpoint groups that keep failing (default: None)
+            hedge_policy: Optional HedgePolicy sending a duplicate of slow
+                GET requests to selected endpoints (default: None)
+            middleware: Middleware run around every request, outermost first;
+                more can be appended to ``client.middleware`` (default: None)
+            tracing: If True and opentelemetry is installed, report a span for
+                every API call and page iteration (default: False)
+            request_logger: Optional RequestLogger writing sampled, redacted
+                request and response records to the ``cloze_sdk`` logger
+                (default: None)
+            concurrency_limiter: Optional ConcurrencyLimiter adapting the
+                number of requests in flight to latency and 429 responses; may
+                be shared by several clients (default: None)
+            token_provider: Optional TokenProvider supplying expiring OAuth
+                tokens, used instead of ``api_key`` and ``oauth_token``. A
+                request answered with 401 is replayed once with a refreshed
+                token (default: None)
+            adapter: PoolingHTTPAdapter to send through, shared with other
+                clients; the ``pool_*`` and ``tcp_keepalive`` settings are then
+                ignored. Not used with ``http2`` (default: None, create one)
+        """
+        super().__init__(
+            api_key=api_key,
+            oauth_token=oauth_token,
+            base_url=base_url,
+            timeout=timeout,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
+            compress_requests=compress_requests,
+            compression_threshold=compression_threshold,
+            connect_timeout=connect_timeout,
+            cache=cache,
+            circuit_breaker=circuit_breaker,
+            hedge_policy=hedge_policy,
+            middleware=middleware,
+            tracing=tracing,
+            request_logger=request_logger,
+            concurrency_limiter=concurrency_limiter,
+            token_provider=token_provider,
+        )
+
+        self.http2 = http2
+        self._adapter: Optional["PoolingHTTPAdapter"] = None
+        self._flights = SingleFlight() if single_flight else None
+        # Hedges run on at most pool_maxsize threads; primaries on the caller's
+        self._hedge_workers = pool_maxsize
+        self._hedge_executor: Any = None
+        self._hedge_timer: Optional[HedgeTimer] = None
+        self._hedge_lock = threading.Lock()
+
+        # HTTP libraries are imported here rather than at module load so that
+        # importing cloze_sdk stays cheap for short-lived processes
+        if http2:
+            import httpx
+
+            from .transport import (create_http2_session,
+                                    keepalive_socket_options)
+
+            if pool_connections != 10:
+                raise ValueError(
+                    "pool_connections cannot be used with http2=True; httpx "
+                    "keeps one pool for all hosts"
+                )
+            # Without pool_block urllib3 opens extra connections past the pool
+            # and discards them; an unlimited httpx pool keeping pool_maxsize
+            # idle connections behaves the same way
+            self._http2_options = {
+                "max_connections": pool_maxsize if pool_block else None,
+                "max_keepalive_connections": pool_maxsize,
+                "socket_options": (
+                    keepalive_socket_options(tcp_keepalive)
+                    if tcp_keepalive is not None
+                    else None
+                ),
+            }
+            self.session = create_http2_session(
+                self._default_headers(), **self._http2_options
+            )
+            self._transport_errors: Tuple[Type[BaseException], ...] = (
+                httpx.HTTPError,
+            )
+            self._raw_body_kwarg = "content"
+            self._split_timeout = lambda connect, read: httpx.Timeout(
+                read, connect=connect
+            )
+            return
+
+        import requests
+
+        from .transport import PoolingHTTPAdapter
+
+        self._transport_errors = (requests.exceptions.RequestException,)
+        self.session = requests.Session()
+        if adapter is None:
+            adapter = PoolingHTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                tcp_keepalive=tcp_keepalive,
+            )
+        self._adapter = adapter
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self._setup_session()
+
+    def _reset_transport(self) -> None:
+        """Replace connections and worker state inherited from a parent process."""
+        if self._adapter is not None:
+            self._adapter.reset_after_fork()
+        else:
+            from .transport import create_http2_session
+
+            # The parent's client is abandoned rather than closed, so its
+            # connections stay usable in the parent
+            self.session = create_http2_session(
+                self.session.headers,  # type: ignore[arg-type]
+                **self._http2_options,
+            )
+        # Threads of the parent, and calls they had in flight, do not exist
+        # here; one of them may have held the lock at fork time
+        self._hedge_executor = self._hedge_timer = None
+        self._hedge_lock = threading.Lock()
+        if self._flights is not None:
+            self._flights = SingleFlight()
+
+    def _setup_session(self):
+        """Configure the requests session with default headers."""
+        self.session.headers.update(self._default_headers())
+        # Advertise br/zstd only when urllib3 can decode them
+        self.session.headers["Accept-Encoding"] = requests_accept_encoding()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool statistics.
+
+        A growing ``saturated`` count means threads are waiting for (or
+        discarding) connections and ``pool_maxsize`` should be raised.
+
+        Returns:
+            Dictionary with pool size, in-flight, peak and saturation counts;
+            empty for the HTTP/2 transport, which multiplexes instead of pooling
+        """
+        if self._adapter is None:
+            return {}
+        return self._adapter.stats()
+
+    def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        use_api_key_param: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Make an HTTP request to the Cloze API.
+
+        Args:
+            method: HTTP method (GET, POST, DELETE, etc.)
+            endpoint: API endpoint path (e.g., '/v1/user/profile')
+            params: Query parameters
+            data: Form data
+            json_data: JSON body data
+            use_api_key_param: If True, add api_key as query parameter instead of header
+
+        Returns:
+            Response JSON data
+
+        Raises:
+            ClozeAPIError: For API errors
+            ClozeAuthenticationError: For authentication errors
+            ClozeRateLimitError: For rate limit errors
+        """
+        if not self.middleware:
+            return self._dispatch(
+                method, endpoint, params, data, json_data, use_api_key_param
+            )
+
+        context = RequestContext(
+            method, endpoint, params, json_data if json_data is not None else data
+        )
+        try:
+            for middleware in self.middleware:
+                middleware.before_request(context)
+            if json_data is not None:
+                json_data = context.body
+            else:
+                data = context.body
+            token = _current.set(context)
+            try:
+                context.result = self._dispatch(
+                    method, endpoint, context.params, data, json_data, use_api_key_param
+                )
+            finally:
+                _current.reset(token)
+        except Exception as e:
+            self._end_call(context, e)
+            raise
+        self._end_call(context)
+        return context.result  # type: ignore[return-value]
+
+    def _end_call(
+        self, context: RequestContext, error: Optional[BaseException] = None
+    ) -> None:
+        """Run the after_response, or on_error, hooks of a finished call."""
+        context.elapsed = time.monotonic() - context.started_at
+        if error is None:
+            for middleware in reversed(self.middleware):
+                middleware.after_response(context)
+            return
+        context.error = error
+        for middleware in reversed(self.middleware):
+            middleware.on_error(context)
+
+    def _dispatch(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        use_api_key_param: bool,
+    ) -> Dict[str, Any]:
+        """Serve a request from the cache or the API, without middleware."""
+        cache_key = self._cache_key(method, endpoint, params)
+        stale = None
+        if cache_key is not None:
+            cached, stale = self.cache.lookup(cache_key)  # type: ignore[union-attr]
+            if cached is not None:
+                return cached
+
+        request_kwargs = self._prepare_request(
+            method, endpoint, params, data, json_data, use_api_key_param
+        )
+        if stale is not None:
+            request_kwargs.setdefault("headers", {}).update(
+                self.cache.conditional_headers(stale)  # type: ignore[union-attr]
+            )
+        if self._flights is not None and method == "GET":
+            result, shared = self._flights.do(
+                request_key(method, endpoint, params),
+                lambda: self._fetch(method, endpoint, request_kwargs, cache_key, stale),
+                timeout=remaining(),
+            )
+            if shared:
+                self.metrics.increment("single_flight_shared", endpoint=endpoint)
+            return result
+        return self._fetch(method, endpoint, request_kwargs, cache_key, stale)
+
+    def _fetch(
+        self,
+        method: str,
+        endpoint: str,
+        request_kwargs: Dict[str, Any],
+        cache_key: Optional[str] = None,
+        stale: Optional[CacheEntry] = None,
+    ) -> Dict[str, Any]:
+        """Send a prepared request, decode its response and cache it if keyed."""
+        if self.hedge_policy is not None and self.hedge_policy.applies(method, endpoint):
+            response = self._send_hedged(method, endpoint, request_kwargs)
+        else:
+            response = self._send(method, endpoint, request_kwargs)
+        return self._complete(method, endpoint, response, cache_key, stale)
+
+    def _send_hedged(
+        self, method: str, endpoint: str, request_kwargs: Dict[str, Any]
+    ) -> Any:
+        """
+        Send a request, racing a duplicate against it if it is slow.
+
+        The first copy is sent on the caller's thread. If it is still waiting
+        after the hedge delay, the duplicate is sent from a pool of at most
+        ``pool_maxsize`` threads. The first successful response wins: a
+        winning hedge interrupts the first copy's read, and a losing hedge is
+        cancelled if it has not started or has its response closed. A 5xx or
+        429 response does not win; the other copy is waited for instead.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            request_kwargs: Keyword arguments from _prepare_request()
+
+        Returns:
+            Transport response object
+        """
+        import contextvars
+        from concurrent.futures import ThreadPoolExecutor
+
+        policy = self.hedge_policy
+        assert policy is not None
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                # The timer is set first, so a thread seeing the executor
+                # without the lock also sees the timer
+                if self._hedge_executor is None:
+                    self._hedge_timer = HedgeTimer()
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=self._hedge_workers,
+                        thread_name_prefix="cloze-hedge",
+                    )
+        executor, timer = self._hedge_executor, self._hedge_timer
+        assert timer is not None
+
+        # The hedge gets its own kwargs (the timeout is rewritten per attempt)
+        # and a copy of the caller's context, so the caller's deadline applies
+        hedge_kwargs = dict(request_kwargs)
+        context = contextvars.copy_context()
+        interrupt = Interrupt()
+        lock = threading.Lock()
+        hedge: Any = None
+        finished = False
+
+        def won(future: Any) -> None:
+            if (
+                not future.cancelled()
+                and future.exception() is None
+                and can_win(future.result())
+            ):
+                interrupt.fire()
+
+        def launch() -> None:
+            nonlocal hedge
+            with lock:
+                if finished or not policy.try_hedge():
+                    return
+                hedge = executor.submit(
+                    context.run, self._send, method, endpoint, hedge_kwargs
+                )
+            self.metrics.increment("hedges_sent", endpoint=endpoint)
+            hedge.add_done_callback(won)
+
+        policy.start()
+        started = time.monotonic()
+        call = timer.schedule(policy.delay_for(endpoint), launch)
+        token = current_interrupt.set(interrupt)
+        error: Optional[Exception] = None
+        try:
+            response = self._send(method, endpoint, request_kwargs)
+        except Exception as e:
+            error = e
+        finally:
+            current_interrupt.reset(token)
+            timer.cancel(call)
+            with lock:
+                finished = True
+
+        if error is None:
+            policy.observe(endpoint, time.monotonic() - started)
+            if hedge is None or hedge.cancel():
+                return response
+            if can_win(response):
+                hedge.add_done_callback(_close_response)
+                return response
+            # The first copy failed at the server; the hedge may yet succeed
+            if hedge.exception() is None and can_win(hedge.result()):
+                response.close()
+                self.metrics.increment("hedge_wins", endpoint=endpoint)
+                return hedge.result()
+            _close_response(hedge)
+            return response
+        # The first copy failed, or was interrupted by a successful hedge
+        if hedge is not None and hedge.exception() is None:
+            self.metrics.increment("hedge_wins", endpoint=endpoint)
+            return hedge.result()
+        raise error
+
+    def _stream_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_api_key_param: bool = False,
+    ) -> StreamedPage:
+        """
+        Make an HTTP request whose list response is parsed incrementally.
+
+        Middleware see the call like any other, except that their
+        after_response or on_error hooks run once the page has been iterated
+        or closed. Streamed responses are never cached, coalesced or hedged.
+
+        Args:
+            method: HTTP method (usually GET)
+            endpoint: API endpoint path (e.g., '/v1/people/feed')
+            params: Query parameters
+            use_api_key_param: If True, add api_key as query parameter instead of header
+
+        Returns:
+            StreamedPage yielding one record at a time
+
+        Raises:
+            ClozeAPIError: For transport errors
+            ClozeAuthenticationError: For authentication errors
+            ClozeRateLimitError: For rate limit errors
+        """
+        if not self.middleware:
+            return self._open_stream(method, endpoint, params, use_api_key_param)
+
+        context = RequestContext(method, endpoint, params, stream=True)
+
+        def finish(error: Optional[BaseException]) -> None:
+            context.response_bytes = page.bytes_read
+            self._end_call(context, error)
+
+        try:
+            for middleware in self.middleware:
+                middleware.before_request(context)
+            token = _current.set(context)
+            try:
+                page = self._open_stream(
+                    method, endpoint, context.params, use_api_key_param, finish
+                )
+            finally:
+                _current.reset(token)
+        except Exception as e:
+            self._end_call(context, e)
+            raise
+        context.result = page
+        return page
+
+    def _open_stream(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        use_api_key_param: bool,
+        on_finish: Optional[Callable[[Optional[BaseException]], None]] = None,
+    ) -> StreamedPage:
+        """Send a streamed request and wrap its response, without middleware."""
+        request_kwargs = self._prepare_request(
+            method, endpoint, params, use_api_key_param=use_api_key_param
+        )
+        response = self._send(method, endpoint, request_kwargs, stream=True)
+        try:
+            self._check_status(response)
+        except ClozeAPIError:
+            response.close()
+            raise
+
+        if self.http2:
+            chunks = response.iter_bytes(STREAM_CHUNK_SIZE)
+        else:
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        return StreamedPage(
+            chunks,
+            response=response,
+            close=response.close,
+            on_complete=self._record_stream_decode,
+            on_finish=on_finish,
+        )
+
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        request_kwargs: Dict[str, Any],
+        stream: bool = False,
+    ) -> Any:
+        """
+        Send a prepared request, applying rate limiting and retries.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            request_kwargs: Keyword arguments from _prepare_request()
+            stream: If True, return before the response body is read
+
+        Returns:
+            Transport response object
+
+        Raises:
+            ClozeAPIError: If the transport fails and retries are exhausted
+            ClozeTimeoutError: If the request times out or the deadline passes
+            ClozeCircuitOpenError: If the endpoint's circuit is open
+        """
+        policy = self.retry_policy
+        # Decided once so retries of a sampled request are logged together
+        log = self.request_logger is not None and self.request_logger.sample()
+        replayed = False
+        attempt = 0
+        while True:
+            attempt += 1
+            # Before reserving any capacity, so an open circuit fails fast
+            # without waiting for or holding a rate-limit token or a slot
+            self._circuit_admit(endpoint)
+            if self.rate_limiter is not None:
+                # A token due after the deadline is not taken, so a request
+                # that times out here leaves the budget to others
+                budget = remaining()
+                wait = self.rate_limiter.reserve(self._credential_key, endpoint, budget)
+                self._check_rate_limit_wait(wait, budget, endpoint)
+                if wait > 0:
+                    self.metrics.increment_request(method, endpoint, "rate_limit_waits")
+                    time.sleep(wait)
+            if self.concurrency_limiter is not None and not (
+                self.concurrency_limiter.acquire(remaining())
+            ):
+                raise self._slot_timeout(method, endpoint)
+            try:
+                if self.token_provider is not None:
+                    token = self.token_provider.token()
+                    self._authorize(request_kwargs, token)
+                budget = self._deadline_budget(method, endpoint)
+                if budget is not None:
+                    request_kwargs["timeout"] = self._request_timeout(budget)
+            except BaseException:
+                self._release_slot(endpoint)
+                raise
+            started = time.monotonic()
+            try:
+                if not stream:
+                    response = self.session.request(**request_kwargs)  # type: ignore[arg-type]
+                elif self.http2:
+                    response = self.session.send(
+                        self.session.build_request(**request_kwargs), stream=True
+                    )
+                else:
+                    response = self.session.request(stream=True, **request_kwargs)
+            except self._transport_errors as e:
+                interrupt = current_interrupt.get()
+                if interrupt is not None and interrupt.fired:
+                    # Cut short because a hedge won; not a failure of the API
+                    self._release_slot(endpoint)
+                    raise
+                self._after_attempt(method, endpoint, started)
+                if log:
+                    self._log_attempt(request_kwargs, attempt, started, error=e)
+                if policy is not None and policy.should_retry_exception(
+                    method, e, attempt
+                ):
+                    delay = policy.backoff(attempt)
+                    if self._fits_deadline(delay):
+                        self.metrics.increment_request(method, endpoint, "retries")
+                        time.sleep(delay)
+                        continue
+                raise self._transport_error(e)
+            except BaseException:
+                self._release_slot(endpoint)
+                raise
+
+            self._after_attempt(method, endpoint, started, response)
+            if log:
+                self._log_attempt(
+                    request_kwargs, attempt, started, response, stream=stream
+                )
+            if (
+                response.status_code == 401
+                and self.token_provider is not None
+                and not replayed
+            ):
+                # The token was revoked or expired early: refresh and replay once
+                replayed = True
+                self.token_provider.invalidate(token)
+                self.metrics.increment("auth_replays", endpoint=endpoint)
+                response.close()
+                continue
+            if policy is not None and policy.should_retry_response(
+                method, response, attempt
+            ):
+                delay = policy.delay_for_response(response, attempt)
+                if delay is not None and self._fits_deadline(delay):
+                    self.metrics.increment_request(method, endpoint, "retries")
+                    # Release the connection back to the pool before waiting
+                    response.close()
+                    time.sleep(delay)
+                    continue
+
+            return response
@@ -0,0 +1,131 @@
+"""
+Pluggable JSON codecs for request bodies and responses.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+from typing import Any, Union
+
+
+class JSONCodec:
+    """Standard library JSON codec; base class for faster codecs."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Encode an object as UTF-8 JSON.
+
+        Args:
+            obj: Object to encode
+
+        Returns:
+            Encoded bytes
+        """
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode JSON.
+
+        Args:
+            data: Encoded JSON
+
+        Returns:
+            Decoded object
+
+        Raises:
+            ValueError: If the data is not valid JSON
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec backed by orjson."""
+
+    name = "orjson"
+
+    def __init__(self):
+        """Initialize the codec, importing orjson."""
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object as UTF-8 JSON."""
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON."""
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """JSON codec backed by msgspec."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        """Initialize the codec, importing msgspec."""
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object as UTF-8 JSON."""
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON."""
+        return self._decoder.decode(data)
+
+
+_CODECS = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+
+def get_codec(codec: Union[str, JSONCodec] = "auto") -> JSONCodec:
+    """
+    Resolve a codec by name.
+
+    Args:
+        codec: Codec instance, 'json', 'orjson', 'msgspec', or 'auto' to pick
+            the fastest installed codec (orjson, then msgspec, then stdlib)
+
+    Returns:
+        Codec instance
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: If a named codec's package is not installed
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec == "auto":
+        for name in ("orjson", "msgspec"):
+            try:
+                return _CODECS[name]()
+            except ImportError:
+                continue
+        return JSONCodec()
+    if codec not in _CODECS:
+        raise ValueError(f"Unknown JSON codec: {codec}")
+    return _CODECS[codec]()
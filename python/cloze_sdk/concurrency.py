@@ -0,0 +1,247 @@
+"""
+Adaptive concurrency limiting for Cloze API requests.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class ConcurrencyLimiter:
+    """
+    AIMD limit on the number of requests in flight.
+
+    The limit grows by one for roughly every ``limit`` successful requests
+    while latency stays near its baseline, and is multiplied by ``backoff``
+    when a request is rate limited (HTTP 429) or the recent latency of an
+    endpoint rises to ``latency_tolerance`` times its baseline. Requests that
+    were already in flight when the limit was cut do not cut it again, so a
+    burst of 429s backs off once.
+
+    Recent latency is an average over roughly the last ``1 / smoothing``
+    samples and the baseline one over ten times as many, so a few slow
+    responses in a noisy latency distribution do not read as overload.
+
+    Baselines are kept per endpoint, since a feed page and a single lookup
+    have very different normal latencies. A limiter may be shared by several
+    clients, and works for threads and asyncio tasks alike.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.1,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Requests allowed in flight at first (default: 8)
+            min_limit: Lowest the limit is cut to (default: 1)
+            max_limit: Highest the limit grows to (default: 100)
+            backoff: Factor the limit is multiplied by on overload (default: 0.5)
+            latency_tolerance: Ratio of recent to baseline latency treated as
+                overload (default: 2.0)
+            smoothing: Weight of each new sample in the recent latency average;
+                the baseline uses a tenth of it (default: 0.1)
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0.0 < backoff < 1.0:
+            raise ValueError("backoff must be between 0.0 and 1.0")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._decreases = 0
+        self._last_decrease = float("-inf")
+        # endpoint -> [baseline, recent, samples] latency in seconds
+        self._latency: Dict[str, List[float]] = {}
+        self._cond = threading.Condition()
+        self._async_waiters: List[Any] = []
+        self._pid = os.getpid()
+
+    @property
+    def limit(self) -> int:
+        """Requests currently allowed in flight."""
+        return int(self._limit)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get limiter statistics.
+
+        Returns:
+            Dictionary with the current limit, requests in flight and the
+            number of times the limit was cut
+        """
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "decreases": self._decreases,
+            }
+
+    def reset_after_fork(self) -> None:
+        """
+        Free the slots of requests in flight in the parent process, if this
+        process was forked from the one that last used the limiter.
+
+        Those requests, and the threads and tasks waiting for them, do not
+        exist in the child. The limit and latency averages are kept. Runs once
+        per process, however many clients share the limiter.
+        """
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        self._pid = pid
+        self._in_flight = 0
+        # The lock may have been held by a parent thread that does not exist here
+        self._cond = threading.Condition()
+        self._async_waiters = []
+
+    def _try_acquire(self) -> bool:
+        """Take a slot if one is free; the caller holds the lock."""
+        if self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a free slot.
+
+        Args:
+            timeout: Seconds to wait at most (default: None, no limit)
+
+        Returns:
+            True if a slot was taken, False if the timeout passed first
+        """
+        with self._cond:
+            return self._cond.wait_for(self._try_acquire, timeout)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a free slot without blocking the event loop.
+
+        Args:
+            timeout: Seconds to wait at most (default: None, no limit)
+
+        Returns:
+            True if a slot was taken, False if the timeout passed first
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            with self._cond:
+                if self._try_acquire():
+                    return True
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(
+                    waiter, None if deadline is None else max(0.0, deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                with self._cond:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+                    if self._try_acquire():
+                        return True
+                return False
+
+    def release(
+        self,
+        endpoint: str,
+        started: float,
+        latency: Optional[float] = None,
+        rate_limited: bool = False,
+    ) -> None:
+        """
+        Return a slot and adjust the limit from the request's outcome.
+
+        Args:
+            endpoint: API endpoint path
+            started: time.monotonic() when the request was sent
+            latency: Seconds the request took, or None to leave the limit alone
+                (transport failures and server errors)
+            rate_limited: True if the API answered 429
+        """
+        with self._cond:
+            in_use = self._in_flight
+            self._in_flight -= 1
+            if rate_limited:
+                self._decrease(started)
+            elif latency is not None:
+                if self._latency_rising(endpoint, latency):
+                    self._decrease(started)
+                elif in_use * 2 >= self._limit:
+                    # Grow only when the limit is being used, ~1 per window
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._wake()
+
+    def _latency_rising(self, endpoint: str, latency: float) -> bool:
+        """Fold a sample into an endpoint's averages; True if it is overloaded."""
+        averages = self._latency.get(endpoint)
+        if averages is None:
+            self._latency[endpoint] = [latency, latency, 1]
+            return False
+        baseline, recent, samples = averages
+        samples += 1
+        # Plain means until each average has seen its window's worth of
+        # samples, so neither is anchored to a first sample that was unusual.
+        # The slow baseline lets a lasting change in normal latency be
+        # accepted eventually.
+        baseline += (latency - baseline) * max(1 / samples, self.smoothing / 10)
+        recent += (latency - recent) * max(1 / samples, self.smoothing)
+        averages[:] = [baseline, recent, samples]
+        return recent > baseline * self.latency_tolerance
+
+    def _decrease(self, started: float) -> None:
+        """Cut the limit, unless the request predates the last cut."""
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        self._decreases += 1
+
+    def _wake(self) -> None:
+        """Let waiting threads and tasks retry for a slot; the caller holds the lock."""
+        self._cond.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:
+                # The waiter's event loop has been closed
+                pass
+
+
+def _resolve(waiter: Any) -> None:
+    """Wake an asyncio waiter unless it was already cancelled."""
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,87 @@
+"""
+Deadlines spanning one or more Cloze API requests.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Absolute time.monotonic() value by which the current operation must finish
+_expires_at: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar(
+    "cloze_sdk_deadline", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound every request made inside the block by a shared time budget.
+
+    Each request's connect and read timeouts are capped at the time left,
+    retries and rate-limit waits that would overrun the budget are skipped,
+    and requests started after it expires raise ClozeTimeoutError. Nested
+    deadlines can only shorten the budget. The deadline follows the current
+    thread or asyncio task.
+
+    Args:
+        seconds: Time budget in seconds; None leaves any outer deadline as is
+
+    Yields:
+        None
+    """
+    if seconds is None:
+        yield
+        return
+    with deadline_at(time.monotonic() + seconds):
+        yield
+
+
+@contextmanager
+def deadline_at(expires_at: Optional[float]) -> Iterator[None]:
+    """
+    Like deadline(), with an absolute time.monotonic() expiry.
+
+    Args:
+        expires_at: Monotonic time the budget runs out; None is a no-op
+
+    Yields:
+        None
+    """
+    current = _expires_at.get()
+    if expires_at is None or (current is not None and current <= expires_at):
+        yield
+        return
+    token = _expires_at.set(expires_at)
+    try:
+        yield
+    finally:
+        _expires_at.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Get the time left on the current deadline.
+
+    Returns:
+        Seconds left (negative once expired), or None without a deadline
+    """
+    expires_at = _expires_at.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
@@ -0,0 +1,841 @@
+"""
+Local stand-in for the Cloze API, for load and soak testing.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import base64
+import bisect
+import gzip
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from .ratelimit import RateLimiter, _take
+
+# Error codes returned in the body; 11 is what the API answers when a
+# record carries no identifier it can be matched on
+NOT_FOUND = 1
+NO_IDENTIFIERS = 11
+
+# Change time of generated record 0, in UTC milliseconds
+EPOCH_MS = 1_700_000_000_000
+
+# Records per feed page and per page of message opens unless asked otherwise
+FEED_PAGE_SIZE = 100
+OPENS_PAGE_SIZE = 100
+
+# Response bodies at least this large are gzip-compressed when accepted
+COMPRESSION_THRESHOLD = 1024
+
+SEGMENTS = ("customer", "partner", "supplier", "investor", "advisor")
+STAGES = ("lead", "future", "current", "past", "out")
+
+Response = Tuple[int, Dict[str, str], Any]
+
+
+def lognormal_latency(
+    median: float, p99: float, seed: Optional[int] = None
+) -> Callable[[str], float]:
+    """
+    Build a log-normal latency distribution, the usual shape of API latency.
+
+    Args:
+        median: Median latency in seconds
+        p99: 99th percentile latency in seconds, at least ``median``
+        seed: Optional seed for reproducible samples
+
+    Returns:
+        Function taking the endpoint path and returning seconds to wait
+    """
+    if median <= 0 or p99 < median:
+        raise ValueError("median must be positive and p99 at least median")
+    mu = math.log(median)
+    # 2.326 is the standard normal's 99th percentile
+    sigma = math.log(p99 / median) / 2.326
+    rng = random.Random(seed)
+    return lambda endpoint: rng.lognormvariate(mu, sigma)
+
+
+class _Collection:
+    """
+    People, companies or projects, generated on demand from their index.
+
+    Only created, updated and deleted records are held in memory, so
+    millions of records cost next to nothing. Records are found in index
+    order; the feed returns them in change order, i.e. every generated
+    record followed by each created or updated one as it changed.
+    """
+
+    def __init__(self, kind: str, prefix: str, size: int):
+        self.kind = kind
+        self.prefix = prefix
+        self.initial = size
+        self.size = size
+        self._changed: Dict[int, Dict[str, Any]] = {}
+        self._deleted: List[int] = []
+        self._deleted_set: Set[int] = set()
+        self._identifiers: Dict[str, int] = {}
+        self._changelog: List[int] = []
+        # Latest changelog position of each changed record
+        self._logged: Dict[int, int] = {}
+        patterns = [rf"{prefix.lower()}(\d+)"]
+        if kind == "person":
+            patterns.append(r"person(\d+)@example\.com")
+        elif kind == "company":
+            patterns.append(r"company(\d+)\.example\.com")
+        self._generated = re.compile("^(?:%s)$" % "|".join(patterns))
+        self._lock = threading.Lock()
+
+    def generate(self, index: int) -> Dict[str, Any]:
+        """Build generated record ``index``."""
+        record: Dict[str, Any] = {
+            "direct": f"{self.prefix}{index}",
+            "name": f"{self.kind.title()} {index}",
+            "segment": SEGMENTS[index % len(SEGMENTS)],
+            "stage": STAGES[index // len(SEGMENTS) % len(STAGES)],
+            "lastChanged": EPOCH_MS + index * 1000,
+        }
+        if self.kind == "person":
+            record["first"], record["last"] = "Person", str(index)
+            record["emails"] = [{"value": f"person{index}@example.com"}]
+        elif self.kind == "company":
+            record["domains"] = [f"company{index}.example.com"]
+        else:
+            record["segment"] = "project"
+        return record
+
+    def identifiers(self, record: Dict[str, Any]) -> List[str]:
+        """Identifiers a record can be looked up by."""
+        keys = [
+            record[name] for name in ("direct", "email", "domain") if record.get(name)
+        ]
+        for name in ("emails", "phones", "domains"):
+            for value in record.get(name) or []:
+                keys.append(value.get("value") if isinstance(value, dict) else value)
+        for link in record.get("appLinks") or []:
+            if link.get("uniqueid"):
+                keys.append(link["uniqueid"])
+        return [str(key).lower() for key in keys if key]
+
+    def _locate(self, identifier: str) -> Optional[int]:
+        """Find the index of a live record; the caller holds the lock."""
+        identifier = identifier.lower()
+        index = self._identifiers.get(identifier)
+        if index is None:
+            match = self._generated.match(identifier)
+            if match is not None:
+                number = int(next(group for group in match.groups() if group))
+                if number < self.initial:
+                    index = number
+        if index is None or index in self._deleted_set:
+            return None
+        return index
+
+    def _record(self, index: int) -> Dict[str, Any]:
+        """Get a live record by index; the caller holds the lock."""
+        record = self._changed.get(index)
+        return record if record is not None else self.generate(index)
+
+    def get(self, identifier: str) -> Optional[Dict[str, Any]]:
+        """Get a record by identifier, or None."""
+        with self._lock:
+            index = self._locate(identifier)
+            return None if index is None else self._record(index)
+
+    def upsert(self, data: Dict[str, Any], create: bool) -> Optional[Dict[str, Any]]:
+        """
+        Merge data into the record it identifies, creating one if allowed.
+
+        Returns:
+            The stored record, or None if no record matched and ``create`` is False
+        """
+        keys = self.identifiers(data)
+        with self._lock:
+            index = next((i for i in map(self._locate, keys) if i is not None), None)
+            if index is None:
+                if not create:
+                    return None
+                index = self.size
+                self.size += 1
+                record: Dict[str, Any] = {"direct": f"{self.prefix}{index}"}
+            else:
+                record = dict(self._record(index))
+            record.update(data)
+            record["lastChanged"] = int(time.time() * 1000)
+            self._changed[index] = record
+            for key in self.identifiers(record):
+                self._identifiers[key] = index
+            self._logged[index] = len(self._changelog)
+            self._changelog.append(index)
+            return record
+
+    def delete(self, identifier: str) -> bool:
+        """Delete a record by identifier; returns False if there was none."""
+        with self._lock:
+            index = self._locate(identifier)
+            if index is None:
+                return False
+            bisect.insort(self._deleted, index)
+            self._deleted_set.add(index)
+            self._changed.pop(index, None)
+            return True
+
+    def count(self) -> int:
+        """Number of live records."""
+        return self.size - len(self._deleted)
+
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Get ``limit`` live records in index order, skipping ``offset``."""
+        with self._lock:
+            # Smallest index with offset live records below it
+            low, high = offset, offset + len(self._deleted)
+            while low < high:
+                middle = (low + high) // 2
+                if middle - bisect.bisect_left(self._deleted, middle) < offset:
+                    low = middle + 1
+                else:
+                    high = middle
+            records = []
+            index = low
+            while len(records) < limit and index < self.size:
+                if index not in self._deleted_set:
+                    records.append(self._record(index))
+                index += 1
+            return records
+
+    def feed(self, position: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Get up to ``limit`` records in change order from a feed position."""
+        with self._lock:
+            end = self.initial + len(self._changelog)
+            records = []
+            while len(records) < limit and position < end:
+                if position < self.initial:
+                    index = position
+                    if index in self._changed:
+                        # Delivered again at its change, in the log below
+                        index = -1
+                else:
+                    index = self._changelog[position - self.initial]
+                    if self._logged[index] != position - self.initial:
+                        # Changed again later; delivered at its latest change
+                        index = -1
+                position += 1
+                if index >= 0 and index not in self._deleted_set:
+                    records.append(self._record(index))
+            return records, position
+
+
+class ClozeEmulator:
+    """
+    In-memory Cloze API served over HTTP on a local port.
+
+    Implements every endpoint the SDK calls: people, company and project
+    CRUD with paged ``find`` (and ``countonly``) and cursored ``feed``,
+    message opens with ``more``/``next``, analytics, team, account metadata,
+    timeline items and webhook subscriptions. ``find`` and ``feed`` accept
+    but do not apply query filters such as ``stage``.
+
+    Latency, injected errors, 5xx responses and 429 rate limiting are
+    configurable, so retries, hedging, circuit breaking, concurrency limits
+    and pagination can be load-tested without a real account.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        people: int = 10_000,
+        companies: int = 1_000,
+        projects: int = 1_000,
+        opens: int = 1_000,
+        team_size: int = 10,
+        latency: Optional[Callable[[str], float]] = None,
+        error_rate: float = 0.0,
+        errorcode: int = NO_IDENTIFIERS,
+        server_error_rate: float = 0.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        api_keys: Optional[List[str]] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the emulator.
+
+        Args:
+            host: Interface to listen on (default: 127.0.0.1)
+            port: Port to listen on (default: 0, any free port)
+            people: Number of generated people (default: 10,000)
+            companies: Number of generated companies (default: 1,000)
+            projects: Number of generated projects (default: 1,000)
+            opens: Number of messages with opens (default: 1,000)
+            team_size: Number of team members (default: 10)
+            latency: Function taking the endpoint path and returning seconds
+                to wait before answering, e.g. lognormal_latency() (default: None)
+            error_rate: Fraction of requests answered with ``errorcode``
+                (default: 0.0)
+            errorcode: Error code of injected errors (default: 11)
+            server_error_rate: Fraction of requests answered with HTTP 503
+                (default: 0.0)
+            rate_limiter: Budgets per credential and endpoint group; requests
+                over budget get HTTP 429 with Retry-After (default: None, unlimited)
+            api_keys: Accepted API keys and tokens (default: None, any)
+            seed: Optional seed for reproducible error injection
+        """
+        self.collections = {
+            "people": _Collection("person", "P", people),
+            "companies": _Collection("company", "C", companies),
+            "projects": _Collection("project", "J", projects),
+        }
+        self.opens = opens
+        self.team_size = team_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.errorcode = errorcode
+        self.server_error_rate = server_error_rate
+        self.rate_limiter = rate_limiter
+        self.api_keys = set(api_keys) if api_keys is not None else None
+        self.webhooks: Dict[str, Dict[str, Any]] = {}
+        self.timeline = 0
+        self._random = random.Random(seed)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._requests: Counter = Counter()
+        self._statuses: Counter = Counter()
+        self._errorcodes: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.emulator = self  # type: ignore[attr-defined]
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to the client."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ClozeEmulator":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+
+    def __enter__(self) -> "ClozeEmulator":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get request statistics.
+
+        Returns:
+            Dictionary with counts by request, HTTP status and error code
+        """
+        with self._lock:
+            return {
+                "requests": dict(self._requests),
+                "status": {str(status): n for status, n in self._statuses.items()},
+                "errorcodes": {str(code): n for code, n in self._errorcodes.items()},
+                "records": {
+                    name: collection.count()
+                    for name, collection in self.collections.items()
+                },
+                "webhooks": len(self.webhooks),
+            }
+
+    def _admit(self, credential: str, endpoint: str) -> float:
+        """Take a token from the credential's bucket; returns seconds to retry after."""
+        limiter = self.rate_limiter
+        if limiter is None:
+            return 0.0
+        group = limiter.group_for(endpoint)
+        rate, burst = limiter.limits_for(group)
+        key = f"{credential}|{group}"
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(key, (burst, now))
+            tokens, wait = _take(tokens, last, now, rate, burst)
+            if wait > 0:
+                # Rejected requests do not use up budget
+                return wait
+            self._buckets[key] = (tokens, now)
+        return 0.0
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, str],
+        headers: Dict[str, str],
+        body: Any,
+    ) -> Response:
+        """
+        Answer one request.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            params: Query parameters
+            headers: Request headers, with lower-case names
+            body: Decoded JSON body, or None
+
+        Returns:
+            Tuple of HTTP status, extra response headers and JSON payload
+        """
+        endpoint = f"{method} {path}"
+        route = _ROUTES.get((method, path))
+        if route is None:
+            return self._count(
+                endpoint,
+                404,
+                {},
+                {"errorcode": NOT_FOUND, "message": "Unknown endpoint"},
+            )
+
+        authorization = headers.get("authorization", "")
+        credential = params.pop("api_key", None) or (
+            authorization[7:] if authorization.startswith("Bearer ") else None
+        )
+        if not credential or (
+            self.api_keys is not None and credential not in self.api_keys
+        ):
+            return self._count(
+                endpoint, 401, {}, {"errorcode": 1, "message": "Unauthorized"}
+            )
+
+        retry_after = self._admit(credential, path)
+        if retry_after > 0:
+            headers_out = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+            return self._count(
+                endpoint, 429, headers_out, {"errorcode": 1, "message": "Rate limited"}
+            )
+
+        if self.latency is not None:
+            time.sleep(self.latency(path))
+        draw = self._random.random()
+        if draw < self.server_error_rate:
+            return self._count(
+                endpoint, 503, {}, {"errorcode": 1, "message": "Unavailable"}
+            )
+        if draw < self.server_error_rate + self.error_rate:
+            payload = {"errorcode": self.errorcode, "message": "Injected error"}
+            return self._count(endpoint, 200, {}, payload)
+
+        payload = route(self, params, body if isinstance(body, dict) else {}, headers)
+        return self._count(endpoint, 200, {}, payload)
+
+    def _count(
+        self, endpoint: str, status: int, headers: Dict[str, str], payload: Any
+    ) -> Response:
+        """Record a response in the statistics and return it."""
+        with self._lock:
+            self._requests[endpoint] += 1
+            self._statuses[status] += 1
+            errorcode = payload.get("errorcode", 0)
+            if errorcode:
+                self._errorcodes[errorcode] += 1
+        return status, headers, payload
+
+    # Endpoint handlers, registered in _ROUTES below
+
+    def _find(self, name: str, params: Dict[str, str]) -> Dict[str, Any]:
+        collection = self.collections[name]
+        available = collection.count()
+        if params.get("countonly", "").lower() in ("true", "1"):
+            return {"errorcode": 0, "availablecount": available}
+        pagenumber = max(1, int(params.get("pagenumber", 1)))
+        pagesize = max(1, int(params.get("pagesize", 20)))
+        return {
+            "errorcode": 0,
+            "availablecount": available,
+            "pagenumber": pagenumber,
+            "pagesize": pagesize,
+            name: collection.page((pagenumber - 1) * pagesize, pagesize),
+        }
+
+    def _feed(self, name: str, params: Dict[str, str]) -> Dict[str, Any]:
+        collection = self.collections[name]
+        position = _decode_cursor(params.get("cursor"))
+        if position is None:
+            return {"errorcode": NOT_FOUND, "message": "Invalid cursor"}
+        records, position = collection.feed(
+            position, max(1, int(params.get("pagesize", FEED_PAGE_SIZE)))
+        )
+        return {
+            "errorcode": 0,
+            "availablecount": collection.count(),
+            "cursor": _encode_cursor(position),
+            name: records,
+        }
+
+    def _get(self, name: str, key: str, params: Dict[str, str]) -> Dict[str, Any]:
+        record = self.collections[name].get(params.get("identifier", ""))
+        if record is None:
+            return {"errorcode": NOT_FOUND, "message": f"{key.title()} not found"}
+        return {"errorcode": 0, key: record}
+
+    def _delete(self, name: str, params: Dict[str, str]) -> Dict[str, Any]:
+        if not self.collections[name].delete(params.get("identifier", "")):
+            return {"errorcode": NOT_FOUND, "message": "Not found"}
+        return {"errorcode": 0}
+
+    def _upsert(
+        self, name: str, key: str, body: Dict[str, Any], create: bool
+    ) -> Dict[str, Any]:
+        collection = self.collections[name]
+        # Projects can be created by name alone
+        named_project = create and key == "project" and body.get("name")
+        if not collection.identifiers(body) and not named_project:
+            return {"errorcode": NO_IDENTIFIERS, "message": "No identifiers available"}
+        record = collection.upsert(body, create)
+        if record is None:
+            return {"errorcode": NOT_FOUND, "message": f"{key.title()} not found"}
+        return {"errorcode": 0, "direct": record["direct"]}
+
+    def _opens(self, params: Dict[str, str], headers: Dict[str, str]) -> Dict[str, Any]:
+        if "next" in params:
+            start = int(params["next"])
+        else:
+            since = int(params.get("from", EPOCH_MS))
+            # Message i was sent a minute after message i - 1
+            start = max(0, math.ceil((since - EPOCH_MS) / 60_000))
+        end = min(self.opens, start + OPENS_PAGE_SIZE)
+        messages = [
+            {
+                "id": f"M{i}",
+                "subject": f"Message {i}",
+                "date": EPOCH_MS + i * 60_000,
+                "opens": [
+                    {
+                        "email": f"person{i}@example.com",
+                        "date": EPOCH_MS + i * 60_000 + 3_600_000,
+                    }
+                ],
+            }
+            for i in range(start, end)
+        ]
+        payload: Dict[str, Any] = {
+            "errorcode": 0,
+            "messages": messages,
+            "more": end < self.opens,
+        }
+        if payload["more"]:
+            host = headers.get("host", "localhost")
+            payload["next"] = f"http://{host}/v1/messages/opens?next={end}"
+        return payload
+
+    def _analytics(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        # Deterministic figures per query name
+        queries = body.get("queries") or {}
+        return {
+            "errorcode": 0,
+            "results": {
+                name: {"count": zlib.crc32(name.encode()) % 1000} for name in queries
+            },
+        }
+
+    def _team(self) -> Dict[str, Any]:
+        return {
+            "errorcode": 0,
+            "list": [
+                {"name": f"Member {i}", "email": f"member{i}@example.com"}
+                for i in range(self.team_size)
+            ],
+        }
+
+    def _subscribe(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if not body.get("event") or not body.get("target_url"):
+            return {
+                "errorcode": NOT_FOUND,
+                "message": "event and target_url are required",
+            }
+        with self._lock:
+            uniqueid = f"W{len(self.webhooks)}-{self._random.getrandbits(32):08x}"
+            self.webhooks[uniqueid] = dict(
+                body, uniqueId=uniqueid, date=int(time.time() * 1000)
+            )
+        return {"errorcode": 0, "uniqueid": uniqueid}
+
+    def _unsubscribe(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            for uniqueid, subscription in list(self.webhooks.items()):
+                if subscription["event"] == body.get("event") and (
+                    uniqueid == body.get("uniqueid")
+                    or (
+                        body.get("client_reference")
+                        and subscription.get("client_reference")
+                        == body["client_reference"]
+                    )
+                ):
+                    del self.webhooks[uniqueid]
+                    return {"errorcode": 0}
+        return {"errorcode": NOT_FOUND, "message": "Subscription not found"}
+
+    def _timeline(self) -> Dict[str, Any]:
+        with self._lock:
+            self.timeline += 1
+        return {"errorcode": 0}
+
+
+def _encode_cursor(position: int) -> str:
+    return (
+        base64.urlsafe_b64encode(f"position={position}".encode()).decode().rstrip("=")
+    )
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Read a feed position from a cursor; None if it is invalid."""
+    if not cursor:
+        return 0
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        return int(text.split("=", 1)[1])
+    except (ValueError, IndexError):
+        return None
+
+
+def _static(payload: Dict[str, Any]) -> Callable[..., Dict[str, Any]]:
+    return lambda emulator, params, body, headers: dict(payload, errorcode=0)
+
+
+_LIST = [{"name": name.title(), "key": name} for name in SEGMENTS]
+
+# Handlers are called as handler(emulator, params, body, headers)
+_ROUTES: Dict[Tuple[str, str], Callable[..., Dict[str, Any]]] = {
+    ("GET", "/v1/user/profile"): _static(
+        {
+            "user": {
+                "email": "user@example.com",
+                "name": "Emulator User",
+                "first": "Emulator",
+                "last": "User",
+            }
+        }
+    ),
+    ("GET", "/v1/user/fields"): _static(
+        {
+            "list": [
+                {
+                    "id": "role",
+                    "type": "keyword",
+                    "name": "Role",
+                    "relations": {"person": True},
+                }
+            ]
+        }
+    ),
+    ("GET", "/v1/user/segments/people"): _static({"list": _LIST}),
+    ("GET", "/v1/user/segments/projects"): _static(
+        {"list": [{"name": "Project", "key": "project"}]}
+    ),
+    ("GET", "/v1/user/stages/people"): _static(
+        {"list": [{"name": name.title(), "key": name} for name in STAGES]}
+    ),
+    ("GET", "/v1/user/stages/projects"): _static(
+        {"list": [{"name": name.title(), "key": name} for name in STAGES[1:4]]}
+    ),
+    ("GET", "/v1/user/steps"): _static({"segments": {}}),
+    ("GET", "/v1/user/views"): _static(
+        {"people": {"views": [{"id": "my", "name": "My People"}]}}
+    ),
+    ("GET", "/v1/team/members/list"): lambda e, p, b, h: e._team(),
+    ("POST", "/v1/team/members/update"): _static({}),
+    ("GET", "/v1/team/nodes"): _static({"list": [{"id": "/US", "name": "US"}]}),
+    ("GET", "/v1/team/roles"): _static(
+        {"list": [{"id": "admin", "name": "Administrator"}]}
+    ),
+    ("GET", "/v1/analytics/teamactivity/update"): _static({}),
+    ("GET", "/v1/messages/opens"): lambda e, p, b, h: e._opens(p, h),
+    ("POST", "/v1/timeline/communication/create"): lambda e, p, b, h: e._timeline(),
+    ("POST", "/v1/timeline/content/create"): lambda e, p, b, h: e._timeline(),
+    ("POST", "/v1/timeline/todo/create"): lambda e, p, b, h: e._timeline(),
+    ("GET", "/v1/webhooks"): lambda e, p, b, h: {
+        "errorcode": 0,
+        "list": list(e.webhooks.values()),
+    },
+    ("POST", "/v1/webhooks/subscribe"): lambda e, p, b, h: e._subscribe(b),
+    ("POST", "/v1/webhooks/unsubscribe"): lambda e, p, b, h: e._unsubscribe(b),
+}
+
+for _name in ("activity", "funnel", "leads", "projects", "teamactivity"):
+    _ROUTES[("POST", f"/v1/analytics/{_name}")] = lambda e, p, b, h: e._analytics(b)
+
+
+def _record_routes(
+    name: str, key: str
+) -> Dict[Tuple[str, str], Callable[..., Dict[str, Any]]]:
+    """Routes of the people, companies or projects endpoints."""
+    return {
+        ("GET", f"/v1/{name}/find"): lambda e, p, b, h: e._find(name, p),
+        ("GET", f"/v1/{name}/feed"): lambda e, p, b, h: e._feed(name, p),
+        ("GET", f"/v1/{name}/get"): lambda e, p, b, h: e._get(name, key, p),
+        ("DELETE", f"/v1/{name}/delete"): lambda e, p, b, h: e._delete(name, p),
+        ("POST", f"/v1/{name}/create"): lambda e, p, b, h: e._upsert(
+            name, key, b, True
+        ),
+        ("POST", f"/v1/{name}/update"): lambda e, p, b, h: e._upsert(
+            name, key, b, False
+        ),
+    }
+
+
+for _name, _key in (
+    ("people", "person"),
+    ("companies", "company"),
+    ("projects", "project"),
+):
+    _ROUTES.update(_record_routes(_name, _key))
+del _name, _key
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Decodes requests for the emulator and encodes its answers."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY the body
+    # waits for the client's delayed ACK, adding ~40 ms to every response
+    disable_nagle_algorithm = True
+
+    def _dispatch(self) -> None:
+        parts = urlsplit(self.path)
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        headers = {name.lower(): value for name, value in self.headers.items()}
+        body: Any = None
+        length = int(headers.get("content-length") or 0)
+        if length:
+            raw = self.rfile.read(length)
+            encoding = headers.get("content-encoding", "identity")
+            try:
+                if encoding == "gzip":
+                    raw = gzip.decompress(raw)
+                elif encoding == "zstd":
+                    import zstandard
+
+                    raw = zstandard.ZstdDecompressor().decompress(raw)
+                body = json.loads(raw)
+            except Exception:
+                self._send(400, {}, {"errorcode": 1, "message": "Unreadable body"})
+                return
+        status, extra, payload = self.server.emulator.handle(  # type: ignore[attr-defined]
+            self.command, parts.path, params, headers, body
+        )
+        self._send(status, extra, payload)
+
+    def _send(self, status: int, headers: Dict[str, str], payload: Any) -> None:
+        data = json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if len(data) >= COMPRESSION_THRESHOLD and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        ):
+            data = gzip.compress(data, compresslevel=1)
+            self.send_header("Content-Encoding", "gzip")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keep request logging off the load-test's hot path."""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the emulator until interrupted, then print its statistics."""
+    parser = argparse.ArgumentParser(
+        prog="python -m cloze_sdk.emulator",
+        description="Serve a local Cloze API emulator for load and soak testing.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    parser.add_argument("--people", type=int, default=10_000, help="generated people")
+    parser.add_argument(
+        "--companies", type=int, default=1_000, help="generated companies"
+    )
+    parser.add_argument(
+        "--projects", type=int, default=1_000, help="generated projects"
+    )
+    parser.add_argument("--opens", type=int, default=1_000, help="messages with opens")
+    parser.add_argument("--latency-median", type=float, help="median latency, seconds")
+    parser.add_argument("--latency-p99", type=float, help="p99 latency, seconds")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction with --errorcode"
+    )
+    parser.add_argument(
+        "--errorcode", type=int, default=NO_IDENTIFIERS, help="injected error code"
+    )
+    parser.add_argument(
+        "--server-error-rate", type=float, default=0.0, help="fraction of 503s"
+    )
+    parser.add_argument("--rate", type=float, help="requests per second per credential")
+    parser.add_argument("--burst", type=float, help="burst size per credential")
+    parser.add_argument("--api-key", action="append", help="accepted key (repeatable)")
+    parser.add_argument("--seed", type=int, help="seed for reproducible runs")
+    args = parser.parse_args(argv)
+
+    latency = None
+    if args.latency_median is not None:
+        p99 = args.latency_p99 if args.latency_p99 is not None else args.latency_median
+        latency = lognormal_latency(args.latency_median, p99, seed=args.seed)
+    emulator = ClozeEmulator(
+        host=args.host,
+        port=args.port,
+        people=args.people,
+        companies=args.companies,
+        projects=args.projects,
+        opens=args.opens,
+        latency=latency,
+        error_rate=args.error_rate,
+        errorcode=args.errorcode,
+        server_error_rate=args.server_error_rate,
+        rate_limiter=RateLimiter(args.rate, args.burst) if args.rate else None,
+        api_keys=args.api_key,
+        seed=args.seed,
+    )
+    print(f"Cloze API emulator listening on {emulator.url}", flush=True)
+    try:
+        emulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+        print(json.dumps(emulator.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
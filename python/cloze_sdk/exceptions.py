@@ -44,9 +44,43 @@ class ClozeAuthenticationError(ClozeAPIError):
 class ClozeRateLimitError(ClozeAPIError):
     """Raised when rate limit is exceeded."""
 
+    def __init__(self, message, errorcode=None, response=None, retry_after=None):
+        """
+        Initialize Cloze rate limit error.
+
+        Args:
+            message: Error message
+            errorcode: Optional API error code
+            response: Optional response object from the API
+            retry_after: Optional seconds the server asked us to wait
+        """
+        super().__init__(message, errorcode=errorcode, response=response)
+        self.retry_after = retry_after
+
+
+class ClozeTimeoutError(ClozeAPIError):
+    """Raised when a request times out or its deadline has passed."""
+
     pass
 
 
+class ClozeCircuitOpenError(ClozeAPIError):
+    """Raised without sending a request when its endpoint's circuit is open."""
+
+    def __init__(self, message, circuit=None, retry_after=None):
+        """
+        Initialize Cloze circuit open error.
+
+        Args:
+            message: Error message
+            circuit: Endpoint group whose circuit is open
+            retry_after: Optional seconds until the circuit admits a probe
+        """
+        super().__init__(message)
+        self.circuit = circuit
+        self.retry_after = retry_after
+
+
 class ClozeValidationError(ClozeAPIError):
     """Raised when request validation fails."""
 
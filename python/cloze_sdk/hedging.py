@@ -0,0 +1,312 @@
+"""
+Hedged requests for latency-sensitive Cloze API reads.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import heapq
+import itertools
+import socket
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+# Reads whose tail latency hedging is meant for
+DEFAULT_HEDGED_ENDPOINTS = ("/v1/people/get", "/v1/companies/get")
+
+
+def can_win(response: Any) -> bool:
+    """
+    Check whether a copy's response may win a hedge race.
+
+    A 5xx or 429 from one copy says nothing about the other, which may still
+    be on its way to a healthy server, so it must not cut that copy short.
+
+    Args:
+        response: Transport response of one copy
+
+    Returns:
+        True if the status is below 500 and not 429
+    """
+    return response.status_code < 500 and response.status_code != 429
+
+
+class HedgePolicy:
+    """
+    When to send a duplicate of a slow GET request.
+
+    If a hedged request has not completed after the ``percentile`` latency
+    recently observed for its endpoint, a second copy is sent and the first
+    successful response wins. Each request earns ``budget`` hedge tokens and
+    each hedge spends one, so hedges stay near ``budget`` of the traffic even
+    when the API is slow across the board.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        endpoints: Optional[Iterable[str]] = None,
+        initial_delay: float = 0.5,
+        min_delay: float = 0.01,
+        window: int = 100,
+        min_samples: int = 20,
+    ):
+        """
+        Initialize the hedge policy.
+
+        Args:
+            percentile: Latency percentile to wait for before hedging (default: 95)
+            budget: Fraction of requests that may be hedged (default: 0.05)
+            endpoints: Endpoint path prefixes to hedge; only GET requests are
+                hedged (default: DEFAULT_HEDGED_ENDPOINTS)
+            initial_delay: Hedge delay in seconds until ``min_samples``
+                latencies have been seen for an endpoint (default: 0.5)
+            min_delay: Lower bound on the hedge delay in seconds (default: 0.01)
+            window: Recent latencies kept per endpoint (default: 100)
+            min_samples: Latencies needed before the percentile is used
+                (default: 20)
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        if not 0 <= budget <= 1:
+            raise ValueError("budget must be between 0 and 1")
+
+        self.percentile = percentile
+        self.budget = budget
+        self.endpoints = tuple(DEFAULT_HEDGED_ENDPOINTS if endpoints is None else endpoints)
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.window = window
+        self.min_samples = min_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+        # Tokens are capped so a quiet period cannot bank a burst of hedges
+        self._max_tokens = max(1.0, budget * window)
+        self._tokens = 0.0
+        self._requests = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+
+    def applies(self, method: str, endpoint: str) -> bool:
+        """
+        Check whether a request may be hedged.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+
+        Returns:
+            True for GET requests to a hedged endpoint
+        """
+        return method == "GET" and endpoint.startswith(self.endpoints)
+
+    def delay_for(self, endpoint: str) -> float:
+        """
+        Get how long to wait for a response before hedging.
+
+        Args:
+            endpoint: API endpoint path
+
+        Returns:
+            Delay in seconds
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(endpoint, ()))
+        if len(samples) < self.min_samples:
+            return max(self.min_delay, self.initial_delay)
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return max(self.min_delay, samples[index])
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        """
+        Record the latency of an unhedged attempt.
+
+        Args:
+            endpoint: API endpoint path
+            seconds: Time from sending the request to receiving the response
+        """
+        with self._lock:
+            samples = self._latencies.get(endpoint)
+            if samples is None:
+                samples = self._latencies[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def start(self) -> None:
+        """Count a hedgeable request, earning hedge budget."""
+        with self._lock:
+            self._requests += 1
+            self._tokens = min(self._max_tokens, self._tokens + self.budget)
+
+    def try_hedge(self) -> bool:
+        """
+        Spend budget on a hedge.
+
+        Returns:
+            True if the hedge may be sent
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self._hedges += 1
+            return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hedging statistics.
+
+        Returns:
+            Dictionary with hedgeable requests and hedges sent
+        """
+        with self._lock:
+            return {"requests": self._requests, "hedges": self._hedges}
+
+
+class Interrupt:
+    """
+    Lets another thread abort a request blocked reading its response.
+
+    The synchronous client sends a hedged request's first copy on the
+    caller's thread. While that copy waits for its response, its socket is
+    attached here; if the hedge wins, ``fire`` shuts the socket down so the
+    blocked read fails at once and the caller can return the hedge's response.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the interrupt."""
+        self.fired = False
+        self._sock: Any = None
+        self._lock = threading.Lock()
+
+    def attach(self, sock: Any) -> None:
+        """
+        Watch the socket a response is being read from.
+
+        Args:
+            sock: Connected socket
+        """
+        with self._lock:
+            if self.fired:
+                _shutdown(sock)
+            else:
+                self._sock = sock
+
+    def detach(self) -> None:
+        """Stop watching once the response headers have been read."""
+        with self._lock:
+            self._sock = None
+
+    def fire(self) -> None:
+        """Abort the read in progress, and any later one."""
+        with self._lock:
+            self.fired = True
+            if self._sock is not None:
+                _shutdown(self._sock)
+                self._sock = None
+
+
+def _shutdown(sock: Any) -> None:
+    """Shut a socket down, waking any thread blocked reading from it."""
+    if isinstance(sock, socket.socket):
+        try:
+            # socket.socket's method, not SSLSocket's, which would tear down
+            # the TLS state under the reading thread
+            socket.socket.shutdown(sock, socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+# Interrupt of the hedged request being sent in this context, if any
+current_interrupt: "ContextVar[Optional[Interrupt]]" = ContextVar(
+    "cloze_sdk_interrupt", default=None
+)
+
+
+class HedgeTimer:
+    """
+    Runs callbacks after a delay on one background thread.
+
+    The synchronous client schedules each request's hedge here instead of
+    starting a thread, or holding a worker, per request while it waits. The
+    thread exits after ``linger`` idle seconds and restarts when needed.
+    """
+
+    def __init__(self, linger: float = 1.0):
+        """
+        Initialize the timer.
+
+        Args:
+            linger: Idle seconds before the thread exits (default: 1.0)
+        """
+        self.linger = linger
+        self._calls: List[List[Any]] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> List[Any]:
+        """
+        Run a callback after a delay.
+
+        Args:
+            delay: Seconds to wait
+            callback: Function to call on the timer thread; must not raise
+
+        Returns:
+            Handle for cancel()
+        """
+        call = [time.monotonic() + delay, next(self._order), callback]
+        with self._cond:
+            heapq.heappush(self._calls, call)
+            if not self._running:
+                self._running = True
+                threading.Thread(
+                    target=self._run, name="cloze-hedge-timer", daemon=True
+                ).start()
+            elif self._calls[0] is call:
+                self._cond.notify()
+        return call
+
+    @staticmethod
+    def cancel(call: List[Any]) -> None:
+        """
+        Cancel a scheduled callback; it is skipped when it comes due.
+
+        Args:
+            call: Handle returned by schedule()
+        """
+        call[2] = None
+
+    def _run(self) -> None:
+        """Call callbacks as they come due."""
+        while True:
+            with self._cond:
+                while True:
+                    if not self._calls:
+                        self._cond.wait(self.linger)
+                        if not self._calls:
+                            self._running = False
+                            return
+                        continue
+                    wait = self._calls[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                callback = heapq.heappop(self._calls)[2]
+            if callback is not None:
+                callback()
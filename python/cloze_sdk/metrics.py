@@ -0,0 +1,382 @@
+"""
+Client-side metrics for Cloze API requests.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import re
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds of the request latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request counters, with the Prometheus metric each is exported as
+REQUEST_COUNTERS = {
+    "retries": "retries_total",
+    "rate_limited": "rate_limited_total",
+    "rate_limit_waits": "rate_limit_waits_total",
+    "request_bytes": "request_bytes_total",
+    "response_bytes": "response_bytes_total",
+    "decode_seconds": "request_decode_seconds_total",
+}
+
+
+class _Shard:
+    """Metrics written by one thread; only that thread mutates it."""
+
+    __slots__ = ("counters", "endpoints", "timers", "requests")
+
+    def __init__(self):
+        self.counters: Dict[str, float] = {}
+        self.endpoints: Dict[str, Dict[str, float]] = {}
+        self.timers: Dict[str, List[float]] = {}
+        self.requests: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def clear(self) -> None:
+        self.counters.clear()
+        self.endpoints.clear()
+        self.timers.clear()
+        self.requests.clear()
+
+
+def _add(target: Dict[Any, float], source: Dict[Any, float]) -> None:
+    """Add every value in ``source`` to ``target``."""
+    for key, value in dict(source).items():
+        target[key] = target.get(key, 0) + value
+
+
+class ClientMetrics:
+    """
+    Counters, timers and per-request series collected by a client.
+
+    Each thread writes to its own shard without taking a lock; snapshots
+    merge the shards. Shards of threads that have exited are folded into a
+    single retired shard, so short-lived threads do not accumulate.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize empty metrics.
+
+        Args:
+            buckets: Latency histogram bucket upper bounds in seconds
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: List[Tuple[Any, _Shard]] = []
+        self._retired = _Shard()
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def _shard(self) -> _Shard:
+        """Get the calling thread's shard, registering it on first use."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+            return shard
+
+    def _request(self, method: str, endpoint: str) -> Dict[str, Any]:
+        """Get the calling thread's series for a method and endpoint."""
+        requests = self._shard().requests
+        series = requests.get((method, endpoint))
+        if series is None:
+            series = requests[(method, endpoint)] = {
+                "latency": [0] * (len(self.buckets) + 1),
+                "latency_sum": 0.0,
+                "status": {},
+                "errorcodes": {},
+                "counters": {},
+            }
+        return series
+
+    def increment(
+        self, name: str, value: float = 1, endpoint: Optional[str] = None
+    ) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name: Counter name
+            value: Amount to add (default: 1)
+            endpoint: Optional endpoint path to also attribute the value to
+        """
+        shard = self._shard()
+        shard.counters[name] = shard.counters.get(name, 0) + value
+        if endpoint is not None:
+            counters = shard.endpoints.get(endpoint)
+            if counters is None:
+                counters = shard.endpoints[endpoint] = {}
+            counters[name] = counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Record a timing sample.
+
+        Args:
+            name: Timer name
+            seconds: Duration in seconds
+        """
+        timers = self._shard().timers
+        timer = timers.get(name)
+        if timer is None:
+            timer = timers[name] = [0, 0.0]
+        timer[0] += 1
+        timer[1] += seconds
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        """
+        Report a current value, read each time metrics are collected.
+
+        Args:
+            name: Gauge name
+            read: Function returning the value
+        """
+        self._gauges[name] = read
+
+    def observe_request(
+        self, method: str, endpoint: str, seconds: float, status: Optional[int] = None
+    ) -> None:
+        """
+        Record one HTTP attempt.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            seconds: Time until the response headers arrived or the attempt failed
+            status: HTTP status, or None if the transport failed
+        """
+        series = self._request(method, endpoint)
+        series["latency"][bisect_left(self.buckets, seconds)] += 1
+        series["latency_sum"] += seconds
+        key = str(status) if status is not None else "error"
+        series["status"][key] = series["status"].get(key, 0) + 1
+
+    def increment_request(
+        self, method: str, endpoint: str, name: str, value: float = 1
+    ) -> None:
+        """
+        Add to a per-request counter (see REQUEST_COUNTERS).
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            name: Counter name
+            value: Amount to add (default: 1)
+        """
+        counters = self._request(method, endpoint)["counters"]
+        counters[name] = counters.get(name, 0) + value
+
+    def record_error(self, method: str, endpoint: str, errorcode: Any) -> None:
+        """
+        Count an API error response by its ``errorcode``.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            errorcode: Cloze error code
+        """
+        errorcodes = self._request(method, endpoint)["errorcodes"]
+        key = str(errorcode)
+        errorcodes[key] = errorcodes.get(key, 0) + 1
+
+    def _merged(self) -> _Shard:
+        """Merge every shard into a new one."""
+        with self._lock:
+            live = []
+            for ref, shard in self._shards:
+                thread = ref()
+                if thread is not None and thread.is_alive():
+                    live.append((ref, shard))
+                else:
+                    self._merge(self._retired, shard)
+            self._shards = live
+            total = _Shard()
+            self._merge(total, self._retired)
+            for _, shard in live:
+                self._merge(total, shard)
+        return total
+
+    def _merge(self, target: _Shard, source: _Shard) -> None:
+        """Add the values of ``source`` to ``target``."""
+        _add(target.counters, source.counters)
+        for endpoint, counters in dict(source.endpoints).items():
+            _add(target.endpoints.setdefault(endpoint, {}), counters)
+        for name, (count, total) in dict(source.timers).items():
+            timer = target.timers.setdefault(name, [0, 0.0])
+            timer[0] += count
+            timer[1] += total
+        for key, series in dict(source.requests).items():
+            merged = target.requests.get(key)
+            if merged is None:
+                merged = target.requests[key] = {
+                    "latency": [0] * (len(self.buckets) + 1),
+                    "latency_sum": 0.0,
+                    "status": {},
+                    "errorcodes": {},
+                    "counters": {},
+                }
+            for i, count in enumerate(list(series["latency"])):
+                merged["latency"][i] += count
+            merged["latency_sum"] += series["latency_sum"]
+            for name in ("status", "errorcodes", "counters"):
+                _add(merged[name], series[name])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a point-in-time copy of all metrics.
+
+        Returns:
+            Dictionary with 'counters', per-endpoint counters under
+            'endpoints', 'timers' (count and total_seconds), and 'requests'
+            keyed by 'METHOD /endpoint' with the attempt count, latency
+            histogram (cumulative counts by bucket upper bound), counts by
+            HTTP status and by API errorcode, and per-request counters, and
+            the current value of each gauge under 'gauges'
+        """
+        total = self._merged()
+        requests = {}
+        for (method, endpoint), series in sorted(total.requests.items()):
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets + (float("inf"),), series["latency"]):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+            requests[f"{method} {endpoint}"] = {
+                "count": cumulative,
+                "latency": {
+                    "buckets": buckets,
+                    "sum": series["latency_sum"],
+                },
+                "status": series["status"],
+                "errorcodes": series["errorcodes"],
+                **series["counters"],
+            }
+        return {
+            "counters": total.counters,
+            "endpoints": total.endpoints,
+            "timers": {
+                name: {"count": count, "total_seconds": seconds}
+                for name, (count, seconds) in total.timers.items()
+            },
+            "requests": requests,
+            "gauges": {name: read() for name, read in sorted(self._gauges.items())},
+        }
+
+    def to_prometheus(self, prefix: str = "cloze_sdk") -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix (default: 'cloze_sdk')
+
+        Returns:
+            Exposition text, one sample per line
+        """
+        total = self._merged()
+        lines: List[str] = []
+
+        def family(name: str, kind: str) -> str:
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            return f"{prefix}_{name}"
+
+        series = sorted(total.requests.items())
+        if series:
+            name = family("request_duration_seconds", "histogram")
+            for (method, endpoint), data in series:
+                labels = _labels(method=method, endpoint=endpoint)
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), data["latency"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {data['latency_sum']!r}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+            for key, label, metric in (
+                ("status", "status", "responses_total"),
+                ("errorcodes", "errorcode", "api_errors_total"),
+            ):
+                name = family(metric, "counter")
+                for (method, endpoint), data in series:
+                    for value, count in sorted(data[key].items()):
+                        labels = _labels(method=method, endpoint=endpoint, **{label: value})
+                        lines.append(f"{name}{{{labels}}} {_number(count)}")
+            for counter, metric in REQUEST_COUNTERS.items():
+                samples = [
+                    (key, data["counters"][counter])
+                    for key, data in series
+                    if counter in data["counters"]
+                ]
+                if samples:
+                    name = family(metric, "counter")
+                    for (method, endpoint), value in samples:
+                        labels = _labels(method=method, endpoint=endpoint)
+                        lines.append(f"{name}{{{labels}}} {_number(value)}")
+
+        for counter, value in sorted(total.counters.items()):
+            name = family(f"{_metric_name(counter)}_total", "counter")
+            # Series per endpoint, plus the part not attributed to one, so
+            # that summing the family gives the total
+            attributed = False
+            for endpoint, counters in sorted(total.endpoints.items()):
+                if counter in counters:
+                    attributed = True
+                    value -= counters[counter]
+                    labels = _labels(endpoint=endpoint)
+                    lines.append(f"{name}{{{labels}}} {_number(counters[counter])}")
+            if value or not attributed:
+                lines.append(f"{name} {_number(value)}")
+        for timer, (count, seconds) in sorted(total.timers.items()):
+            name = family(f"{_metric_name(timer)}_seconds", "summary")
+            lines.append(f"{name}_sum {seconds!r}")
+            lines.append(f"{name}_count {_number(count)}")
+        for gauge, read in sorted(self._gauges.items()):
+            name = family(_metric_name(gauge), "gauge")
+            lines.append(f"{name} {_number(read())}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def reset(self) -> None:
+        """Clear all metrics except gauges, which report live values."""
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+def _metric_name(name: str) -> str:
+    """Make a counter or timer name a valid Prometheus metric name."""
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _labels(**labels: Any) -> str:
+    """Format Prometheus labels, escaping their values."""
+    return ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, value in labels.items()
+    )
+
+
+def _number(value: float) -> str:
+    """Format a sample value, dropping the fraction from whole numbers."""
+    return str(int(value)) if float(value).is_integer() else repr(value)
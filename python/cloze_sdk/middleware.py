@@ -0,0 +1,147 @@
+"""
+Middleware hooks around Cloze API requests.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import contextvars
+import time
+from typing import Any, Dict, Optional
+
+
+class RequestContext:
+    """
+    One API call as seen by middleware.
+
+    ``params`` and ``body`` may be replaced in ``before_request`` to change
+    what is sent, and ``result`` in ``after_response`` to change what the
+    caller receives. ``state`` is free for middleware to keep per-request data
+    in, e.g. a span or a start time of its own.
+
+    ``attempts``, ``status`` and the byte counts are filled in as the request
+    is sent; ``attempts`` stays 0 when the result came from the cache or a
+    shared single-flight call.
+
+    ``stream`` is True for ``find``/``feed`` calls made with ``stream=True``.
+    Their ``result`` is the StreamedPage, and ``after_response`` or
+    ``on_error`` run once the page has been iterated or closed, so
+    ``elapsed`` and ``response_bytes`` cover reading the body.
+    """
+
+    __slots__ = (
+        "method",
+        "endpoint",
+        "params",
+        "body",
+        "started_at",
+        "elapsed",
+        "result",
+        "error",
+        "state",
+        "attempts",
+        "status",
+        "request_bytes",
+        "response_bytes",
+        "stream",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+    ):
+        """
+        Initialize the context.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            params: Query parameters
+            body: JSON or form body
+            stream: Whether the response is parsed incrementally
+        """
+        self.method = method
+        self.endpoint = endpoint
+        self.params = params
+        self.body = body
+        # time.monotonic() when the call started, and seconds it took
+        self.started_at = time.monotonic()
+        self.elapsed: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.state: Dict[str, Any] = {}
+        self.attempts = 0
+        self.status: Optional[int] = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.stream = stream
+
+
+# Context of the call in progress, set only while middleware are registered
+_current: "contextvars.ContextVar[Optional[RequestContext]]" = contextvars.ContextVar(
+    "cloze_sdk_request", default=None
+)
+
+
+def current_request() -> Optional[RequestContext]:
+    """
+    Get the context of the API call in progress.
+
+    Returns:
+        RequestContext, or None outside a call or without middleware
+    """
+    return _current.get()
+
+
+class Middleware:
+    """
+    Base class for request middleware; override the hooks you need.
+
+    Middleware run in registration order before a request and in reverse
+    order after it, so the first registered wraps all others. Hooks see
+    every API call, including cache hits, streamed pages and retried
+    requests (once, not per attempt). With the asyncio client, hooks may be
+    coroutine functions.
+    """
+
+    def before_request(self, context: RequestContext) -> Any:
+        """
+        Called before the request is sent.
+
+        Args:
+            context: Request context
+        """
+
+    def after_response(self, context: RequestContext) -> Any:
+        """
+        Called with the decoded ``context.result`` of a successful call.
+
+        Args:
+            context: Request context
+        """
+
+    def on_error(self, context: RequestContext) -> Any:
+        """
+        Called with ``context.error`` when the call raised.
+
+        The error is re-raised after every ``on_error`` hook has run.
+
+        Args:
+            context: Request context
+        """
@@ -0,0 +1,136 @@
+"""
+Iteration over paged and cursor-based Cloze API list endpoints.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from .deadline import deadline_at
+from .tracing import use_span
+
+# Page size requested by find iteration when the caller does not pick one
+DEFAULT_PAGE_SIZE = 100
+
+
+class _BasePageIterator:
+    """Shared paging state of page iterators."""
+
+    def __init__(
+        self,
+        fetch: Callable[..., Any],
+        record_key: str,
+        params: Dict[str, Any],
+        cursor: bool,
+        timeout: Optional[float] = None,
+        tracer: Any = None,
+    ):
+        """
+        Initialize the iterator.
+
+        Args:
+            fetch: Endpoint method returning one page for the given keyword arguments
+            record_key: Response field holding the records (e.g. 'people')
+            params: Keyword arguments for the first fetch
+            cursor: If True, follow ``cursor``; otherwise advance ``pagenumber``
+            timeout: Seconds allowed for the whole iteration, counted from now
+            tracer: OpenTelemetry tracer to report a span for the iteration to
+        """
+        self._fetch = fetch
+        self._record_key = record_key
+        self._params: Optional[Dict[str, Any]] = dict(params)
+        self._cursor = cursor
+        self._expires_at = None if timeout is None else time.monotonic() + timeout
+        self._tracer = tracer
+        self.pages = 0
+        self.records = 0
+        if not cursor:
+            self._params.setdefault("pagenumber", 1)
+            self._params.setdefault("pagesize", DEFAULT_PAGE_SIZE)
+
+    def _advance(self, page: Dict[str, Any]) -> List[Any]:
+        """Return a page's records and set up the parameters of the next fetch."""
+        records = page.get(self._record_key) or []
+        self.pages += 1
+        self.records += len(records)
+        params = self._params
+        assert params is not None
+        if not records:
+            self._params = None
+        elif self._cursor:
+            cursor = page.get("cursor")
+            self._params = dict(params, cursor=cursor) if cursor else None
+        elif len(records) < params["pagesize"]:
+            self._params = None
+        else:
+            self._params = dict(params, pagenumber=params["pagenumber"] + 1)
+        return records
+
+    def _start_span(self) -> Any:
+        """Start the iteration's span, parented to the current one, if tracing."""
+        if self._tracer is None:
+            return None
+        return self._tracer.start_span(
+            f"cloze paginate {self._record_key}",
+            attributes={"cloze.record_key": self._record_key},
+        )
+
+    def _end_span(self, span: Any) -> None:
+        """Record the pages and records fetched and end the span."""
+        if span is not None:
+            span.set_attribute("cloze.pages", self.pages)
+            span.set_attribute("cloze.records", self.records)
+            span.end()
+
+
+class PageIterator(_BasePageIterator):
+    """
+    Iterate over the records of every page of a find or feed query.
+
+    Pages are fetched one at a time as iteration reaches them. With a
+    ``timeout``, all page requests share one deadline; once it passes, the
+    next request raises ClozeTimeoutError and no further pages are fetched.
+
+    With tracing enabled, one span covers the iteration and the page
+    requests are its children. The span is current only while a page is
+    fetched, so work done between records is not attributed to it.
+    """
+
+    def __iter__(self) -> Iterator[Any]:
+        span = self._start_span()
+        try:
+            while self._params is not None:
+                with deadline_at(self._expires_at), use_span(span):
+                    page = self._fetch(**self._params)
+                yield from self._advance(page)
+        finally:
+            self._end_span(span)
+
+
+class AsyncPageIterator(_BasePageIterator):
+    """Asyncio variant of PageIterator; iterate with ``async for``."""
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        span = self._start_span()
+        try:
+            while self._params is not None:
+                with deadline_at(self._expires_at), use_span(span):
+                    page = await self._fetch(**self._params)
+                for record in self._advance(page):
+                    yield record
+        finally:
+            self._end_span(span)
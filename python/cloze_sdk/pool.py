@@ -0,0 +1,274 @@
+"""
+Pool of per-credential Cloze clients sharing one transport.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .client import ClozeClient
+from .concurrency import ConcurrencyLimiter
+from .ratelimit import RateLimiter
+
+
+# ClozeClient options that would take a client off the pool's connections
+# or its per-tenant limits
+_POOL_MANAGED_OPTIONS = ("adapter", "concurrency_limiter", "http2")
+
+
+class _PoolSlots:
+    """Pooled connections in use by all of a pool's clients."""
+
+    def __init__(self, size: int, reserve: int):
+        """
+        Initialize the counter.
+
+        Args:
+            size: Connections in the pool
+            reserve: Connections kept for tenants with nothing in flight
+        """
+        self.size = size
+        self.reserve = reserve
+        self.in_use = 0
+        self.cond = threading.Condition()
+        self._pid = os.getpid()
+
+    def reset_after_fork(self) -> None:
+        """
+        Free the connections the parent process had in use, if this process
+        was forked from the one that last used the counter.
+
+        Runs once per process, however many tenants share the counter.
+        """
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        self._pid = pid
+        self.in_use = 0
+        self.cond = threading.Condition()
+
+
+class _TenantLimiter(ConcurrencyLimiter):
+    """
+    Fixed cap on one tenant's requests in flight.
+
+    Unlike the AIMD limiter, the cap does not move with latency or 429s. A
+    tenant that already has a request in flight only gets another while more
+    than ``reserve`` pooled connections are free, so tenants with nothing in
+    flight always find one. The tenants of a pool wait on one condition,
+    since a connection freed by one may be what another is waiting for.
+    """
+
+    def __init__(self, limit: int, slots: _PoolSlots):
+        """
+        Initialize the limiter.
+
+        Args:
+            limit: Most requests the tenant may have in flight
+            slots: Connection counter shared by the pool's tenants
+        """
+        super().__init__(initial_limit=limit, min_limit=limit, max_limit=limit)
+        self._slots = slots
+        self._cond = slots.cond
+
+    def _try_acquire(self) -> bool:
+        """Take a slot if the cap and the reserve allow; the caller holds the lock."""
+        slots = self._slots
+        needed = 1 if self._in_flight == 0 else slots.reserve + 1
+        if self._in_flight >= self.limit or slots.size - slots.in_use < needed:
+            return False
+        self._in_flight += 1
+        slots.in_use += 1
+        return True
+
+    def reset_after_fork(self) -> None:
+        """Free the parent's slots, and wait on the pool's new condition."""
+        self._slots.reset_after_fork()
+        super().reset_after_fork()
+        self._cond = self._slots.cond
+
+    def release(
+        self,
+        endpoint: str,
+        started: float,
+        latency: Optional[float] = None,
+        rate_limited: bool = False,
+    ) -> None:
+        """
+        Return a slot; the outcome does not change the cap.
+
+        Args:
+            endpoint: API endpoint path
+            started: time.monotonic() when the request was sent
+            latency: Ignored
+            rate_limited: Ignored
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self._slots.in_use -= 1
+            self._cond.notify_all()
+
+
+class ClozeClientPool:
+    """
+    Hands out one ClozeClient per credential, all sending through one
+    connection pool.
+
+    Each client keeps its own auth headers, cookies and metrics, so one
+    tenant's 429s or slow responses only slow that tenant down. Each client
+    may hold at most ``max_in_flight_per_client`` of the pooled connections,
+    and ``reserved_connections`` are only handed to tenants with nothing in
+    flight, so busy tenants together cannot starve the others. A shared
+    RateLimiter keeps a separate budget per credential.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 50,
+        pool_block: bool = True,
+        tcp_keepalive: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_in_flight_per_client: Optional[int] = None,
+        reserved_connections: Optional[int] = None,
+        **client_options: Any,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            pool_connections: Number of per-host connection pools to cache (default: 10)
+            pool_maxsize: Maximum pooled connections per host, shared by all
+                clients (default: 50)
+            pool_block: If True, wait for a free pooled connection instead of
+                opening a throwaway one (default: True)
+            tcp_keepalive: Idle seconds before TCP keep-alive probes are sent
+                (default: None, OS defaults)
+            rate_limiter: Optional RateLimiter shared by all clients; budgets
+                are kept per credential
+            max_in_flight_per_client: Most requests one client may have in
+                flight (default: half of ``pool_maxsize``)
+            reserved_connections: Pooled connections a client with a request
+                already in flight may not take, kept for other tenants
+                (default: a tenth of ``pool_maxsize``, at least 1)
+            **client_options: Further ClozeClient arguments applied to every
+                client, e.g. ``base_url`` or ``retry_policy``
+
+        Raises:
+            ValueError: If ``client_options`` sets ``adapter``,
+                ``concurrency_limiter`` or ``http2``, which the pool manages,
+                or ``reserved_connections`` is not below ``pool_maxsize``
+        """
+        for name in _POOL_MANAGED_OPTIONS:
+            if name in client_options:
+                raise ValueError(
+                    f"{name} cannot be set on a ClozeClientPool; its clients share "
+                    "the pool's connections and per-tenant limits"
+                )
+        if reserved_connections is None:
+            reserved_connections = min(pool_maxsize - 1, max(1, pool_maxsize // 10))
+        if not 0 <= reserved_connections < pool_maxsize:
+            raise ValueError("reserved_connections must be at least 0 and below pool_maxsize")
+
+        from .transport import PoolingHTTPAdapter
+
+        self.adapter = PoolingHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            tcp_keepalive=tcp_keepalive,
+        )
+        self.rate_limiter = rate_limiter
+        self.max_in_flight_per_client = (
+            max_in_flight_per_client
+            if max_in_flight_per_client is not None
+            else max(1, pool_maxsize // 2)
+        )
+        self.reserved_connections = reserved_connections
+        self.client_options = client_options
+        self._slots = _PoolSlots(pool_maxsize, reserved_connections)
+        self._clients: Dict[Tuple[Optional[str], Optional[str]], ClozeClient] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of clients in the pool."""
+        return len(self._clients)
+
+    def client(
+        self, api_key: Optional[str] = None, oauth_token: Optional[str] = None
+    ) -> ClozeClient:
+        """
+        Get the client for a credential, creating it on first use.
+
+        Args:
+            api_key: API key of the tenant
+            oauth_token: OAuth 2.0 access token of the tenant
+
+        Returns:
+            ClozeClient sending through the pool's connections
+
+        Raises:
+            ValueError: If neither credential is given
+        """
+        key = (api_key, oauth_token)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = ClozeClient(
+                    api_key=api_key,
+                    oauth_token=oauth_token,
+                    rate_limiter=self.rate_limiter,
+                    concurrency_limiter=_TenantLimiter(
+                        self.max_in_flight_per_client, self._slots
+                    ),
+                    adapter=self.adapter,
+                    **self.client_options,
+                )
+            return client
+
+    def remove(
+        self, api_key: Optional[str] = None, oauth_token: Optional[str] = None
+    ) -> bool:
+        """
+        Drop the client for a credential, e.g. when a tenant is offboarded.
+
+        Args:
+            api_key: API key of the tenant
+            oauth_token: OAuth 2.0 access token of the tenant
+
+        Returns:
+            True if a client was dropped
+        """
+        with self._lock:
+            return self._clients.pop((api_key, oauth_token), None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with the number of clients and the shared connection
+            pool's statistics (see ClozeClient.pool_stats())
+        """
+        return {"clients": len(self._clients), **self.adapter.stats()}
+
+    def close(self) -> None:
+        """Drop every client and close the pooled connections."""
+        with self._lock:
+            self._clients.clear()
+        self.adapter.close()
@@ -17,7 +17,10 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .streaming import StreamedPage
 
 
 class Projects:
@@ -98,8 +101,9 @@ class Projects:
         pagenumber: Optional[int] = None,
         pagesize: Optional[int] = None,
         countonly: Optional[bool] = None,
+        stream: bool = False,
         **kwargs
-    ) -> Dict[str, Any]:
+    ) -> Union[Dict[str, Any], "StreamedPage"]:
         """
         Find projects with extensive query, sort and group by options.
 
@@ -108,10 +112,12 @@ class Projects:
             pagenumber: Page number for pagination
             pagesize: Page size for pagination
             countonly: If True, return only count
+            stream: If True, return a StreamedPage that parses matching
+                records incrementally instead of a decoded dict
             **kwargs: Additional query parameters
 
         Returns:
-            List of matching projects or count
+            List of matching projects or count (a StreamedPage if stream is True)
         """
         params = kwargs.copy()
         if query:
@@ -123,6 +129,8 @@ class Projects:
         if countonly is not None:
             params["countonly"] = countonly
 
+        if stream:
+            return self.client._stream_request("GET", "/v1/projects/find", params=params)
         return self.client._make_request("GET", "/v1/projects/find", params=params)
 
     def feed(
@@ -131,8 +139,9 @@ class Projects:
         segment: Optional[str] = None,
         stage: Optional[str] = None,
         scope: Optional[str] = None,
+        stream: bool = False,
         **kwargs
-    ) -> Dict[str, Any]:
+    ) -> Union[Dict[str, Any], "StreamedPage"]:
         """
         Bulk retrieval of project records with cursor-based pagination.
 
@@ -141,10 +150,12 @@ class Projects:
             segment: Filter by segment
             stage: Filter by stage
             scope: Filter by scope (team, local, etc.)
+            stream: If True, return a StreamedPage that parses records
+                incrementally instead of a decoded dict
             **kwargs: Additional parameters
 
         Returns:
-            Project records and next cursor
+            Project records and next cursor (a StreamedPage if stream is True)
         """
         params = kwargs.copy()
         if cursor:
@@ -156,4 +167,49 @@ class Projects:
         if scope:
             params["scope"] = scope
 
+        if stream:
+            return self.client._stream_request("GET", "/v1/projects/feed", params=params)
         return self.client._make_request("GET", "/v1/projects/feed", params=params)
+
+    def iter_find(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        pagesize: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Iterate over every matching project record, fetching pages as needed.
+
+        Args:
+            query: Query parameters
+            pagesize: Page size for each request (default: 100)
+            timeout: Seconds allowed for the whole iteration; once it passes
+                no further pages are requested and ClozeTimeoutError is raised
+            **kwargs: Additional query parameters
+
+        Returns:
+            Iterator of project records (async iterator on AsyncClozeClient)
+        """
+        params: Dict[str, Any] = {"query": query, **kwargs}
+        if pagesize is not None:
+            params["pagesize"] = pagesize
+        return self.client._paginate(
+            self.find, "projects", params, cursor=False, timeout=timeout
+        )
+
+    def iter_feed(self, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Iterate over project records of the feed, following cursors as needed.
+
+        Args:
+            timeout: Seconds allowed for the whole iteration; once it passes
+                no further pages are requested and ClozeTimeoutError is raised
+            **kwargs: Filters accepted by feed() (segment, stage, scope, ...)
+
+        Returns:
+            Iterator of project records (async iterator on AsyncClozeClient)
+        """
+        return self.client._paginate(
+            self.feed, "projects", kwargs, cursor=True, timeout=timeout
+        )
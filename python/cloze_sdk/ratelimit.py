@@ -0,0 +1,238 @@
+"""
+Client-side token-bucket rate limiting for Cloze API requests.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_GROUP = "*"
+
+
+class RateLimiter:
+    """
+    In-process token-bucket rate limiter shared by all threads.
+
+    Buckets are kept per credential and per endpoint group. Each request
+    reserves one token; when the bucket is empty the reservation is queued
+    behind earlier ones and the caller waits until its token is due, so
+    concurrent callers are paced rather than released all at once.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        groups: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate: Requests per second allowed for endpoints outside any group
+            burst: Bucket capacity for the default group (default: rate, minimum 1)
+            groups: Mapping of endpoint path prefix (e.g. '/v1/analytics') to a
+                (rate, burst) tuple with its own budget
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.groups = dict(groups or {})
+        # Longest prefix first so the most specific group wins
+        self._prefixes: List[str] = sorted(self.groups, key=len, reverse=True)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def group_for(self, endpoint: str) -> str:
+        """
+        Resolve the endpoint group for a request path.
+
+        Args:
+            endpoint: API endpoint path
+
+        Returns:
+            Matching group prefix, or the default group
+        """
+        for prefix in self._prefixes:
+            if endpoint.startswith(prefix):
+                return prefix
+        return DEFAULT_GROUP
+
+    def limits_for(self, group: str) -> Tuple[float, float]:
+        """
+        Get the (rate, burst) budget for a group.
+
+        Args:
+            group: Group name returned by group_for()
+
+        Returns:
+            Tuple of (rate, burst)
+        """
+        return self.groups.get(group, (self.rate, self.burst))
+
+    def reserve(
+        self, credential: str, endpoint: str, max_wait: Optional[float] = None
+    ) -> float:
+        """
+        Reserve a token for a request without blocking.
+
+        Args:
+            credential: Opaque credential key the budget belongs to
+            endpoint: API endpoint path
+            max_wait: Longest wait the caller will accept, e.g. the time left
+                before its deadline; a token that would take this long or
+                longer is not reserved (default: None, no limit)
+
+        Returns:
+            Seconds the caller must wait before sending the request. If that
+            is ``max_wait`` or more, no token was reserved.
+        """
+        group = self.group_for(endpoint)
+        key = f"{credential}|{group}"
+        rate, burst = self.limits_for(group)
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(key, (burst, now))
+            tokens, wait = _take(tokens, last, now, rate, burst)
+            if _accepts(wait, max_wait):
+                self._buckets[key] = (tokens, now)
+        return wait
+
+    def acquire(self, credential: str, endpoint: str) -> float:
+        """
+        Block until a request may be sent.
+
+        Args:
+            credential: Opaque credential key the budget belongs to
+            endpoint: API endpoint path
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(credential, endpoint)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    Token-bucket rate limiter shared between processes through a state file.
+
+    Bucket state is stored as JSON and updated under an exclusive ``flock``,
+    so every worker on a host pointing at the same file draws from the same
+    budget. Requires a POSIX platform.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        burst: Optional[float] = None,
+        groups: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        """
+        Initialize the file-backed rate limiter.
+
+        Args:
+            path: Path of the shared state file (created if missing)
+            rate: Requests per second allowed for endpoints outside any group
+            burst: Bucket capacity for the default group (default: rate, minimum 1)
+            groups: Mapping of endpoint path prefix to a (rate, burst) tuple
+        """
+        super().__init__(rate, burst=burst, groups=groups)
+        import fcntl
+
+        self._fcntl = fcntl
+        self.path = path
+
+    def reserve(
+        self, credential: str, endpoint: str, max_wait: Optional[float] = None
+    ) -> float:
+        """
+        Reserve a token for a request without blocking.
+
+        Args:
+            credential: Opaque credential key the budget belongs to
+            endpoint: API endpoint path
+            max_wait: Longest wait the caller will accept, e.g. the time left
+                before its deadline; a token that would take this long or
+                longer is not reserved (default: None, no limit)
+
+        Returns:
+            Seconds the caller must wait before sending the request. If that
+            is ``max_wait`` or more, no token was reserved.
+        """
+        group = self.group_for(endpoint)
+        key = f"{credential}|{group}"
+        rate, burst = self.limits_for(group)
+        # The thread lock keeps threads of this process from contending on flock
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                self._fcntl.flock(fd, self._fcntl.LOCK_EX)
+                state = _read_state(fd)
+                now = time.time()
+                tokens, last = state.get(key, (burst, now))
+                tokens, wait = _take(tokens, last, now, rate, burst)
+                if _accepts(wait, max_wait):
+                    state[key] = [tokens, now]
+                    payload = json.dumps(state).encode("utf-8")
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    os.ftruncate(fd, 0)
+                    os.write(fd, payload)
+            finally:
+                os.close(fd)
+        return wait
+
+
+def _take(
+    tokens: float, last: float, now: float, rate: float, burst: float
+) -> Tuple[float, float]:
+    """Refill a bucket, take one token and return (tokens, wait seconds)."""
+    tokens = min(burst, tokens + max(0.0, now - last) * rate)
+    tokens -= 1
+    wait = 0.0 if tokens >= 0 else -tokens / rate
+    return tokens, wait
+
+
+def _accepts(wait: float, max_wait: Optional[float]) -> bool:
+    """Check whether a token due in ``wait`` seconds should be reserved."""
+    return wait == 0 or max_wait is None or wait < max_wait
+
+
+def _read_state(fd: int) -> Dict[str, Tuple[float, float]]:
+    """Read bucket state from an open, locked state file."""
+    os.lseek(fd, 0, os.SEEK_SET)
+    chunks = []
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    if not chunks:
+        return {}
+    try:
+        return json.loads(b"".join(chunks).decode("utf-8"))
+    except ValueError:
+        # A corrupt file only loses accumulated budget; start over
+        return {}
@@ -0,0 +1,193 @@
+"""
+Sampled, redacting debug logs of Cloze API requests.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import logging
+import random
+import re
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+from urllib.parse import quote
+
+REDACTED = "[REDACTED]"
+
+
+class RequestLogger:
+    """
+    Logs every attempt of sampled requests as a structured record.
+
+    Records go to the ``cloze_sdk`` logger at DEBUG level by default. The
+    message is a one-line summary; the full record (URL, query parameters,
+    headers, bodies, status, timing) is attached as ``record.cloze`` for
+    structured formatters. Credentials in the ``Authorization`` header and
+    the ``api_key`` query parameter are replaced with ``[REDACTED]``, also
+    where the parameter appears in the URL or a transport error's message,
+    and bodies are cut to ``max_body_bytes``.
+
+    Whether to log is decided once per request, before it is sent: when the
+    logger is not enabled for the level, or the request is not sampled,
+    nothing is formatted or serialized.
+    """
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        level: int = logging.DEBUG,
+        sample_rate: float = 1.0,
+        max_body_bytes: int = 4096,
+        redact_headers: Iterable[str] = ("Authorization", "Cookie", "Set-Cookie"),
+        redact_params: Iterable[str] = ("api_key",),
+    ):
+        """
+        Initialize the logger.
+
+        Args:
+            logger: Logger to write to (default: the ``cloze_sdk`` logger)
+            level: Level records are logged at (default: DEBUG)
+            sample_rate: Fraction of requests to log, 0.0 to 1.0 (default: 1.0)
+            max_body_bytes: Characters of each body to capture (default: 4096)
+            redact_headers: Header names whose values are redacted,
+                case-insensitive
+            redact_params: Query parameter names whose values are redacted
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0.0 and 1.0")
+        self.logger = logger if logger is not None else logging.getLogger("cloze_sdk")
+        self.level = level
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.redact_headers = frozenset(name.lower() for name in redact_headers)
+        self.redact_params = frozenset(redact_params)
+        # name=value in query strings embedded in URLs and error messages
+        names = "|".join(re.escape(quote(name, safe="")) for name in sorted(self.redact_params))
+        self._param_pattern = (
+            re.compile(rf"([?&;](?:{names})=)[^&;#\s'\"]+") if names else None
+        )
+
+    def sample(self) -> bool:
+        """
+        Decide whether to log a request about to be sent.
+
+        Returns:
+            True if the logger is enabled for the level and the request is sampled
+        """
+        if not self.logger.isEnabledFor(self.level):
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def log_attempt(
+        self,
+        request_kwargs: Dict[str, Any],
+        headers: Mapping[str, str],
+        attempt: int,
+        elapsed: float,
+        response: Any = None,
+        error: Optional[BaseException] = None,
+        stream: bool = False,
+    ) -> None:
+        """
+        Log one HTTP attempt of a sampled request.
+
+        Args:
+            request_kwargs: Keyword arguments the transport was called with
+            headers: Session headers the request was sent with
+            attempt: Attempt number, starting at 1
+            elapsed: Seconds the attempt took
+            response: Response object (requests or httpx), if one arrived
+            error: Transport exception, if the attempt failed
+            stream: If True, the response body was not read and is not captured
+        """
+        sent_headers = dict(headers)
+        sent_headers.update(request_kwargs.get("headers") or {})
+        record: Dict[str, Any] = {
+            "method": request_kwargs["method"],
+            "url": self._redact_text(request_kwargs["url"]),
+            "params": self._redact(request_kwargs.get("params") or {}, self.redact_params),
+            "request_headers": self._redact_headers(sent_headers),
+            "request_body": self._request_body(request_kwargs, sent_headers),
+            "attempt": attempt,
+            "elapsed_ms": round(elapsed * 1000, 3),
+        }
+        if response is not None:
+            record["status"] = response.status_code
+            record["response_headers"] = self._redact_headers(
+                getattr(response, "headers", None) or {}
+            )
+            content = getattr(response, "content", None)
+            if not stream and isinstance(content, bytes):
+                record["response_body"] = self._truncate(content)
+        if error is not None:
+            # requests puts the full URL, query string included, in the message
+            record["error"] = self._redact_text(f"{type(error).__name__}: {error}")
+
+        self.logger.log(
+            self.level,
+            "cloze %s %s attempt %d -> %s in %.1f ms",
+            record["method"],
+            record["url"],
+            attempt,
+            record.get("status", record.get("error")),
+            record["elapsed_ms"],
+            extra={"cloze": record},
+        )
+
+    @staticmethod
+    def _redact(values: Mapping[str, Any], names: Iterable[str]) -> Dict[str, Any]:
+        """Copy a mapping with the values of the named keys redacted."""
+        return {key: REDACTED if key in names else value for key, value in values.items()}
+
+    def _redact_text(self, text: str) -> str:
+        """Redact the values of redacted parameters in URLs within text."""
+        if self._param_pattern is None:
+            return text
+        return self._param_pattern.sub(rf"\g<1>{REDACTED}", text)
+
+    def _redact_headers(self, headers: Mapping[str, str]) -> Dict[str, str]:
+        """Copy headers with credential values redacted."""
+        return {
+            name: REDACTED if name.lower() in self.redact_headers else value
+            for name, value in headers.items()
+        }
+
+    def _request_body(
+        self, request_kwargs: Dict[str, Any], headers: Mapping[str, str]
+    ) -> Optional[str]:
+        """Render the request body as sent, or None if there is none."""
+        if "json" in request_kwargs:
+            return self._truncate(json.dumps(request_kwargs["json"], default=str))
+        body = request_kwargs.get("data", request_kwargs.get("content"))
+        if body is None:
+            return None
+        if isinstance(body, bytes):
+            encoding = headers.get("Content-Encoding")
+            if encoding:
+                return f"<{len(body)} bytes {encoding}>"
+        elif not isinstance(body, str):
+            body = json.dumps(body, default=str)
+        return self._truncate(body)
+
+    def _truncate(self, body: Union[bytes, str]) -> str:
+        """Cut a body to max_body_bytes, noting how much was left out."""
+        if isinstance(body, bytes):
+            text = body[: self.max_body_bytes].decode("utf-8", errors="replace")
+        else:
+            text = body[: self.max_body_bytes]
+        omitted = len(body) - self.max_body_bytes
+        if omitted > 0:
+            text += f"... ({omitted} more)"
+        return text
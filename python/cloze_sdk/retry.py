@@ -0,0 +1,235 @@
+"""
+Retry policy for transient Cloze API failures.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import random
+import sys
+import time
+from typing import Any, Iterable, Optional, Tuple, Type
+
+# Values of X-RateLimit-Reset above this are treated as epoch seconds rather
+# than a delay in seconds.
+_EPOCH_THRESHOLD = 10**9
+
+
+def parse_retry_after(headers: Any, now: Optional[float] = None) -> Optional[float]:
+    """
+    Extract the server-requested wait time from response headers.
+
+    Looks at ``Retry-After`` (delay seconds or HTTP date), then
+    ``RateLimit-Reset`` and ``X-RateLimit-Reset`` (delay seconds or epoch
+    seconds).
+
+    Args:
+        headers: Response headers mapping
+        now: Current epoch time (defaults to time.time())
+
+    Returns:
+        Seconds to wait, or None if no usable header is present
+    """
+    if not headers:
+        return None
+    if now is None:
+        now = time.time()
+
+    retry_after = headers.get("Retry-After")
+    if isinstance(retry_after, str):
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        # email.utils is slow to import and HTTP dates are rare here
+        from email.utils import parsedate_to_datetime
+
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now)
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    for header in ("RateLimit-Reset", "X-RateLimit-Reset"):
+        reset = headers.get(header)
+        if not isinstance(reset, str):
+            continue
+        try:
+            value = float(reset)
+        except ValueError:
+            continue
+        if value > _EPOCH_THRESHOLD:
+            value -= now
+        return max(0.0, value)
+
+    return None
+
+
+def transport_exceptions() -> Tuple[Type[BaseException], ...]:
+    """
+    Get the default retryable transport exceptions.
+
+    Covers connection errors and timeouts of requests and httpx, for
+    whichever of them a client has imported. Neither is imported here, so
+    users only pay for the HTTP library their transport uses.
+
+    Returns:
+        Tuple of exception types
+    """
+    exceptions: Tuple[Type[BaseException], ...] = ()
+    requests = sys.modules.get("requests")
+    if requests is not None:
+        exceptions += (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        )
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        exceptions += (httpx.NetworkError, httpx.TimeoutException)
+    return exceptions
+
+
+class RetryPolicy:
+    """Configurable retry policy with full-jitter exponential backoff."""
+
+    DEFAULT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+    DEFAULT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        jitter: bool = True,
+        retry_on_status: Optional[Iterable[int]] = None,
+        retry_on_exceptions: Optional[Tuple[Type[BaseException], ...]] = None,
+        retry_methods: Optional[Iterable[str]] = None,
+        respect_retry_after: bool = True,
+        max_retry_after: Optional[float] = 120.0,
+    ):
+        """
+        Initialize the retry policy.
+
+        A 429 response is retried for every HTTP method, since the request was
+        rejected before being processed. Other retryable statuses and
+        exceptions are only retried for methods in ``retry_methods``, so that
+        non-idempotent POSTs are not replayed after a partial failure.
+
+        Args:
+            max_attempts: Total number of attempts, including the first (default: 3)
+            backoff_base: Base delay in seconds for exponential backoff (default: 0.5)
+            backoff_cap: Maximum backoff delay in seconds (default: 30)
+            jitter: If True, use full jitter (uniform between 0 and the backoff)
+            retry_on_status: HTTP status codes to retry (default: 429, 500, 502, 503, 504)
+            retry_on_exceptions: Transport exception types to retry
+                (default: connection errors and timeouts of requests and httpx)
+            retry_methods: HTTP methods eligible for retry besides 429
+                (default: idempotent methods)
+            respect_retry_after: Honor Retry-After and rate-limit reset headers
+            max_retry_after: Give up instead of waiting longer than this many
+                seconds when the server asks for it (None for no limit)
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retry_on_status = frozenset(
+            self.DEFAULT_STATUS_CODES if retry_on_status is None else retry_on_status
+        )
+        self.retry_on_exceptions = (
+            None if retry_on_exceptions is None else tuple(retry_on_exceptions)
+        )
+        self.retry_methods = frozenset(
+            m.upper()
+            for m in (self.DEFAULT_METHODS if retry_methods is None else retry_methods)
+        )
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Compute the backoff delay after a failed attempt.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+
+        Returns:
+            Delay in seconds
+        """
+        delay = min(self.backoff_cap, self.backoff_base * (2 ** (attempt - 1)))
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+    def should_retry_exception(
+        self, method: str, exc: BaseException, attempt: int
+    ) -> bool:
+        """
+        Decide whether a transport exception should be retried.
+
+        Args:
+            method: HTTP method of the request
+            exc: Exception raised by the transport
+            attempt: Number of the attempt that just failed (1-based)
+
+        Returns:
+            True if another attempt should be made
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if method.upper() not in self.retry_methods:
+            return False
+        return isinstance(exc, self.retry_on_exceptions or transport_exceptions())
+
+    def should_retry_response(self, method: str, response: Any, attempt: int) -> bool:
+        """
+        Decide whether a response status should be retried.
+
+        Args:
+            method: HTTP method of the request
+            response: Response object
+            attempt: Number of the attempt that just completed (1-based)
+
+        Returns:
+            True if another attempt should be made
+        """
+        if attempt >= self.max_attempts:
+            return False
+        status = response.status_code
+        if status not in self.retry_on_status:
+            return False
+        return status == 429 or method.upper() in self.retry_methods
+
+    def delay_for_response(self, response: Any, attempt: int) -> Optional[float]:
+        """
+        Compute how long to wait before retrying a response.
+
+        Args:
+            response: Response object that will be retried
+            attempt: Number of the attempt that just completed (1-based)
+
+        Returns:
+            Delay in seconds, or None if the server asked for a longer wait
+            than ``max_retry_after`` allows
+        """
+        if self.respect_retry_after:
+            retry_after = parse_retry_after(getattr(response, "headers", None))
+            if retry_after is not None:
+                if self.max_retry_after is not None and retry_after > self.max_retry_after:
+                    return None
+                return retry_after
+        return self.backoff(attempt)
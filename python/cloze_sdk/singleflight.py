@@ -0,0 +1,181 @@
+"""
+Coalescing of identical concurrent requests.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .exceptions import ClozeTimeoutError
+
+
+def request_key(method: str, endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+    """
+    Build a key identifying a request by method, endpoint and parameters.
+
+    Parameters are serialized with sorted keys, so the same parameters in a
+    different order map to the same key.
+
+    Args:
+        method: HTTP method
+        endpoint: API endpoint path
+        params: Query parameters
+
+    Returns:
+        Key string
+    """
+    encoded = json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{method.upper()} {endpoint}?{encoded}"
+
+
+class _Call:
+    """A call in flight and its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Share one execution among threads making the same call at the same time.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait and receive the same result object, or the same exception.
+    Nothing is remembered once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Call identity, e.g. from request_key()
+            fn: Function to run
+            timeout: Seconds a waiting caller may wait for the shared call
+
+        Returns:
+            Tuple of (result, shared) where shared is True for waiting callers
+
+        Raises:
+            ClozeTimeoutError: If a waiting caller's timeout expires first
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        assert call is not None
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise ClozeTimeoutError("Deadline exceeded waiting for shared request")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# Outcome handed to waiters when the leading task was cancelled
+_ABANDONED = object()
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio variant of SingleFlight for callers on one event loop.
+
+    Cancelling the leading task does not fail its waiters: the flight is
+    dropped and the first waiter to resume runs the call again for the rest.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Any] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        Await ``fn()`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Call identity, e.g. from request_key()
+            fn: Coroutine function to run
+            timeout: Seconds a waiting caller may wait for the shared call
+
+        Returns:
+            Tuple of (result, shared) where shared is True for waiting callers
+
+        Raises:
+            ClozeTimeoutError: If a waiting caller's timeout expires first
+        """
+        # Imported here so the synchronous client does not load asyncio
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            wait = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                # shield: a waiter giving up must not cancel the shared call
+                result = await asyncio.wait_for(asyncio.shield(future), wait)
+            except asyncio.TimeoutError:
+                raise ClozeTimeoutError("Deadline exceeded waiting for shared request")
+            if result is not _ABANDONED:
+                return result, True
+
+        future = loop.create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Only the leader was cancelled; its waiters elect a new one
+            future.set_result(_ABANDONED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody was waiting for it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
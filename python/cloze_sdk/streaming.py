@@ -0,0 +1,281 @@
+"""
+Incremental parsing of large Cloze API list responses.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import time
+from typing import (Any, AsyncIterator, Callable, Dict, Iterable, Iterator,
+                    List, Optional)
+
+from .exceptions import ClozeAPIError
+
+# Top-level arrays whose items are yielded as records
+RECORD_KEYS = frozenset({"people", "companies", "projects", "results"})
+
+_SCALAR_EVENTS = frozenset({"null", "boolean", "integer", "double", "number", "string"})
+
+
+def _import_ijson() -> Any:
+    """Import ijson or raise a helpful error."""
+    try:
+        import ijson
+    except ImportError as e:
+        raise ImportError(
+            "Streaming responses require ijson. Install it with "
+            "'pip install cloze-sdk[streaming]'."
+        ) from e
+    return ijson
+
+
+class _PageParser:
+    """
+    Push parser turning response bytes into records and top-level fields.
+
+    Only the record currently being assembled is held in memory; completed
+    records are handed back from feed() as soon as their closing bracket
+    has been parsed.
+    """
+
+    def __init__(self):
+        ijson = _import_ijson()
+        self._ijson = ijson
+        self._events = ijson.sendable_list()
+        self._coro = ijson.parse_coro(self._events, use_float=True)
+        self.fields: Dict[str, Any] = {}
+        self._builder: Any = None
+        self._depth = 0
+        self.decode_seconds = 0.0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Parse a chunk and return the records it completed."""
+        started = time.thread_time()
+        try:
+            self._coro.send(chunk)
+            return self._drain()
+        except self._ijson.JSONError as e:
+            raise ClozeAPIError(f"Invalid response format: {e}")
+        finally:
+            self.decode_seconds += time.thread_time() - started
+
+    def close(self) -> List[Any]:
+        """Finish parsing and return any remaining records."""
+        started = time.thread_time()
+        try:
+            self._coro.close()
+            return self._drain()
+        except self._ijson.JSONError as e:
+            raise ClozeAPIError(f"Invalid response format: {e}")
+        finally:
+            self.decode_seconds += time.thread_time() - started
+
+    def _drain(self) -> List[Any]:
+        records = []
+        for prefix, event, value in self._events:
+            if self._builder is not None:
+                self._builder.event(event, value)
+                if event in ("start_map", "start_array"):
+                    self._depth += 1
+                elif event in ("end_map", "end_array"):
+                    self._depth -= 1
+                if self._depth == 0:
+                    records.append(self._builder.value)
+                    self._builder = None
+                continue
+
+            parent, _, leaf = prefix.rpartition(".")
+            if leaf == "item" and parent in RECORD_KEYS:
+                if event in ("start_map", "start_array"):
+                    self._builder = self._ijson.ObjectBuilder()
+                    self._builder.event(event, value)
+                    self._depth = 1
+                else:
+                    records.append(value)
+            elif "." not in prefix and prefix and event in _SCALAR_EVENTS:
+                self.fields[prefix] = value
+        del self._events[:]
+        return records
+
+    def check_error(self, response: Any) -> None:
+        """Raise ClozeAPIError if the parsed body reported an API error."""
+        errorcode = self.fields.get("errorcode", 0)
+        if errorcode != 0:
+            message = self.fields.get("message", "Unknown API error")
+            raise ClozeAPIError(
+                f"API error: {message}", errorcode=errorcode, response=response
+            )
+
+
+class _BaseStreamedPage:
+    """Shared state of streamed pages."""
+
+    def __init__(
+        self,
+        response: Any,
+        on_complete: Optional[Callable[[float], None]],
+        on_finish: Optional[Callable[[Optional[BaseException]], Any]],
+    ):
+        self.response = response
+        self._parser = _PageParser()
+        self._on_complete = on_complete
+        self._on_finish = on_finish
+        self.complete = False
+        # Raw body bytes received so far
+        self.bytes_read = 0
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """Top-level scalar fields parsed so far (errorcode, cursor, ...)."""
+        return self._parser.fields
+
+    @property
+    def cursor(self) -> Optional[str]:
+        """Cursor for the next feed page, once parsed."""
+        return self._parser.fields.get("cursor")
+
+    @property
+    def availablecount(self) -> Optional[int]:
+        """Total number of matching records, once parsed."""
+        return self._parser.fields.get("availablecount")
+
+    def _finished(self) -> Optional[Callable[[Optional[BaseException]], Any]]:
+        """Take the on_finish callback, so that it runs only once."""
+        on_finish, self._on_finish = self._on_finish, None
+        return on_finish
+
+    def _finish(self) -> List[Any]:
+        records = self._parser.close()
+        self.complete = True
+        if self._on_complete is not None:
+            self._on_complete(self._parser.decode_seconds)
+        self._parser.check_error(self.response)
+        return records
+
+
+class StreamedPage(_BaseStreamedPage):
+    """
+    A list response parsed incrementally as bytes arrive.
+
+    Iterate to receive one record at a time from the ``people``,
+    ``companies``, ``projects`` or ``results`` array. Top-level fields such
+    as ``cursor`` and ``availablecount`` are available once the parser has
+    passed them, and always after iteration finishes. An API error in the
+    body is raised as ClozeAPIError at the end of iteration. A page can only
+    be iterated once; the connection is released when iteration ends.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        response: Any = None,
+        close: Optional[Callable[[], None]] = None,
+        on_complete: Optional[Callable[[float], None]] = None,
+        on_finish: Optional[Callable[[Optional[BaseException]], None]] = None,
+    ):
+        """
+        Initialize the page.
+
+        Args:
+            chunks: Iterable of raw response body chunks
+            response: Response object, attached to raised errors
+            close: Callable releasing the connection when iteration ends
+            on_complete: Callable receiving the parse CPU seconds when done
+            on_finish: Callable run once when iteration ends or the page is
+                closed, receiving the exception iteration failed with, if any
+        """
+        super().__init__(response, on_complete, on_finish)
+        self._chunks = chunks
+        self._close = close
+
+    def __iter__(self) -> Iterator[Any]:
+        error = None
+        try:
+            for chunk in self._chunks:
+                self.bytes_read += len(chunk)
+                yield from self._parser.feed(chunk)
+            yield from self._finish()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(error)
+
+    def close(self) -> None:
+        """Release the underlying connection."""
+        self._release(None)
+
+    def _release(self, error: Optional[BaseException]) -> None:
+        if self._close is not None:
+            self._close()
+            self._close = None
+        on_finish = self._finished()
+        if on_finish is not None:
+            on_finish(error)
+
+
+class AsyncStreamedPage(_BaseStreamedPage):
+    """Asyncio variant of StreamedPage; iterate with ``async for``."""
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        response: Any = None,
+        close: Optional[Callable[[], Any]] = None,
+        on_complete: Optional[Callable[[float], None]] = None,
+        on_finish: Optional[Callable[[Optional[BaseException]], Any]] = None,
+    ):
+        """
+        Initialize the page.
+
+        Args:
+            chunks: Async iterator of raw response body chunks
+            response: Response object, attached to raised errors
+            close: Coroutine function releasing the connection when iteration ends
+            on_complete: Callable receiving the parse CPU seconds when done
+            on_finish: Coroutine function run once when iteration ends or the
+                page is closed, receiving the exception iteration failed
+                with, if any
+        """
+        super().__init__(response, on_complete, on_finish)
+        self._chunks = chunks
+        self._close = close
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        error = None
+        try:
+            async for chunk in self._chunks:
+                self.bytes_read += len(chunk)
+                for record in self._parser.feed(chunk):
+                    yield record
+            for record in self._finish():
+                yield record
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            await self._release(error)
+
+    async def aclose(self) -> None:
+        """Release the underlying connection."""
+        await self._release(None)
+
+    async def _release(self, error: Optional[BaseException]) -> None:
+        if self._close is not None:
+            close, self._close = self._close, None
+            await close()
+        on_finish = self._finished()
+        if on_finish is not None:
+            await on_finish(error)
@@ -0,0 +1,206 @@
+"""
+OpenTelemetry tracing for Cloze API calls.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import contextvars
+import functools
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Iterator, Optional, TypeVar
+
+from . import __version__
+from .exceptions import ClozeAPIError
+from .middleware import Middleware, RequestContext
+
+T = TypeVar("T")
+
+_UNSET = object()
+_tracer: Any = _UNSET
+
+
+def get_tracer() -> Any:
+    """
+    Get the tracer spans are reported to.
+
+    Defaults to the ``cloze_sdk`` tracer of the global OpenTelemetry tracer
+    provider, resolved on first use.
+
+    Returns:
+        OpenTelemetry tracer, or None if opentelemetry is not installed or
+        tracing was disabled with set_tracer(None)
+    """
+    global _tracer
+    if _tracer is _UNSET:
+        try:
+            from opentelemetry import trace
+        except ImportError:  # pragma: no cover - opentelemetry is an optional dependency
+            _tracer = None
+        else:
+            _tracer = trace.get_tracer("cloze_sdk", __version__)
+    return _tracer
+
+
+def set_tracer(tracer: Any) -> None:
+    """
+    Report spans to a specific tracer.
+
+    Args:
+        tracer: OpenTelemetry tracer, or None to disable tracing
+    """
+    global _tracer
+    _tracer = tracer
+
+
+@contextmanager
+def trace_operation(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Open a parent span around a multi-request operation.
+
+    API calls made inside the block, including from threads started with
+    propagate() and from asyncio tasks created inside it, become its children.
+
+    Args:
+        name: Span name, e.g. 'crm-sync'
+        **attributes: Span attributes
+
+    Yields:
+        The span, or None when tracing is unavailable
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def propagate(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wrap a function to run in the caller's context when called on another thread.
+
+    The current span and deadline are captured when propagate() is called,
+    so spans opened by ``fn`` in a worker thread join the caller's trace::
+
+        with trace_operation("bulk-create"):
+            pool.map(propagate(client.people.create), people)
+
+    Args:
+        fn: Function to wrap
+
+    Returns:
+        Wrapped function
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        # A Context can only be entered by one thread at a time
+        return context.copy().run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+def use_span(span: Any) -> ContextManager[Any]:
+    """
+    Make a span current for the duration of a block without ending it.
+
+    Args:
+        span: Span, or None for a no-op
+
+    Returns:
+        Context manager
+    """
+    if span is None:
+        return nullcontext()
+    from opentelemetry import trace
+
+    return trace.use_span(span, end_on_exit=False)
+
+
+class TracingMiddleware(Middleware):
+    """
+    Middleware opening a client span for every API call.
+
+    Spans are named ``cloze <METHOD> <endpoint>`` and carry the endpoint,
+    HTTP status, attempt and retry counts, body sizes and, for API errors,
+    the Cloze ``errorcode``. Installed by ``ClozeClient(tracing=True)``.
+    """
+
+    def __init__(self, tracer: Any = None):
+        """
+        Initialize the middleware.
+
+        Args:
+            tracer: OpenTelemetry tracer (default: get_tracer())
+        """
+        from opentelemetry.trace import SpanKind
+
+        self.tracer = tracer if tracer is not None else get_tracer()
+        self._kind = SpanKind.CLIENT
+
+    def before_request(self, context: RequestContext) -> None:
+        name = f"cloze {context.method} {context.endpoint}"
+        attributes = {
+            "http.request.method": context.method,
+            "cloze.endpoint": context.endpoint,
+        }
+        if context.stream:
+            # The span ends once the caller has read the page; making it
+            # current until then would adopt the caller's unrelated spans
+            context.state["tracing.span"] = self.tracer.start_span(
+                name, kind=self._kind, attributes=attributes
+            )
+            return
+        scope = self.tracer.start_as_current_span(
+            name, kind=self._kind, attributes=attributes
+        )
+        context.state["tracing.span"] = scope.__enter__()
+        context.state["tracing.scope"] = scope
+
+    def after_response(self, context: RequestContext) -> None:
+        self._finish(context, None)
+
+    def on_error(self, context: RequestContext) -> None:
+        self._finish(context, context.error)
+
+    def _finish(self, context: RequestContext, error: Optional[BaseException]) -> None:
+        """Set the outcome attributes and end the span."""
+        span = context.state.pop("tracing.span", None)
+        if span is None:
+            # An earlier middleware failed before this one started a span
+            return
+        scope = context.state.pop("tracing.scope", None)
+        span.set_attribute("cloze.attempts", context.attempts)
+        span.set_attribute("cloze.retries", max(0, context.attempts - 1))
+        span.set_attribute("cloze.request_bytes", context.request_bytes)
+        span.set_attribute("cloze.response_bytes", context.response_bytes)
+        if context.status is not None:
+            span.set_attribute("http.response.status_code", context.status)
+        if isinstance(error, ClozeAPIError) and error.errorcode is not None:
+            span.set_attribute("cloze.errorcode", error.errorcode)
+        if scope is not None:
+            if error is None:
+                scope.__exit__(None, None, None)
+            else:
+                scope.__exit__(type(error), error, error.__traceback__)
+            return
+        if error is not None:
+            from opentelemetry.trace import Status, StatusCode
+
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, f"{type(error).__name__}: {error}"))
+        span.end()
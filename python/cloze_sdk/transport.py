@@ -0,0 +1,240 @@
+"""
+HTTP transport configuration for the Cloze client.
+
+Copyright (C) 2025 Cloze SDK Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import socket
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .hedging import current_interrupt
+
+
+def keepalive_socket_options(idle: float) -> List[Tuple[int, int, int]]:
+    """
+    Build socket options enabling TCP keep-alive probes.
+
+    Args:
+        idle: Seconds a connection may sit idle before the first probe
+
+    Returns:
+        Socket options suitable for urllib3's ``socket_options``
+    """
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    seconds = max(1, int(idle))
+    # Fine-grained knobs are platform specific (Linux/BSD vs macOS)
+    for name in ("TCP_KEEPIDLE", "TCP_KEEPALIVE"):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), seconds))
+            break
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, seconds))
+    return options
+
+
+class _InterruptibleHTTPConnection(HTTPConnection):
+    """HTTP connection whose response wait a hedge can interrupt."""
+
+    def getresponse(self, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        """Read the response headers, exposing the socket to the current Interrupt."""
+        interrupt = current_interrupt.get()
+        if interrupt is None or self.sock is None:
+            return super().getresponse(*args, **kwargs)
+        interrupt.attach(self.sock)
+        try:
+            return super().getresponse(*args, **kwargs)
+        finally:
+            # Detached before the connection can go back to the pool, so a
+            # late interrupt never hits another request's socket
+            interrupt.detach()
+
+
+class _InterruptibleHTTPSConnection(_InterruptibleHTTPConnection, HTTPSConnection):
+    """HTTPS connection whose response wait a hedge can interrupt."""
+
+
+class _HTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _InterruptibleHTTPConnection
+
+
+class _HTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _InterruptibleHTTPSConnection
+
+
+class PoolingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with tunable pooling and pool-saturation accounting.
+
+    Every send is counted as in flight until the response is returned. When
+    more requests are in flight than the pool holds connections, the request
+    is counted as saturated: with ``pool_block=True`` it waited for a free
+    connection, otherwise it opened a connection that will be discarded.
+
+    Its connections can be interrupted while waiting for a response, which
+    the synchronous client uses to cut short a request a hedge has beaten.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        tcp_keepalive: Optional[float] = None,
+    ):
+        """
+        Initialize the adapter.
+
+        Args:
+            pool_connections: Number of per-host pools to cache
+            pool_maxsize: Maximum connections kept per host pool
+            pool_block: Wait for a free connection instead of opening extra ones
+            tcp_keepalive: Idle seconds before TCP keep-alive probes (None disables)
+        """
+        self.tcp_keepalive = tcp_keepalive
+        self._pid = os.getpid()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.saturated = 0
+        self._stats_lock = threading.Lock()
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        """Create the pool manager, adding keep-alive socket options if enabled."""
+        if self.tcp_keepalive is not None:
+            pool_kwargs.setdefault(
+                "socket_options", keepalive_socket_options(self.tcp_keepalive)
+            )
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _HTTPConnectionPool,
+            "https": _HTTPSConnectionPool,
+        }
+
+    def reset_after_fork(self) -> None:
+        """
+        Drop the pooled connections if this process was forked from the one
+        that opened them.
+
+        The child's copies of the parent's sockets are abandoned without
+        being shut down, so the parent's connections stay usable. Runs once
+        per process, however many clients share the adapter.
+        """
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        self._pid = pid
+        # The lock may have been held by a parent thread that does not exist here
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.proxy_manager = {}
+        self.init_poolmanager(
+            self._pool_connections, self._pool_maxsize, block=self._pool_block
+        )
+
+    def send(self, request, **kwargs):  # type: ignore[override]
+        """Send a request, tracking in-flight and saturation counters."""
+        with self._stats_lock:
+            self.in_flight += 1
+            if self.in_flight > self.peak_in_flight:
+                self.peak_in_flight = self.in_flight
+            if self.in_flight > self._pool_maxsize:
+                self.saturated += 1
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with pool size, in-flight, peak and saturation counts
+        """
+        with self._stats_lock:
+            return {
+                "pool_maxsize": self._pool_maxsize,
+                "pool_block": self._pool_block,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "saturated": self.saturated,
+            }
+
+
+def create_http2_session(
+    headers: Dict[str, str],
+    max_connections: Optional[int],
+    max_keepalive_connections: int,
+    keepalive_expiry: float = 5.0,
+    asynchronous: bool = False,
+    socket_options: Optional[List[Tuple[int, int, int]]] = None,
+) -> Any:
+    """
+    Create an httpx client that negotiates HTTP/2.
+
+    HTTP/2 is offered through TLS ALPN; servers that do not accept it, and
+    plain ``http://`` URLs, are spoken to over HTTP/1.1 on the same client.
+
+    Args:
+        headers: Default headers for every request
+        max_connections: Maximum concurrent connections (None for no limit)
+        max_keepalive_connections: Idle connections kept alive
+        keepalive_expiry: Seconds an idle connection is kept
+        asynchronous: Return an httpx.AsyncClient instead of httpx.Client
+        socket_options: Socket options for new connections, e.g. from
+            keepalive_socket_options()
+
+    Returns:
+        Configured httpx.Client or httpx.AsyncClient
+
+    Raises:
+        ImportError: If httpx or h2 are not installed
+    """
+    try:
+        import h2  # noqa: F401
+        import httpx
+    except ImportError as e:
+        raise ImportError(
+            "HTTP/2 support requires httpx and h2. Install them with "
+            "'pip install cloze-sdk[http2]'."
+        ) from e
+
+    if asynchronous:
+        client_class, transport_class = httpx.AsyncClient, httpx.AsyncHTTPTransport
+    else:
+        client_class, transport_class = httpx.Client, httpx.HTTPTransport
+    transport = transport_class(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        socket_options=socket_options,
+    )
+    return client_class(headers=headers, transport=transport)
@@ -29,5 +29,14 @@ setup(
     install_requires=[
         "requests>=2.31.0",
     ],
+    extras_require={
+        "async": ["httpx>=0.24.0"],
+        "http2": ["httpx[http2]>=0.24.0"],
+        "fast-json": ["orjson>=3.8.0"],
+        "streaming": ["ijson>=3.1.0"],
+        "zstd": ["zstandard>=0.21.0"],
+        "brotli": ["brotli>=1.0.9"],
+        "tracing": ["opentelemetry-api>=1.20.0"],
+    },
 )
 
@@ -1,6 +1,10 @@
 """Pytest configuration and fixtures."""
 
+import json
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from unittest.mock import Mock, MagicMock
 from cloze_sdk import ClozeClient
@@ -27,6 +31,52 @@ def mock_client(mock_response):
     return client
 
 
+@pytest.fixture
+def local_server():
+    """
+    Start local HTTP/1.1 servers that stop when the test ends.
+
+    The fixture is a function taking ``respond(request)``, which is called
+    with the BaseHTTPRequestHandler of each GET and returns ``(status, body,
+    headers)``. A body that is not bytes is sent as JSON. The function
+    returns the server's base URL.
+    """
+    servers = []
+
+    def start(respond):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, body, headers = respond(self)
+                headers = {"Content-Type": "application/json", **headers}
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    # The client gave up on the request, e.g. a hedged copy
+                    self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
 @pytest.fixture
 def api_key():
     """Get API key from environment variable."""
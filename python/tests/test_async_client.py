@@ -0,0 +1,190 @@
+"""Unit tests for AsyncClozeClient."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from cloze_sdk import AsyncClozeClient, RetryPolicy
+from cloze_sdk.exceptions import (ClozeAPIError, ClozeAuthenticationError,
+                                  ClozeRateLimitError)
+
+
+def make_client(handler, **kwargs):
+    """Create an AsyncClozeClient backed by an httpx MockTransport."""
+    client = AsyncClozeClient(api_key="test_key", **kwargs)
+    client.session = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), headers=client._default_headers()
+    )
+    return client
+
+
+class TestAsyncClozeClient:
+    """Test AsyncClozeClient initialization and requests."""
+
+    def test_init_requires_httpx(self):
+        """Test that a helpful error is raised when httpx is missing."""
+        with patch("cloze_sdk.async_client.httpx", None):
+            with pytest.raises(ImportError, match="cloze-sdk\\[async\\]"):
+                AsyncClozeClient(api_key="test_key")
+
+    def test_init_without_auth_raises_error(self):
+        """Test that initialization without auth raises ValueError."""
+        with pytest.raises(ValueError, match="Either api_key, oauth_token or token_provider"):
+            AsyncClozeClient()
+
+    def test_headers_and_endpoints(self):
+        """Test default headers and endpoint namespaces."""
+        client = AsyncClozeClient(oauth_token="token")
+        assert client.session.headers["Authorization"] == "Bearer token"
+        for name in ("analytics", "team", "account", "projects", "people",
+                     "companies", "timeline", "webhooks"):
+            assert hasattr(client, name)
+        asyncio.run(client.aclose())
+
+    def test_endpoint_methods_are_awaitable(self):
+        """Test that endpoint methods return awaitables with decoded results."""
+        seen = {}
+
+        def handler(request):
+            seen["method"] = request.method
+            seen["path"] = request.url.path
+            seen["params"] = dict(request.url.params)
+            seen["auth"] = request.headers["Authorization"]
+            return httpx.Response(200, json={"errorcode": 0, "person": {"name": "A"}})
+
+        async def run():
+            async with make_client(handler) as client:
+                return await client.people.get("a@example.com")
+
+        result = asyncio.run(run())
+        assert result == {"errorcode": 0, "person": {"name": "A"}}
+        assert seen == {
+            "method": "GET",
+            "path": "/v1/people/get",
+            "params": {"identifier": "a@example.com"},
+            "auth": "Bearer test_key",
+        }
+
+    def test_json_body_sent(self):
+        """Test that JSON bodies are encoded for POST endpoints."""
+        bodies = []
+
+        def handler(request):
+            bodies.append(json.loads(request.content))
+            return httpx.Response(200, json={"errorcode": 0})
+
+        client = make_client(handler)
+        asyncio.run(client.timeline.create_communication({"subject": "Hi"}))
+        assert bodies == [{"subject": "Hi"}]
+
+    def test_form_data_and_api_key_param(self):
+        """Test form data and api_key query parameter handling."""
+        seen = {}
+
+        def handler(request):
+            seen["body"] = request.content
+            seen["params"] = dict(request.url.params)
+            return httpx.Response(200, json={"errorcode": 0})
+
+        client = make_client(handler)
+        asyncio.run(
+            client._make_request("POST", "/v1/test", data={"k": "v"}, use_api_key_param=True)
+        )
+        assert seen["body"] == b"k=v"
+        assert seen["params"]["api_key"] == "test_key"
+
+    def test_error_semantics_match_sync_client(self):
+        """Test that responses map to the same exceptions as ClozeClient."""
+        cases = [
+            (httpx.Response(429), ClozeRateLimitError),
+            (httpx.Response(401), ClozeAuthenticationError),
+            (httpx.Response(200, text="not json"), ClozeAPIError),
+            (httpx.Response(200, json={"errorcode": 11, "message": "bad"}), ClozeAPIError),
+        ]
+        for response, error in cases:
+            client = make_client(lambda request, r=response: r)
+            with pytest.raises(error):
+                asyncio.run(client.account.get_profile())
+
+    def test_transport_error_wrapped(self):
+        """Test that transport errors are wrapped in ClozeAPIError."""
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        client = make_client(handler)
+        with pytest.raises(ClozeAPIError, match="Request failed"):
+            asyncio.run(client.account.get_profile())
+
+    def test_many_requests_in_flight(self):
+        """Test that many concurrent requests share one client."""
+        def handler(request):
+            return httpx.Response(200, json={"errorcode": 0, "id": request.url.params["identifier"]})
+
+        async def run():
+            client = make_client(handler)
+            results = await asyncio.gather(
+                *(client.people.get(str(i)) for i in range(200))
+            )
+            await client.aclose()
+            return results
+
+        results = asyncio.run(run())
+        assert [r["id"] for r in results] == [str(i) for i in range(200)]
+
+
+class TestAsyncClientPolicies:
+    """Test retry and rate limiting in AsyncClozeClient."""
+
+    @patch("cloze_sdk.async_client.asyncio.sleep")
+    def test_retries_rate_limit_and_transport_errors(self, mock_sleep):
+        """Test that 429s and connection errors are retried."""
+        mock_sleep.return_value = None
+        responses = iter([
+            httpx.Response(429, headers={"Retry-After": "1"}),
+            httpx.ConnectError("reset"),
+            httpx.Response(200, json={"errorcode": 0}),
+        ])
+
+        def handler(request):
+            item = next(responses)
+            if isinstance(item, Exception):
+                raise item
+            return item
+
+        client = make_client(
+            handler, retry_policy=RetryPolicy(jitter=False, backoff_base=0.1)
+        )
+        assert asyncio.run(client.account.get_profile()) == {"errorcode": 0}
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [1.0, 0.2]
+
+    @patch("cloze_sdk.async_client.asyncio.sleep")
+    def test_post_not_retried_on_transport_error(self, mock_sleep):
+        """Test that non-idempotent requests are not retried."""
+        def handler(request):
+            raise httpx.ReadTimeout("slow")
+
+        client = make_client(handler, retry_policy=RetryPolicy())
+        with pytest.raises(ClozeAPIError, match="Request failed"):
+            asyncio.run(client.people.create({"email": "a@example.com"}))
+        mock_sleep.assert_not_called()
+
+    @patch("cloze_sdk.async_client.asyncio.sleep")
+    def test_rate_limiter_reserve_awaited(self, mock_sleep):
+        """Test that the limiter wait is awaited without blocking the loop."""
+        mock_sleep.return_value = None
+        limiter = Mock()
+        limiter.reserve.side_effect = [0.0, 0.5]
+        client = make_client(
+            lambda request: httpx.Response(200, json={"errorcode": 0}),
+            rate_limiter=limiter,
+        )
+
+        async def run():
+            await client.account.get_profile()
+            await client.account.get_profile()
+
+        asyncio.run(run())
+        mock_sleep.assert_called_once_with(0.5)
+        limiter.acquire.assert_not_called()
@@ -0,0 +1,229 @@
+"""Unit tests for token providers and 401 replay."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from unittest.mock import Mock
+from cloze_sdk import (AsyncClozeClient, ClozeAuthenticationError, ClozeClient,
+                       ConcurrencyLimiter, TokenProvider)
+
+
+def counting_fetch(*tokens, expires_in=3600, delay=0.0):
+    """Build a fetch function returning the given tokens in order."""
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if delay:
+            time.sleep(delay)
+        return tokens[len(calls) - 1], expires_in
+
+    fetch.calls = calls
+    return fetch
+
+
+class TestTokenProvider:
+    """Test caching, refresh and invalidation."""
+
+    def test_fetch_required(self):
+        """Test that a provider needs fetch or an overridden fetch_token()."""
+        with pytest.raises(NotImplementedError):
+            TokenProvider().fetch_token()
+
+        class Static(TokenProvider):
+            def fetch_token(self):
+                return "static", None
+
+        provider = Static()
+        assert provider.token() == provider.token() == "static"
+        assert provider.refreshes == 1
+
+    def test_cached_until_margin(self, monkeypatch):
+        """Test that a token is reused until it is within the refresh margin."""
+        now = [1000.0]
+        monkeypatch.setattr("cloze_sdk.auth.time.monotonic", lambda: now[0])
+        fetch = counting_fetch("first", "second", expires_in=100)
+        provider = TokenProvider(fetch, refresh_margin=10)
+        assert provider.token() == "first"
+        now[0] = 1089.0
+        assert provider.token() == "first"
+        now[0] = 1091.0
+        assert provider.current() is None
+        assert provider.token() == "second"
+        assert len(fetch.calls) == 2
+
+    def test_single_refresh_for_many_threads(self):
+        """Test that threads finding no valid token share one refresh."""
+        fetch = counting_fetch("token", delay=0.05)
+        provider = TokenProvider(fetch)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(provider.token()))
+            for _ in range(50)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == ["token"] * 50
+        assert len(fetch.calls) == 1
+
+    def test_early_refresh_does_not_block(self, monkeypatch):
+        """Test that others keep the current token while one thread refreshes early."""
+        now = [1000.0]
+        monkeypatch.setattr("cloze_sdk.auth.time.monotonic", lambda: now[0])
+        release = threading.Event()
+        tokens = iter(["old", "new"])
+
+        def fetch():
+            token = next(tokens)
+            if token == "new":
+                release.wait(5)
+            return token, 100
+
+        provider = TokenProvider(fetch, refresh_margin=10)
+        provider.token()
+        now[0] = 1095.0
+        refresher = threading.Thread(target=provider.token)
+        refresher.start()
+        while not provider._refreshing:
+            time.sleep(0.001)
+        assert provider.token() == "old"
+        release.set()
+        refresher.join()
+        assert provider.token() == "new"
+
+    def test_failed_refresh(self, monkeypatch):
+        """Test refresh failures before and after the token expires."""
+        now = [1000.0]
+        monkeypatch.setattr("cloze_sdk.auth.time.monotonic", lambda: now[0])
+        outcomes = [("good", 100.0), ConnectionError("down"), ConnectionError("down")]
+
+        def fetch():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        provider = TokenProvider(fetch, refresh_margin=10)
+        provider.token()
+        now[0] = 1095.0
+        # Still valid, so a failed early refresh keeps the current token
+        assert provider.token() == "good"
+        now[0] = 1200.0
+        with pytest.raises(ClozeAuthenticationError, match="Token refresh failed: down"):
+            provider.token()
+
+    def test_waiters_see_failure(self):
+        """Test that threads waiting on a failed refresh raise too."""
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            raise ConnectionError("down")
+
+        provider = TokenProvider(fetch)
+        errors = []
+
+        def get():
+            try:
+                provider.token()
+            except ClozeAuthenticationError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while not provider._refreshing:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len(errors) == 5 and len(calls) == 1
+
+    def test_invalidate(self):
+        """Test that only the current token can be invalidated."""
+        fetch = counting_fetch("first", "second")
+        provider = TokenProvider(fetch)
+        provider.token()
+        provider.invalidate("stale")
+        assert provider.token() == "first"
+        provider.invalidate("first")
+        assert provider.token() == "second"
+
+    def test_token_async(self):
+        """Test that tasks get the token, refreshing off the event loop."""
+        fetch = counting_fetch("token", delay=0.02)
+        provider = TokenProvider(fetch)
+
+        async def run():
+            return await asyncio.gather(*(provider.token_async() for _ in range(10)))
+
+        assert asyncio.run(run()) == ["token"] * 10
+        assert asyncio.run(provider.token_async()) == "token"
+        assert len(fetch.calls) == 1
+
+
+class TestClientTokenProvider:
+    """Test token providers in the clients."""
+
+    def test_replays_once_on_401(self, mock_response):
+        """Test that a 401 refreshes the token and replays the request once."""
+        provider = TokenProvider(counting_fetch("first", "second", "third"))
+        client = ClozeClient(token_provider=provider)
+        assert "Authorization" not in client.session.headers
+        rejected = Mock(status_code=401, headers={})
+        client.session.request = Mock(side_effect=[rejected, mock_response])
+
+        assert client.account.get_profile() == {"errorcode": 0, "data": "test"}
+        calls = client.session.request.call_args_list
+        assert [call[1]["headers"]["Authorization"] for call in calls] == [
+            "Bearer first",
+            "Bearer second",
+        ]
+        rejected.close.assert_called_once()
+        assert client.metrics.snapshot()["counters"]["auth_replays"] == 1
+
+        client.session.request = Mock(return_value=rejected)
+        with pytest.raises(ClozeAuthenticationError):
+            client.account.get_profile()
+        assert client.session.request.call_count == 2
+
+    def test_refresh_failure(self):
+        """Test that a failed refresh fails the call and returns its slot."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        provider = TokenProvider(Mock(side_effect=ConnectionError("down")))
+        client = ClozeClient(token_provider=provider, concurrency_limiter=limiter)
+        client.session.request = Mock()
+        with pytest.raises(ClozeAuthenticationError):
+            client.account.get_profile()
+        client.session.request.assert_not_called()
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_credential_key(self):
+        """Test that clients with different providers keep separate budgets."""
+        first = ClozeClient(token_provider=TokenProvider(counting_fetch("a")))
+        second = ClozeClient(token_provider=TokenProvider(counting_fetch("a")))
+        assert first._credential_key != second._credential_key
+
+    def test_async_replay(self):
+        """Test that the asyncio client replays a 401 with a new token."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers["Authorization"])
+            if len(seen) == 1:
+                return httpx.Response(401)
+            return httpx.Response(200, json={"errorcode": 0})
+
+        provider = TokenProvider(counting_fetch("first", "second"))
+        client = AsyncClozeClient(token_provider=provider)
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        assert asyncio.run(client.account.get_profile()) == {"errorcode": 0}
+        assert seen == ["Bearer first", "Bearer second"]
@@ -0,0 +1,352 @@
+"""Unit tests for the response cache."""
+
+import asyncio
+
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from cloze_sdk import (AsyncClozeClient, ClozeClient, MemoryCacheBackend,
+                       ResponseCache, SQLiteCacheBackend)
+from cloze_sdk.cache import CacheBackend, CacheEntry
+from cloze_sdk.exceptions import ClozeAPIError
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    """Provide each cache backend with room for two entries."""
+    if request.param == "memory":
+        yield MemoryCacheBackend(max_entries=2)
+    else:
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=2)
+        yield backend
+        backend.close()
+
+
+class TestBackends:
+    """Test cache backend storage and LRU eviction."""
+
+    def test_set_and_get(self, backend):
+        """Test that stored entries are returned with their expiry."""
+        entry = CacheEntry(b"payload", 123.0, etag='"v1"', digest="abc")
+        backend.set("a", entry)
+        assert backend.get("a") == entry
+        assert backend.get("a").last_modified is None
+        assert backend.get("missing") is None
+        assert len(backend) == 1
+
+    def test_lru_eviction(self, backend):
+        """Test that the least recently used entry is evicted."""
+        with patch("cloze_sdk.cache.time.time", side_effect=range(100, 10000, 100)):
+            backend.set("a", CacheEntry(b"1", 1e12))
+            backend.set("b", CacheEntry(b"2", 1e12))
+            backend.get("a")
+            backend.set("c", CacheEntry(b"3", 1e12))
+
+        assert backend.get("b") is None
+        assert backend.get("a") == CacheEntry(b"1", 1e12)
+        assert backend.get("c") == CacheEntry(b"3", 1e12)
+        assert backend.evictions == 1
+
+    def test_clear(self, backend):
+        """Test that clear removes every entry."""
+        backend.set("a", CacheEntry(b"1", 1e12))
+        backend.clear()
+        assert len(backend) == 0
+
+    def test_delete_prefix(self, backend):
+        """Test that only entries under the prefix are removed."""
+        backend.set("k:GET /v1/people/get?1", CacheEntry(b"1", 1e12))
+        backend.set("k:GET /v1/peoplex", CacheEntry(b"2", 1e12))
+        assert backend.delete_prefix("k:GET /v1/people/") == 1
+        assert backend.get("k:GET /v1/people/get?1") is None
+        assert len(backend) == 1
+
+    def test_sqlite_shared_between_instances(self, tmp_path):
+        """Test that two backends on one file see each other's entries."""
+        path = str(tmp_path / "shared.db")
+        first = SQLiteCacheBackend(path)
+        second = SQLiteCacheBackend(path)
+        first.set("a", CacheEntry(b"1", 1e12))
+        assert second.get("a") == CacheEntry(b"1", 1e12)
+        first.close()
+        second.close()
+
+    def test_sqlite_hits_touch_coarsely(self, tmp_path):
+        """Test that a hit writes its access time only once it is stale."""
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), touch_interval=60)
+
+        def accessed_at():
+            return backend._conn.execute(
+                "SELECT accessed_at FROM cache_entries WHERE key = 'a'"
+            ).fetchone()[0]
+
+        with patch("cloze_sdk.cache.time.time", side_effect=[100, 150, 170]):
+            backend.set("a", CacheEntry(b"1", 1e12))
+            assert backend.get("a") == CacheEntry(b"1", 1e12)
+            assert accessed_at() == 100
+            backend.get("a")
+            assert accessed_at() == 170
+        backend.close()
+
+    def test_sqlite_rolls_back_failed_write(self, tmp_path):
+        """Test that a failed write leaves the database unchanged."""
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+        backend.max_entries = None
+        with pytest.raises(TypeError):
+            backend.set("a", CacheEntry(b"1", 1e12))
+        assert len(backend) == 0
+        backend.close()
+
+    def test_base_backend_is_abstract(self):
+        """Test that the base backend must be subclassed."""
+        backend = CacheBackend()
+        for call in (
+            lambda: backend.get("a"),
+            lambda: backend.set("a", CacheEntry(b"", 0)),
+            lambda: backend.delete_prefix("a"),
+            backend.clear,
+            lambda: len(backend),
+        ):
+            with pytest.raises(NotImplementedError):
+                call()
+
+
+class TestResponseCache:
+    """Test ResponseCache TTLs and statistics."""
+
+    def test_ttl_lookup(self):
+        """Test prefix TTLs, the longest prefix winning, and the default."""
+        cache = ResponseCache(ttls={"/v1/user/": 300, "/v1/user/profile": 10, "/v1/x": 0})
+        assert cache.ttl_for("/v1/user/profile") == 10
+        assert cache.ttl_for("/v1/user/fields") == 300
+        assert cache.ttl_for("/v1/x") is None
+        assert cache.ttl_for("/v1/people/find") is None
+        assert ResponseCache(default_ttl=5).ttl_for("/v1/people/find") == 5
+
+    def test_default_ttls(self):
+        """Test that slow-changing endpoints are cached by default."""
+        cache = ResponseCache()
+        assert cache.ttl_for("/v1/team/members/list") == 300
+        assert cache.ttl_for("/v1/people/get") == 60
+        assert cache.ttl_for("/v1/people/feed") is None
+
+    @patch("cloze_sdk.cache.time.time")
+    def test_hit_miss_and_expiry(self, mock_time):
+        """Test hits, misses and expired entries."""
+        mock_time.return_value = 1000.0
+        cache = ResponseCache(ttls={"/v1/user/": 60})
+        assert cache.get("k") is None
+        cache.set("k", "/v1/user/profile", {"errorcode": 0, "name": "A"})
+        cache.set("u", "/v1/people/find", {"errorcode": 0})
+
+        hit = cache.get("k")
+        assert hit == {"errorcode": 0, "name": "A"}
+        assert cache.get("k") is not hit
+
+        mock_time.return_value = 1060.0
+        assert cache.get("k") is None
+        assert cache.stats() == {
+            "hits": 2,
+            "misses": 2,
+            "expired": 1,
+            "revalidated": 0,
+            "unchanged": 0,
+            "evictions": 0,
+            "entries": 1,
+        }
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+
+    @patch("cloze_sdk.cache.time.time", return_value=1000.0)
+    def test_validators_stored(self, mock_time):
+        """Test that ETag, Last-Modified and the body digest are stored."""
+        cache = ResponseCache()
+        response = Mock(
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+            content=b'{"errorcode":0}',
+        )
+        cache.set("k", "/v1/user/profile", {"errorcode": 0}, response=response)
+        entry = cache.backend.get("k")
+        assert entry.etag == '"v1"'
+        assert entry.last_modified == "Wed, 21 Oct 2015 07:28:00 GMT"
+        assert len(entry.digest) == 64
+        assert ResponseCache.conditional_headers(entry) == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+        }
+        assert ResponseCache.conditional_headers(CacheEntry(b"", 0)) == {}
+
+    @patch("cloze_sdk.cache.time.time")
+    def test_stale_lookup_and_revalidation(self, mock_time):
+        """Test that expired entries are returned for revalidation and renewed."""
+        mock_time.return_value = 1000.0
+        cache = ResponseCache()
+        cache.set("k", "/v1/user/profile", {"errorcode": 0})
+        mock_time.return_value = 2000.0
+        value, stale = cache.lookup("k")
+        assert value is None and stale.payload == b'{"errorcode":0}'
+
+        assert cache.revalidated("k", "/v1/user/profile", stale) == {"errorcode": 0}
+        assert cache.backend.get("k").expires_at == 2300.0
+        assert cache.get("k") == {"errorcode": 0}
+        stats = cache.stats()
+        assert (stats["hits"], stats["expired"], stats["revalidated"]) == (2, 1, 1)
+
+    @patch("cloze_sdk.cache.time.time")
+    def test_unchanged_body_detected_by_digest(self, mock_time):
+        """Test that a refetched identical body renews the entry without a rewrite."""
+        mock_time.return_value = 1000.0
+        cache = ResponseCache()
+        response = Mock(headers={}, content=b'{"errorcode":0}')
+        cache.set("k", "/v1/user/profile", {"errorcode": 0}, response=response)
+        mock_time.return_value = 2000.0
+        _, stale = cache.lookup("k")
+        cache.set("k", "/v1/user/profile", {"errorcode": 0}, response=response, stale=stale)
+        assert cache.backend.get("k") == stale._replace(expires_at=2300.0)
+
+        mock_time.return_value = 3000.0
+        _, stale = cache.lookup("k")
+        changed = Mock(headers={}, content=b'{"errorcode":0,"name":"B"}')
+        cache.set("k", "/v1/user/profile", {"errorcode": 0, "name": "B"},
+                  response=changed, stale=stale)
+        assert cache.get("k") == {"errorcode": 0, "name": "B"}
+        stats = cache.stats()
+        assert (stats["misses"], stats["unchanged"]) == (2, 1)
+
+
+class TestClientCache:
+    """Test response caching in the clients."""
+
+    @pytest.fixture
+    def client(self, mock_response):
+        """Create a client with an in-memory cache."""
+        client = ClozeClient(api_key="test_key", cache=ResponseCache())
+        client.session.request = Mock(return_value=mock_response)
+        return client
+
+    def test_get_served_from_cache(self, client):
+        """Test that a cached GET is not sent again."""
+        assert client.account.get_profile() == {"errorcode": 0, "data": "test"}
+        assert client.account.get_profile() == {"errorcode": 0, "data": "test"}
+        assert client.session.request.call_count == 1
+        assert client.cache.stats()["hits"] == 1
+
+    def test_params_distinguish_entries(self, client):
+        """Test that different parameters are cached separately."""
+        client.people.get("a@example.com")
+        client.people.get("b@example.com")
+        client.people.get("a@example.com")
+        assert client.session.request.call_count == 2
+
+    def test_uncached_endpoints_and_writes(self, client):
+        """Test that endpoints without a TTL and writes bypass the cache."""
+        client.people.find(query={"segment": "lead"})
+        client.people.find(query={"segment": "lead"})
+        client.people.create({"name": "A", "emails": [{"value": "a@example.com"}]})
+        assert client.session.request.call_count == 3
+        assert client.cache.stats()["entries"] == 0
+
+    def test_writes_invalidate_reads(self, client, mock_response):
+        """Test that a write drops cached reads of the same resource type."""
+        other = ClozeClient(api_key="other_key", cache=client.cache)
+        other.session.request = Mock(return_value=mock_response)
+        for api in (client, other):
+            api.people.get("a@example.com")
+        client.account.get_profile()
+
+        client.people.update({"emails": [{"value": "a@example.com"}], "stage": "lead"})
+        client.people.get("a@example.com")
+        client.account.get_profile()
+        other.people.get("a@example.com")
+        assert client.session.request.call_count == 4
+        assert other.session.request.call_count == 1
+
+        mock_response.json.return_value = {"errorcode": 1, "message": "Bad"}
+        with pytest.raises(ClozeAPIError):
+            client.people.delete("a@example.com")
+        mock_response.json.return_value = {"errorcode": 0, "data": "test"}
+        client.people.get("a@example.com")
+        assert client.session.request.call_count == 5
+
+    def test_errors_not_cached(self, client, mock_response):
+        """Test that API errors are not stored."""
+        mock_response.json.return_value = {"errorcode": 1, "message": "Bad"}
+        with pytest.raises(ClozeAPIError):
+            client.account.get_profile()
+        assert client.cache.stats()["entries"] == 0
+
+    def test_credentials_isolated(self, mock_response):
+        """Test that clients with different credentials do not share entries."""
+        cache = ResponseCache()
+        first = ClozeClient(api_key="one", cache=cache)
+        second = ClozeClient(api_key="two", cache=cache)
+        for client in (first, second):
+            client.session.request = Mock(return_value=mock_response)
+            client.account.get_profile()
+            client.session.request.assert_called_once()
+
+    @patch("cloze_sdk.cache.time.time")
+    def test_not_modified_served_from_cache(self, mock_time, client, mock_response):
+        """Test that an expired entry is revalidated and a 304 served from cache."""
+        mock_time.return_value = 1000.0
+        mock_response.headers = {"ETag": '"v1"'}
+        client.account.get_profile()
+
+        mock_time.return_value = 2000.0
+        not_modified = Mock(status_code=304, headers={})
+        client.session.request.return_value = not_modified
+        assert client.account.get_profile() == {"errorcode": 0, "data": "test"}
+        headers = client.session.request.call_args[1]["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+        stats = client.cache.stats()
+        assert (stats["hits"], stats["revalidated"]) == (1, 1)
+        not_modified.json.assert_not_called()
+
+    @patch("cloze_sdk.cache.time.time")
+    def test_modified_response_replaces_entry(self, mock_time, client, mock_response):
+        """Test that a full response to a revalidation replaces the entry."""
+        mock_time.return_value = 1000.0
+        client.account.get_profile()
+        mock_time.return_value = 2000.0
+        mock_response.json.return_value = {"errorcode": 0, "data": "new"}
+        assert client.account.get_profile() == {"errorcode": 0, "data": "new"}
+        assert client.account.get_profile() == {"errorcode": 0, "data": "new"}
+        assert client.session.request.call_count == 2
+
+    def test_async_client_uses_cache(self):
+        """Test that the asyncio client reads and fills the cache."""
+        handler = Mock(return_value=httpx.Response(200, json={"errorcode": 0, "roles": []}))
+        client = AsyncClozeClient(api_key="test_key", cache=ResponseCache())
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            first = await client.team.get_roles()
+            second = await client.team.get_roles()
+            return first, second
+
+        assert asyncio.run(run()) == ({"errorcode": 0, "roles": []},) * 2
+        assert handler.call_count == 1
+
+    def test_async_client_revalidates(self):
+        """Test that the asyncio client serves 304 replies from the cache."""
+        responses = [
+            httpx.Response(200, json={"errorcode": 0, "roles": []}, headers={"ETag": '"r"'}),
+            httpx.Response(304),
+        ]
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            return responses.pop(0)
+
+        client = AsyncClozeClient(api_key="test_key", cache=ResponseCache())
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            with patch("cloze_sdk.cache.time.time", return_value=1000.0):
+                await client.team.get_roles()
+            with patch("cloze_sdk.cache.time.time", return_value=2000.0):
+                return await client.team.get_roles()
+
+        assert asyncio.run(run()) == {"errorcode": 0, "roles": []}
+        assert seen == [None, '"r"']
@@ -0,0 +1,138 @@
+"""Unit tests for the record/replay cassette adapter."""
+
+import gzip
+import json
+import time
+
+import cloze_sdk
+import pytest
+from cloze_sdk import ClozeClient
+from cloze_sdk.cassette import CassetteAdapter, request_key
+from cloze_sdk.exceptions import ClozeAPIError
+
+
+@pytest.fixture
+def server(local_server):
+    """Run a local API answering feed pages and one binary body."""
+    hits = []
+
+    def respond(request):
+        hits.append(request.path)
+        headers = {"Set-Cookie": "session=secret"}
+        if request.path.startswith("/v1/raw"):
+            headers["Content-Type"] = "application/octet-stream"
+            return 200, b"\xff\x00", headers
+        n = len(hits)
+        page = {"errorcode": 0, "n": n, "people": [{"id": n}], "cursor": f"c{n}"}
+        return 200, page, headers
+
+    return local_server(respond), hits
+
+
+def record(url, path):
+    """Record a short session against the local API."""
+    adapter = CassetteAdapter(path, record=True)
+    client = ClozeClient(api_key="secret_key", base_url=url, adapter=adapter)
+    client.account.get_profile()
+    client.account.get_profile()
+    client.people.feed(cursor="abc", pagesize=10)
+    client.session.get(f"{url}/v1/raw")
+    client.session.close()
+    return adapter
+
+
+class TestRequestKey:
+    """Test request matching keys."""
+
+    def test_normalized(self):
+        """Test that parameter order, host and the api_key are ignored."""
+        assert request_key(
+            "get", "https://api.cloze.com/v1/people/find?b=2&api_key=x&a=1&c="
+        ) == request_key("GET", "http://localhost:8080/v1/people/find?a=1&c=&b=2")
+        assert request_key("GET", "http://h/v1/p?a=1") != request_key(
+            "POST", "http://h/v1/p?a=1"
+        )
+
+
+class TestCassetteAdapter:
+    """Test recording and replaying responses."""
+
+    def test_record_and_replay(self, server, tmp_path):
+        """Test that a replayed session returns the recorded responses offline."""
+        url, hits = server
+        path = str(tmp_path / "session.jsonl")
+        adapter = record(url, path)
+        assert len(adapter) == 4 and len(hits) == 4
+
+        text = open(path).read()
+        assert "secret" not in text and "api_key" not in text
+        entry = json.loads(text.splitlines()[2])
+        assert entry["path"] == "/v1/people/feed"
+        assert entry["params"] == [["cursor", "abc"], ["pagesize", "10"]]
+
+        replay = CassetteAdapter(path, latency_scale=0)
+        assert len(replay) == 4
+        client = ClozeClient(
+            api_key="other_key", base_url="http://offline.invalid", adapter=replay
+        )
+        assert client.people.feed(pagesize=10, cursor="abc")["n"] == 3
+        # Repeated requests get their responses in order, then start over
+        assert [client.account.get_profile()["n"] for _ in range(3)] == [1, 2, 1]
+        response = client.session.get("http://offline.invalid/v1/raw")
+        assert response.content == b"\xff\x00"
+        assert response.headers["Content-Type"] == "application/octet-stream"
+        assert len(hits) == 4
+        assert client.metrics.snapshot()["requests"]["GET /v1/people/feed"]["count"] == 1
+
+    def test_streamed_replay(self, server, tmp_path):
+        """Test that streamed pages can be recorded and replayed."""
+        url, _ = server
+        path = str(tmp_path / "stream.jsonl.gz")
+        adapter = CassetteAdapter(path, record=True)
+        client = ClozeClient(api_key="k", base_url=url, adapter=adapter)
+        recorded = list(client.people.feed(cursor="abc", stream=True))
+        adapter.save()
+        with gzip.open(path, "rt") as f:
+            assert json.loads(f.readline())["path"] == "/v1/people/feed"
+
+        client = ClozeClient(api_key="k", adapter=CassetteAdapter(path, latency_scale=0))
+        page = client.people.feed(cursor="abc", stream=True)
+        assert list(page) == recorded == [{"id": 1}]
+        assert page.cursor == "c1"
+
+    def test_scaled_latency(self, tmp_path):
+        """Test that replays wait the recorded latency times the scale."""
+        path = tmp_path / "slow.jsonl"
+        entry = {
+            "method": "GET",
+            "path": "/v1/user/profile",
+            "params": [],
+            "status": 200,
+            "headers": {"Content-Type": "application/json"},
+            "elapsed": 0.2,
+            "body": '{"errorcode":0}',
+        }
+        path.write_text(json.dumps(entry) + "\n\n")
+        client = ClozeClient(
+            api_key="k", adapter=CassetteAdapter(str(path), latency_scale=0.25)
+        )
+        started = time.monotonic()
+        assert client.account.get_profile() == {"errorcode": 0}
+        assert 0.05 <= time.monotonic() - started < 0.2
+
+    def test_unrecorded_request(self, tmp_path):
+        """Test that a request missing from the cassette fails without retries."""
+        path = tmp_path / "empty.jsonl"
+        path.write_text("")
+        client = ClozeClient(api_key="k", adapter=CassetteAdapter(str(path)))
+        with pytest.raises(ClozeAPIError, match="No recorded response for GET /v1/people/get"):
+            client.people.get("a@example.com")
+
+    def test_missing_cassette(self, tmp_path):
+        """Test that replaying a missing cassette fails at construction."""
+        with pytest.raises(FileNotFoundError):
+            CassetteAdapter(str(tmp_path / "missing.jsonl"))
+
+    def test_lazy_export(self):
+        """Test that the adapter is exported from the package."""
+        assert cloze_sdk.CassetteAdapter is CassetteAdapter
@@ -0,0 +1,199 @@
+"""Unit tests for the circuit breaker."""
+
+import asyncio
+
+import httpx
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from cloze_sdk import (AsyncClozeClient, CircuitBreaker, ClozeAPIError,
+                       ClozeCircuitOpenError, ClozeClient)
+from cloze_sdk.retry import RetryPolicy
+
+
+class TestCircuitBreaker:
+    """Test circuit states and transitions."""
+
+    def test_grouping(self):
+        """Test default two-segment groups and configured prefixes."""
+        breaker = CircuitBreaker(prefixes=["/v1/people/find", "/v1/people/"])
+        assert breaker.group_for("/v1/analytics/funnel") == "/v1/analytics/"
+        assert breaker.group_for("/v1/people/find") == "/v1/people/find"
+        assert breaker.group_for("/v1/people/get") == "/v1/people/"
+
+    def test_invalid_threshold(self):
+        """Test that a threshold below one is rejected."""
+        with pytest.raises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+
+    @patch("cloze_sdk.circuit.time.monotonic")
+    def test_opens_after_consecutive_failures(self, mock_time):
+        """Test that only consecutive failures open the circuit."""
+        mock_time.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure("/v1/analytics/funnel")
+        breaker.record_success("/v1/analytics/funnel")
+        breaker.record_failure("/v1/analytics/funnel")
+        assert breaker.state("/v1/analytics/") == "closed"
+
+        breaker.record_failure("/v1/analytics/leads")
+        assert breaker.state("/v1/analytics/funnel") == "open"
+        with pytest.raises(ClozeCircuitOpenError) as exc_info:
+            breaker.before_request("/v1/analytics/funnel")
+        assert exc_info.value.circuit == "/v1/analytics/"
+        assert exc_info.value.retry_after == 30.0
+        breaker.before_request("/v1/people/get")
+
+    @patch("cloze_sdk.circuit.time.monotonic")
+    def test_half_open_probe(self, mock_time):
+        """Test that one probe is admitted after the recovery timeout."""
+        mock_time.return_value = 100.0
+        changes = []
+        breaker = CircuitBreaker(
+            failure_threshold=1,
+            recovery_timeout=10,
+            on_state_change=lambda *change: changes.append(change),
+        )
+        breaker.record_failure("/v1/team/roles")
+        mock_time.return_value = 110.0
+        breaker.before_request("/v1/team/roles")
+        assert breaker.state("/v1/team/roles") == "half_open"
+        with pytest.raises(ClozeCircuitOpenError):
+            breaker.before_request("/v1/team/roles")
+
+        breaker.record_success("/v1/team/roles")
+        assert breaker.states() == {"/v1/team/": "closed"}
+        assert changes == [
+            ("/v1/team/", "closed", "open"),
+            ("/v1/team/", "open", "half_open"),
+            ("/v1/team/", "half_open", "closed"),
+        ]
+
+    @patch("cloze_sdk.circuit.time.monotonic")
+    def test_failed_probe_reopens(self, mock_time):
+        """Test that a failed probe opens the circuit for another timeout."""
+        mock_time.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+        breaker.record_failure("/v1/team/roles")
+        mock_time.return_value = 110.0
+        breaker.before_request("/v1/team/roles")
+        breaker.record_failure("/v1/team/roles")
+        assert breaker.state("/v1/team/roles") == "open"
+        mock_time.return_value = 115.0
+        with pytest.raises(ClozeCircuitOpenError):
+            breaker.before_request("/v1/team/roles")
+
+    @patch("cloze_sdk.circuit.time.monotonic")
+    def test_late_success_does_not_close(self, mock_time):
+        """Test that successes of requests sent before the trip skip half-open."""
+        mock_time.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10)
+        breaker.record_failure("/v1/team/roles")
+        breaker.record_failure("/v1/team/roles")
+        breaker.record_success("/v1/team/roles", started=99.0)
+        assert breaker.state("/v1/team/roles") == "open"
+        with pytest.raises(ClozeCircuitOpenError):
+            breaker.before_request("/v1/team/roles")
+
+        mock_time.return_value = 110.0
+        breaker.before_request("/v1/team/roles")
+        breaker.record_success("/v1/team/roles", started=99.5)
+        assert breaker.state("/v1/team/roles") == "half_open"
+        breaker.record_success("/v1/team/roles", started=110.0)
+        assert breaker.state("/v1/team/roles") == "closed"
+
+    @patch("cloze_sdk.circuit.time.monotonic")
+    def test_abandoned_probe_replaced(self, mock_time):
+        """Test that a probe that never reports back does not block forever."""
+        mock_time.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+        breaker.record_failure("/v1/team/roles")
+        mock_time.return_value = 110.0
+        breaker.before_request("/v1/team/roles")
+        mock_time.return_value = 120.0
+        breaker.before_request("/v1/team/roles")
+        assert breaker.state("/v1/team/roles") == "half_open"
+
+    def test_success_without_failures_and_reset(self):
+        """Test that successes on unseen groups are ignored and reset closes all."""
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_success("/v1/user/profile")
+        assert breaker.states() == {}
+        breaker.record_failure("/v1/user/profile")
+        breaker.reset()
+        assert breaker.state("/v1/user/profile") == "closed"
+
+
+class TestClientCircuitBreaker:
+    """Test circuit breaking in the clients."""
+
+    def test_server_errors_open_circuit(self, mock_response):
+        """Test that 5xx responses open the circuit and later calls fail fast."""
+        breaker = CircuitBreaker(failure_threshold=2)
+        client = ClozeClient(api_key="test_key", circuit_breaker=breaker)
+        mock_response.status_code = 503
+        mock_response.json.return_value = {"errorcode": 1, "message": "Unavailable"}
+        client.session.request = Mock(return_value=mock_response)
+
+        for _ in range(2):
+            with pytest.raises(ClozeAPIError):
+                client.analytics.query_funnel({})
+        with pytest.raises(ClozeCircuitOpenError):
+            client.analytics.query_funnel({})
+        assert client.session.request.call_count == 2
+
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"errorcode": 0}
+        assert client.account.get_profile() == {"errorcode": 0}
+        endpoints = client.metrics.snapshot()["endpoints"]
+        assert endpoints["/v1/analytics/funnel"]["circuit_open_rejections"] == 1
+
+    def test_transport_errors_counted(self):
+        """Test that transport errors count as failures and retries stop at an open circuit."""
+        breaker = CircuitBreaker(failure_threshold=2)
+        client = ClozeClient(
+            api_key="test_key",
+            circuit_breaker=breaker,
+            retry_policy=RetryPolicy(max_attempts=5, backoff_base=0, jitter=False),
+        )
+        client.session.request = Mock(side_effect=requests.exceptions.ConnectionError())
+        with pytest.raises(ClozeCircuitOpenError):
+            client.team.get_roles()
+        assert client.session.request.call_count == 2
+
+    def test_open_circuit_skips_limiters(self):
+        """Test that an open circuit fails before rate or concurrency limits apply."""
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure("/v1/team/roles")
+        rate_limiter, concurrency_limiter = Mock(), Mock()
+        options = dict(
+            api_key="test_key",
+            circuit_breaker=breaker,
+            rate_limiter=rate_limiter,
+            concurrency_limiter=concurrency_limiter,
+        )
+        with pytest.raises(ClozeCircuitOpenError):
+            ClozeClient(**options).team.get_roles()
+        with pytest.raises(ClozeCircuitOpenError):
+            asyncio.run(AsyncClozeClient(**options).team.get_roles())
+        rate_limiter.reserve.assert_not_called()
+        concurrency_limiter.acquire.assert_not_called()
+        concurrency_limiter.acquire_async.assert_not_called()
+        concurrency_limiter.release.assert_not_called()
+
+    def test_async_client(self):
+        """Test that the asyncio client reports to and respects the breaker."""
+        handler = Mock(side_effect=httpx.ConnectError("refused"))
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = AsyncClozeClient(api_key="test_key", circuit_breaker=breaker)
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            with pytest.raises(ClozeAPIError):
+                await client.team.get_roles()
+            with pytest.raises(ClozeCircuitOpenError):
+                await client.team.get_roles()
+
+        asyncio.run(run())
+        assert handler.call_count == 1
+        assert breaker.state("/v1/team/roles") == "open"
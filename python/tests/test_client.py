@@ -36,7 +36,7 @@ class TestClozeClient:
     
     def test_init_without_auth_raises_error(self):
         """Test that initialization without auth raises ValueError."""
-        with pytest.raises(ValueError, match="Either api_key or oauth_token must be provided"):
+        with pytest.raises(ValueError, match="Either api_key, oauth_token or token_provider must be provided"):
             ClozeClient()
     
     def test_session_headers_set(self):
@@ -0,0 +1,128 @@
+"""Unit tests for JSON codecs and client codec integration."""
+
+import json
+import sys
+
+import pytest
+from unittest.mock import Mock, patch
+from cloze_sdk import ClozeClient, JSONCodec
+from cloze_sdk.codec import MsgspecCodec, OrjsonCodec, get_codec
+from cloze_sdk.exceptions import ClozeAPIError
+
+
+PAYLOAD = {"name": "Zoë", "customFields": [{"id": "x", "value": 1}]}
+
+
+class TestCodecs:
+    """Test codec implementations."""
+
+    @pytest.mark.parametrize("codec_class", [JSONCodec, OrjsonCodec, MsgspecCodec])
+    def test_round_trip(self, codec_class):
+        """Test that every codec round-trips the same payload."""
+        codec = codec_class()
+        encoded = codec.dumps(PAYLOAD)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == PAYLOAD
+        assert codec.loads(encoded) == PAYLOAD
+
+    @pytest.mark.parametrize("codec_class", [JSONCodec, OrjsonCodec, MsgspecCodec])
+    def test_invalid_json_raises_value_error(self, codec_class):
+        """Test that decode errors are ValueErrors for every codec."""
+        with pytest.raises(ValueError):
+            codec_class().loads(b"{not json")
+
+    def test_get_codec_by_name(self):
+        """Test resolving codecs by name."""
+        assert get_codec("json").name == "json"
+        assert get_codec("orjson").name == "orjson"
+        assert get_codec("msgspec").name == "msgspec"
+
+    def test_get_codec_passthrough(self):
+        """Test that codec instances are returned unchanged."""
+        codec = JSONCodec()
+        assert get_codec(codec) is codec
+
+    def test_get_codec_unknown(self):
+        """Test that unknown names are rejected."""
+        with pytest.raises(ValueError, match="Unknown JSON codec"):
+            get_codec("yaml")
+
+    def test_auto_prefers_orjson(self):
+        """Test that auto picks orjson when installed."""
+        assert get_codec("auto").name == "orjson"
+
+    def test_auto_falls_back(self):
+        """Test that auto falls back to msgspec, then the stdlib."""
+        with patch.dict(sys.modules, {"orjson": None}):
+            assert get_codec("auto").name == "msgspec"
+            with patch.dict(sys.modules, {"msgspec": None}):
+                assert get_codec("auto").name == "json"
+
+
+class TestClientCodec:
+    """Test codec use in the request pipeline."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a client using the stdlib codec explicitly."""
+        client = ClozeClient(api_key="test_key", json_codec="json")
+        client.session.request = Mock()
+        return client
+
+    def make_response(self, body):
+        """Create a mock response with raw content."""
+        response = Mock()
+        response.status_code = 200
+        response.content = body
+        response.headers = {}
+        return response
+
+    def test_default_uses_http_library(self, mock_client):
+        """Test that no codec keeps the requests json path."""
+        mock_client._make_request("POST", "/v1/people/create", json_data={"a": 1})
+        call_kwargs = mock_client.session.request.call_args[1]
+        assert call_kwargs["json"] == {"a": 1}
+        assert mock_client.json_codec is None
+
+    def test_body_encoded_by_codec(self, client):
+        """Test that bodies are encoded with the configured codec."""
+        client.session.request.return_value = self.make_response(b'{"errorcode":0}')
+
+        result = client.people.create({"email": "a@example.com"})
+
+        call_kwargs = client.session.request.call_args[1]
+        assert "json" not in call_kwargs
+        assert call_kwargs["data"] == b'{"email":"a@example.com"}'
+        assert result == {"errorcode": 0}
+
+    def test_invalid_response_raises(self, client):
+        """Test that undecodable responses raise ClozeAPIError."""
+        client.session.request.return_value = self.make_response(b"<html>")
+        with pytest.raises(ClozeAPIError, match="Invalid response format"):
+            client.account.get_profile()
+
+    def test_encode_and_decode_times_recorded(self, client):
+        """Test that codec CPU time is reported in client metrics."""
+        client.session.request.return_value = self.make_response(b'{"errorcode":0}')
+        client.people.create({"email": "a@example.com"})
+        client.account.get_profile()
+
+        timers = client.metrics.snapshot()["timers"]
+        assert timers["encode"]["count"] == 1
+        assert timers["decode"]["count"] == 2
+        assert timers["decode"]["total_seconds"] >= 0
+
+    def test_async_client_uses_content_kwarg(self):
+        """Test that httpx transports receive pre-encoded bodies as content."""
+        from cloze_sdk import AsyncClozeClient
+
+        client = AsyncClozeClient(api_key="test_key", json_codec="orjson")
+        kwargs = client._prepare_request("POST", "/v1/x", json_data={"a": 1})
+        assert kwargs["content"] == b'{"a":1}'
+
+    def test_http2_client_uses_content_kwarg(self):
+        """Test that the HTTP/2 transport receives content bodies."""
+        client = ClozeClient(api_key="test_key", http2=True, json_codec="json")
+        kwargs = client._prepare_request("POST", "/v1/x", json_data={"a": 1})
+        assert kwargs["content"] == b'{"a":1}'
+        client.session.close()
@@ -0,0 +1,150 @@
+"""Unit tests for request compression and Accept-Encoding negotiation."""
+
+import gzip
+import json
+import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import zstandard
+from unittest.mock import Mock, patch
+from cloze_sdk import AsyncClozeClient, ClozeClient
+from cloze_sdk.compression import RequestCompressor, requests_accept_encoding
+
+LARGE_PERSON = {"name": "Test Person", "notes": "x" * 4096}
+
+
+class TestRequestCompressor:
+    """Test RequestCompressor."""
+
+    def test_gzip_round_trip(self):
+        """Test that gzip output decompresses to the original body."""
+        body = json.dumps(LARGE_PERSON).encode()
+        compressed = RequestCompressor("gzip").compress(body)
+        assert gzip.decompress(compressed) == body
+
+    def test_zstd_round_trip(self):
+        """Test that zstd output decompresses to the original body."""
+        body = json.dumps(LARGE_PERSON).encode()
+        compressed = RequestCompressor("zstd").compress(body)
+        assert zstandard.ZstdDecompressor().decompress(compressed) == body
+
+    @pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+    def test_threads_share_compressor(self, encoding):
+        """Test that threads compressing through one compressor get valid output."""
+        compressor = RequestCompressor(encoding, threshold=0)
+        bodies = [json.dumps(dict(LARGE_PERSON, id=i)).encode() * 20 for i in range(8)]
+
+        def work(body):
+            for _ in range(50):
+                compressed = compressor.compress(body)
+                if encoding == "gzip":
+                    assert gzip.decompress(compressed) == body
+                else:
+                    assert zstandard.ZstdDecompressor().decompress(compressed) == body
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(work, bodies))
+
+    def test_below_threshold_not_compressed(self):
+        """Test that small bodies are sent unchanged."""
+        assert RequestCompressor("gzip", threshold=1024).compress(b"{}") is None
+
+    def test_incompressible_not_compressed(self):
+        """Test that bodies compression would grow are sent unchanged."""
+        assert RequestCompressor("gzip", threshold=0).compress(b"ab") is None
+
+    def test_unknown_encoding(self):
+        """Test that unsupported encodings are rejected."""
+        with pytest.raises(ValueError, match="Unsupported request compression"):
+            RequestCompressor("lz4")
+
+    def test_zstd_stdlib_fallback(self):
+        """Test that the standard library zstd module is used without zstandard."""
+        stdlib = types.ModuleType("compression")
+        stdlib.zstd = Mock(compress=Mock(return_value=b"z"))
+        with patch.dict(sys.modules, {"zstandard": None, "compression": stdlib}):
+            compressor = RequestCompressor("zstd", threshold=0)
+        assert compressor.compress(b"body") == b"z"
+
+    def test_zstd_missing(self):
+        """Test that a helpful error is raised when no zstd module exists."""
+        with patch.dict(sys.modules, {"zstandard": None, "compression": None}):
+            with pytest.raises(ImportError, match="cloze-sdk\\[zstd\\]"):
+                RequestCompressor("zstd")
+
+    def test_accept_encoding_lists_gzip(self):
+        """Test that the requests Accept-Encoding value includes gzip."""
+        assert "gzip" in requests_accept_encoding().split(", ")
+
+
+class TestClientCompression:
+    """Test request compression in the clients."""
+
+    @pytest.fixture
+    def client(self, mock_response):
+        """Create a client compressing request bodies with gzip."""
+        client = ClozeClient(api_key="test_key", compress_requests="gzip")
+        client.session = Mock()
+        client.session.request.return_value = mock_response
+        return client
+
+    def test_large_body_compressed(self, client):
+        """Test that large bodies are gzip-encoded with Content-Encoding set."""
+        client._make_request("POST", "/v1/people/create", json_data=LARGE_PERSON)
+
+        kwargs = client.session.request.call_args[1]
+        assert kwargs["headers"] == {"Content-Encoding": "gzip"}
+        assert json.loads(gzip.decompress(kwargs["data"])) == LARGE_PERSON
+        assert "json" not in kwargs
+
+    def test_small_body_sent_uncompressed(self, client):
+        """Test that small bodies are encoded but not compressed."""
+        client._make_request("POST", "/v1/people/create", json_data={"name": "A"})
+
+        kwargs = client.session.request.call_args[1]
+        assert "headers" not in kwargs
+        assert json.loads(kwargs["data"]) == {"name": "A"}
+
+    def test_savings_recorded_per_endpoint(self, client):
+        """Test that body sizes and bytes saved are recorded per endpoint."""
+        client._make_request("POST", "/v1/people/create", json_data=LARGE_PERSON)
+
+        snapshot = client.metrics.snapshot()
+        endpoint = snapshot["endpoints"]["/v1/people/create"]
+        sent = len(client.session.request.call_args[1]["data"])
+        original = len(json.dumps(LARGE_PERSON, separators=(",", ":")))
+        assert endpoint["request_body_bytes"] == original
+        assert endpoint["compression_saved_bytes"] == original - sent
+        assert snapshot["counters"]["compression_saved_bytes"] > 0
+
+    def test_uses_configured_codec(self, mock_response):
+        """Test that a configured codec encodes the body before compression."""
+        client = ClozeClient(
+            api_key="test_key", json_codec="orjson", compress_requests="gzip"
+        )
+        client.session = Mock()
+        mock_response.content = b'{"errorcode": 0}'
+        client.session.request.return_value = mock_response
+        client._make_request("POST", "/v1/people/create", json_data=LARGE_PERSON)
+
+        body = client.session.request.call_args[1]["data"]
+        assert json.loads(gzip.decompress(body)) == LARGE_PERSON
+
+    def test_async_client_compresses_content(self):
+        """Test that the async client sends compressed bytes as content."""
+        client = AsyncClozeClient(
+            api_key="test_key", compress_requests="zstd", compression_threshold=0
+        )
+        kwargs = client._prepare_request(
+            "POST", "/v1/people/create", json_data=LARGE_PERSON
+        )
+        assert kwargs["headers"] == {"Content-Encoding": "zstd"}
+        decompressed = zstandard.ZstdDecompressor().decompress(kwargs["content"])
+        assert json.loads(decompressed) == LARGE_PERSON
+
+    def test_accept_encoding_header(self):
+        """Test that the requests session advertises decodable encodings."""
+        client = ClozeClient(api_key="test_key")
+        assert client.session.headers["Accept-Encoding"] == requests_accept_encoding()
@@ -0,0 +1,292 @@
+"""Unit tests for adaptive concurrency limiting."""
+
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+import pytest
+from unittest.mock import Mock
+from cloze_sdk import (AsyncClozeClient, CircuitBreaker, ClozeClient,
+                       ClozeCircuitOpenError, ClozeRateLimitError, ClozeTimeoutError,
+                       ConcurrencyLimiter, RetryPolicy, deadline)
+from cloze_sdk.concurrency import _resolve
+
+
+class TestConcurrencyLimiter:
+    """Test slots and limit adjustment."""
+
+    def test_validation(self):
+        """Test that inconsistent limits and backoff factors are rejected."""
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(initial_limit=0)
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(initial_limit=10, max_limit=5)
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(backoff=1.0)
+
+    def test_slots(self):
+        """Test that no more than the limit may be in flight."""
+        limiter = ConcurrencyLimiter(initial_limit=2)
+        assert limiter.acquire() and limiter.acquire()
+        assert not limiter.acquire(timeout=0)
+        limiter.release("/v1/people/get", time.monotonic())
+        assert limiter.acquire(timeout=0)
+        assert limiter.stats() == {"limit": 2, "in_flight": 2, "decreases": 0}
+
+    def test_waiting_thread_woken(self):
+        """Test that a blocked thread gets the slot another one returns."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(limiter.acquire(5)))
+        waiter.start()
+        time.sleep(0.05)
+        limiter.release("/v1/people/get", time.monotonic())
+        waiter.join()
+        assert acquired == [True]
+
+    def test_additive_increase(self):
+        """Test that the limit grows by about one per limit's worth of successes."""
+        limiter = ConcurrencyLimiter(initial_limit=4, max_limit=5)
+        for _ in range(30):
+            for _ in range(4):
+                limiter.acquire(timeout=0)
+            for _ in range(4):
+                limiter.release("/v1/people/get", time.monotonic(), 0.1)
+        assert limiter.limit == 5
+
+    def test_no_increase_when_idle(self):
+        """Test that the limit does not grow when it is not being used."""
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release("/v1/people/get", time.monotonic(), 0.1)
+        assert limiter.limit == 8
+
+    def test_rate_limit_burst_backs_off_once(self):
+        """Test that 429s from requests in flight together halve the limit once."""
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        started = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        for _ in range(4):
+            limiter.release("/v1/people/get", started, rate_limited=True)
+        assert limiter.stats() == {"limit": 4, "in_flight": 0, "decreases": 1}
+
+        limiter.acquire()
+        limiter.release("/v1/people/get", time.monotonic(), rate_limited=True)
+        assert limiter.limit == 2
+
+    def test_min_limit(self):
+        """Test that the limit is never cut below min_limit."""
+        limiter = ConcurrencyLimiter(initial_limit=2, min_limit=2)
+        limiter.acquire()
+        limiter.release("/v1/people/get", time.monotonic(), rate_limited=True)
+        assert limiter.limit == 2
+
+    def test_rising_latency_backs_off(self):
+        """Test that latency well above an endpoint's baseline cuts the limit."""
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        for latency in [0.1] * 100:
+            limiter.acquire()
+            limiter.release("/v1/people/get", time.monotonic(), latency)
+        # A slow endpoint has its own baseline
+        limiter.acquire()
+        limiter.release("/v1/people/feed", time.monotonic(), 2.0)
+        assert limiter.limit == 8
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release("/v1/people/get", time.monotonic(), 1.0)
+        assert limiter.limit < 8
+
+    def test_noisy_latency_grows(self):
+        """Test that tail samples of steady, noisy latency do not cut the limit."""
+        rng = random.Random(7)
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        for _ in range(200):
+            limit = limiter.limit
+            started = time.monotonic()
+            for _ in range(limit):
+                limiter.acquire(timeout=0)
+            for _ in range(limit):
+                # Median 20 ms, p99 80 ms
+                latency = rng.lognormvariate(-3.91, 0.6)
+                limiter.release("/v1/people/get", started, latency)
+        assert limiter.stats()["decreases"] == 0
+        assert limiter.limit == 100
+
+    def test_no_sample(self):
+        """Test that releasing without a latency leaves the limit alone."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+        limiter.release("/v1/people/get", time.monotonic())
+        assert limiter.stats() == {"limit": 1, "in_flight": 0, "decreases": 0}
+
+
+class TestAsyncAcquire:
+    """Test waiting for slots from asyncio tasks."""
+
+    def test_task_woken(self):
+        """Test that a waiting task gets the slot another task returns."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+
+        async def run():
+            await limiter.acquire_async()
+            waiter = asyncio.ensure_future(limiter.acquire_async(5))
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+            limiter.release("/v1/people/get", time.monotonic())
+            return await waiter
+
+        assert asyncio.run(run()) is True
+
+    def test_timeout(self):
+        """Test that waiting gives up when the timeout passes."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+
+        async def run():
+            return await limiter.acquire_async(0.01)
+
+        assert asyncio.run(run()) is False
+        assert limiter._async_waiters == []
+
+    def test_slot_freed_at_timeout(self):
+        """Test that a slot freed as the wait times out is still taken."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.01, lambda: setattr(limiter, "_in_flight", 0))
+            return await limiter.acquire_async(0.02)
+
+        assert asyncio.run(run()) is True
+
+    def test_closed_loop_and_done_waiters(self):
+        """Test that waking skips closed loops and finished waiters."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        loop = asyncio.new_event_loop()
+        waiter = loop.create_future()
+        loop.close()
+        limiter._async_waiters.append((loop, waiter))
+        limiter.acquire()
+        limiter.release("/v1/people/get", time.monotonic())
+        assert limiter._async_waiters == []
+        waiter.cancel()
+        _resolve(waiter)
+
+
+class TestClientConcurrency:
+    """Test the limiter in the synchronous client."""
+
+    def test_rate_limited_response_cuts_limit(self, mock_response):
+        """Test that a 429 cuts the limit and the retry still succeeds."""
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        client = ClozeClient(
+            api_key="test_key",
+            concurrency_limiter=limiter,
+            retry_policy=RetryPolicy(backoff_base=0, jitter=False, max_retry_after=0),
+        )
+        limited = Mock(status_code=429, headers={})
+        client.session.request = Mock(side_effect=[limited, mock_response])
+        client.people.get("a@example.com")
+        assert limiter.stats() == {"limit": 4, "in_flight": 0, "decreases": 1}
+
+        assert client.metrics.snapshot()["gauges"] == {
+            "concurrency_in_flight": 0,
+            "concurrency_limit": 4,
+        }
+        prometheus = client.metrics.to_prometheus()
+        assert "# TYPE cloze_sdk_concurrency_limit gauge\ncloze_sdk_concurrency_limit 4\n" in (
+            prometheus
+        )
+
+    def test_rate_limit_error_releases(self, mock_response):
+        """Test that slots are returned when the request ends in an error."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        client = ClozeClient(api_key="test_key", concurrency_limiter=limiter)
+        client.session.request = Mock(return_value=Mock(status_code=429, headers={}))
+        with pytest.raises(ClozeRateLimitError):
+            client.people.get("a@example.com")
+        client.session.request = Mock(side_effect=KeyboardInterrupt)
+        with pytest.raises(KeyboardInterrupt):
+            client.people.get("a@example.com")
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_open_circuit_releases(self):
+        """Test that a slot is returned when the circuit rejects the request."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure("/v1/people/get")
+        client = ClozeClient(
+            api_key="test_key", concurrency_limiter=limiter, circuit_breaker=breaker
+        )
+        with pytest.raises(ClozeCircuitOpenError):
+            client.people.get("a@example.com")
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_deadline_while_waiting(self):
+        """Test that waiting for a slot is bounded by the deadline."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+        client = ClozeClient(api_key="test_key", concurrency_limiter=limiter)
+        with deadline(0.01):
+            with pytest.raises(ClozeTimeoutError, match="concurrency slot"):
+                client.people.get("a@example.com")
+
+
+class TestAsyncClientConcurrency:
+    """Test the limiter in the asyncio client."""
+
+    def test_limits_tasks(self):
+        """Test that concurrent tasks are held to the limit."""
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return httpx.Response(200, json={"errorcode": 0})
+
+        limiter = ConcurrencyLimiter(initial_limit=2, max_limit=2)
+        client = AsyncClozeClient(api_key="test_key", concurrency_limiter=limiter)
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            await asyncio.gather(*(client.team.get_roles() for _ in range(6)))
+
+        asyncio.run(run())
+        assert max(peak) == 2 and len(peak) == 6
+
+    def test_failures_release(self):
+        """Test that deadlines, transport errors and cancellation return slots."""
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        client = AsyncClozeClient(api_key="test_key", concurrency_limiter=limiter)
+
+        async def handler(request):
+            if request.url.path == "/v1/team/roles":
+                raise httpx.ConnectError("refused")
+            await asyncio.sleep(5)
+
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            with pytest.raises(Exception):
+                await client.team.get_roles()
+            task = asyncio.ensure_future(client.account.get_profile())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert limiter.stats()["in_flight"] == 0
+            await limiter.acquire_async()
+            with deadline(0.01):
+                with pytest.raises(ClozeTimeoutError, match="concurrency slot"):
+                    await client.account.get_profile()
+
+        asyncio.run(run())
@@ -0,0 +1,354 @@
+"""Unit tests for deadlines, split timeouts and paginated iteration."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from cloze_sdk import (AsyncClozeClient, ClozeClient, ClozeTimeoutError,
+                       RateLimiter, RetryPolicy, deadline)
+from cloze_sdk.deadline import deadline_at, remaining
+from cloze_sdk.exceptions import ClozeAPIError, ClozeRateLimitError
+from cloze_sdk.pagination import PageIterator
+
+
+def page_response(body, status=200, headers=None):
+    """Create a mock requests response."""
+    response = Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.json.return_value = body
+    return response
+
+
+class TestDeadline:
+    """Test the deadline context managers."""
+
+    def test_no_deadline(self):
+        """Test that there is no budget outside a deadline."""
+        assert remaining() is None
+        with deadline(None):
+            assert remaining() is None
+
+    def test_deadline_sets_and_restores_budget(self):
+        """Test that the budget applies inside the block only."""
+        with deadline(5):
+            assert 4 < remaining() <= 5
+        assert remaining() is None
+
+    def test_nested_deadline_only_shortens(self):
+        """Test that an inner deadline cannot extend an outer one."""
+        with deadline(1):
+            with deadline(10):
+                assert remaining() <= 1
+            with deadline(0.5):
+                assert remaining() <= 0.5
+            with deadline_at(None):
+                assert remaining() <= 1
+
+    def test_deadline_is_task_local(self):
+        """Test that asyncio tasks keep their own deadlines."""
+        async def budget(seconds):
+            with deadline(seconds):
+                await asyncio.sleep(0)
+                return remaining()
+
+        async def run():
+            return await asyncio.gather(budget(1), budget(100))
+
+        short, long = asyncio.run(run())
+        assert short <= 1 < long
+
+
+class TestTimeouts:
+    """Test connect/read timeout construction."""
+
+    def test_legacy_single_timeout(self):
+        """Test that a plain timeout is passed through unchanged."""
+        client = ClozeClient(api_key="test_key", timeout=20)
+        assert client._prepare_request("GET", "/v1/x")["timeout"] == 20
+
+    def test_split_timeout_for_requests(self):
+        """Test that requests receives a (connect, read) tuple."""
+        client = ClozeClient(api_key="test_key", timeout=20, connect_timeout=2)
+        assert client._prepare_request("GET", "/v1/x")["timeout"] == (2, 20)
+
+    def test_split_timeout_for_httpx(self):
+        """Test that httpx transports receive an httpx.Timeout."""
+        for client in (
+            AsyncClozeClient(api_key="test_key", timeout=20, connect_timeout=2),
+            ClozeClient(api_key="test_key", http2=True, timeout=20, connect_timeout=2),
+        ):
+            timeout = client._prepare_request("GET", "/v1/x")["timeout"]
+            assert timeout == httpx.Timeout(20, connect=2)
+
+    def test_budget_caps_both_timeouts(self):
+        """Test that the time left on a deadline caps connect and read."""
+        client = ClozeClient(api_key="test_key", timeout=20, connect_timeout=2)
+        assert client._request_timeout(1.5) == (1.5, 1.5)
+        assert client._request_timeout(5) == (2, 5)
+
+
+class TestClientDeadlines:
+    """Test deadline enforcement in the synchronous client."""
+
+    def test_request_uses_remaining_budget(self, mock_client):
+        """Test that requests inside a deadline get a capped timeout."""
+        with deadline(2):
+            mock_client._make_request("GET", "/v1/user/profile")
+        connect, read = mock_client.session.request.call_args[1]["timeout"]
+        assert connect <= 2 and read <= 2
+
+    def test_expired_deadline_raises_before_sending(self, mock_client):
+        """Test that no request is sent once the deadline has passed."""
+        with deadline(0):
+            with pytest.raises(ClozeTimeoutError, match="Deadline exceeded"):
+                mock_client._make_request("GET", "/v1/user/profile")
+        mock_client.session.request.assert_not_called()
+
+    def test_transport_timeout_raises_timeout_error(self, mock_client):
+        """Test that transport timeouts surface as ClozeTimeoutError."""
+        mock_client.session.request.side_effect = requests.exceptions.ReadTimeout("slow")
+        with pytest.raises(ClozeTimeoutError, match="Request failed"):
+            mock_client._make_request("GET", "/v1/user/profile")
+
+    def test_other_transport_errors_unchanged(self, mock_client):
+        """Test that non-timeout transport errors stay ClozeAPIError."""
+        mock_client.session.request.side_effect = requests.exceptions.ConnectionError("x")
+        with pytest.raises(ClozeAPIError) as exc_info:
+            mock_client._make_request("GET", "/v1/user/profile")
+        assert not isinstance(exc_info.value, ClozeTimeoutError)
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_backoff_past_deadline_not_retried(self, mock_sleep, mock_client):
+        """Test that a retry whose backoff overruns the deadline is skipped."""
+        mock_client.retry_policy = RetryPolicy(backoff_base=10, jitter=False)
+        mock_client.session.request.side_effect = requests.exceptions.ConnectionError("x")
+        with deadline(1):
+            with pytest.raises(ClozeAPIError, match="Request failed"):
+                mock_client._make_request("GET", "/v1/user/profile")
+        mock_sleep.assert_not_called()
+        assert mock_client.session.request.call_count == 1
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_retry_after_past_deadline_not_retried(self, mock_sleep, mock_client):
+        """Test that a Retry-After wait that overruns the deadline is skipped."""
+        mock_client.retry_policy = RetryPolicy()
+        mock_client.session.request.return_value = page_response(
+            {"errorcode": 429}, status=429, headers={"Retry-After": "30"}
+        )
+        with deadline(1):
+            with pytest.raises(ClozeRateLimitError):
+                mock_client._make_request("GET", "/v1/user/profile")
+        mock_sleep.assert_not_called()
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_rate_limit_timeout_keeps_token(self, mock_sleep, mock_client):
+        """Test that a request timing out on the rate limit spends no token."""
+        mock_client.rate_limiter = RateLimiter(rate=1, burst=1)
+        mock_client._make_request("GET", "/v1/user/profile")
+        with deadline(0.5):
+            with pytest.raises(ClozeTimeoutError, match="rate limit"):
+                mock_client._make_request("GET", "/v1/user/profile")
+        mock_sleep.assert_not_called()
+
+        # The next request waits for the first free token, not a second one
+        mock_client._make_request("GET", "/v1/user/profile")
+        assert mock_sleep.call_args[0][0] <= 1.0
+        assert mock_client.session.request.call_count == 2
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_rate_limit_wait(self, mock_sleep, mock_client):
+        """Test rate-limit waits inside and beyond the deadline."""
+        mock_client.rate_limiter = Mock()
+        mock_client.rate_limiter.reserve.return_value = 0.5
+        with deadline(5):
+            mock_client._make_request("GET", "/v1/user/profile")
+        mock_sleep.assert_called_once_with(0.5)
+
+        mock_client.rate_limiter.reserve.return_value = 10.0
+        with deadline(5):
+            with pytest.raises(ClozeTimeoutError, match="rate limit"):
+                mock_client._make_request("GET", "/v1/user/profile")
+
+
+class TestAsyncClientDeadlines:
+    """Test deadline enforcement in the asyncio client."""
+
+    def make_client(self, handler, **kwargs):
+        """Create an AsyncClozeClient backed by an httpx MockTransport."""
+        client = AsyncClozeClient(api_key="test_key", **kwargs)
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    def test_expired_deadline(self):
+        """Test that no request is sent once the deadline has passed."""
+        handler = Mock(return_value=httpx.Response(200, json={"errorcode": 0}))
+        client = self.make_client(handler)
+
+        async def run():
+            with deadline(0):
+                await client._make_request("GET", "/v1/user/profile")
+
+        with pytest.raises(ClozeTimeoutError):
+            asyncio.run(run())
+        handler.assert_not_called()
+
+    @patch("cloze_sdk.async_client.asyncio.sleep")
+    def test_timeout_not_retried_past_deadline(self, mock_sleep):
+        """Test that timeouts map to ClozeTimeoutError without overrunning."""
+        def handler(request):
+            raise httpx.ReadTimeout("slow", request=request)
+
+        client = self.make_client(
+            handler, retry_policy=RetryPolicy(backoff_base=10, jitter=False)
+        )
+
+        async def run():
+            with deadline(1):
+                await client._make_request("GET", "/v1/user/profile")
+
+        with pytest.raises(ClozeTimeoutError, match="Request failed"):
+            asyncio.run(run())
+        mock_sleep.assert_not_called()
+
+    def test_timeout_passed_to_httpx(self):
+        """Test that the remaining budget reaches httpx as the timeout."""
+        seen = {}
+
+        def handler(request):
+            seen.update(request.extensions["timeout"])
+            return httpx.Response(200, json={"errorcode": 0})
+
+        client = self.make_client(handler, connect_timeout=1)
+
+        async def run():
+            with deadline(3):
+                await client._make_request("GET", "/v1/user/profile")
+
+        asyncio.run(run())
+        assert seen["connect"] == 1
+        assert seen["read"] <= 3
+
+    def test_rate_limit_timeout_keeps_token(self):
+        """Test that a request timing out on the rate limit spends no token."""
+        limiter = RateLimiter(rate=1, burst=1)
+        handler = Mock(return_value=httpx.Response(200, json={"errorcode": 0}))
+        client = self.make_client(handler, rate_limiter=limiter)
+
+        async def run():
+            await client._make_request("GET", "/v1/user/profile")
+            with deadline(0.5):
+                with pytest.raises(ClozeTimeoutError, match="rate limit"):
+                    await client._make_request("GET", "/v1/user/profile")
+            assert limiter.reserve(client._credential_key, "/v1/user/profile") <= 1.0
+
+        asyncio.run(run())
+        assert handler.call_count == 1
+
+    def test_rate_limit_wait_past_deadline(self):
+        """Test that a rate-limit wait beyond the deadline raises."""
+        limiter = Mock()
+        limiter.reserve.return_value = 10.0
+        handler = Mock(return_value=httpx.Response(200, json={"errorcode": 0}))
+        client = self.make_client(handler, rate_limiter=limiter)
+
+        async def run():
+            with deadline(1):
+                await client._make_request("GET", "/v1/user/profile")
+
+        with pytest.raises(ClozeTimeoutError, match="rate limit"):
+            asyncio.run(run())
+
+
+class TestPagination:
+    """Test iter_find and iter_feed."""
+
+    def test_iter_find_pages_until_short_page(self, mock_client):
+        """Test that find iteration stops after a partial page."""
+        mock_client.session.request.side_effect = [
+            page_response({"errorcode": 0, "people": [{"id": 1}, {"id": 2}]}),
+            page_response({"errorcode": 0, "people": [{"id": 3}]}),
+        ]
+        records = list(mock_client.people.iter_find({"segment": "lead"}, pagesize=2))
+
+        assert records == [{"id": 1}, {"id": 2}, {"id": 3}]
+        calls = mock_client.session.request.call_args_list
+        assert [c[1]["params"]["pagenumber"] for c in calls] == [1, 2]
+        assert calls[0][1]["params"]["segment"] == "lead"
+        assert calls[0][1]["url"].endswith("/v1/people/find")
+
+    def test_iter_find_stops_on_empty_page(self, mock_client):
+        """Test that an empty page ends find iteration."""
+        mock_client.session.request.side_effect = [
+            page_response({"errorcode": 0, "companies": [{"id": 1}]}),
+            page_response({"errorcode": 0, "companies": []}),
+        ]
+        records = list(mock_client.companies.iter_find(pagesize=1))
+        assert records == [{"id": 1}]
+
+    def test_iter_feed_follows_cursor(self, mock_client):
+        """Test that feed iteration follows cursors until none is returned."""
+        mock_client.session.request.side_effect = [
+            page_response({"errorcode": 0, "projects": [{"id": 1}], "cursor": "c1"}),
+            page_response({"errorcode": 0, "projects": [{"id": 2}]}),
+        ]
+        records = list(mock_client.projects.iter_feed(stage="active"))
+
+        assert records == [{"id": 1}, {"id": 2}]
+        second = mock_client.session.request.call_args_list[1][1]["params"]
+        assert second == {"cursor": "c1", "stage": "active"}
+
+    @pytest.mark.parametrize("namespace", ["people", "companies", "projects"])
+    def test_helpers_on_every_namespace(self, mock_client, namespace):
+        """Test that every list namespace reads its own record field."""
+        mock_client.session.request.return_value = page_response(
+            {"errorcode": 0, namespace: [{"id": 1}]}
+        )
+        endpoints = getattr(mock_client, namespace)
+        assert list(endpoints.iter_find(pagesize=5)) == [{"id": 1}]
+        assert list(endpoints.iter_feed()) == [{"id": 1}]
+        urls = [c[1]["url"] for c in mock_client.session.request.call_args_list]
+        assert urls[0].endswith(f"/v1/{namespace}/find")
+        assert urls[1].endswith(f"/v1/{namespace}/feed")
+
+    def test_timeout_spans_all_pages(self, mock_client):
+        """Test that one deadline covers every page request."""
+        def slow_page(**kwargs):
+            time.sleep(0.05)
+            return page_response(
+                {"errorcode": 0, "people": [{"id": 1}], "cursor": "next"}
+            )
+
+        mock_client.session.request.side_effect = slow_page
+        records = []
+        with pytest.raises(ClozeTimeoutError):
+            for record in mock_client.people.iter_feed(timeout=0.12):
+                records.append(record)
+        assert 1 <= len(records) <= 3
+
+    def test_deadline_not_leaked_between_pages(self):
+        """Test that the iteration deadline applies only around fetches."""
+        fetch = Mock(return_value={"people": []})
+        iterator = PageIterator(fetch, "people", {}, cursor=True, timeout=5)
+        assert list(iterator) == []
+        assert remaining() is None
+
+    def test_async_iteration(self):
+        """Test that the asyncio client returns an async iterator."""
+        def handler(request):
+            cursor = request.url.params.get("cursor")
+            body = {"errorcode": 0, "people": [{"id": cursor or "first"}]}
+            if cursor is None:
+                body["cursor"] = "c1"
+            return httpx.Response(200, json=body)
+
+        client = AsyncClozeClient(api_key="test_key")
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            return [person async for person in client.people.iter_feed(timeout=5)]
+
+        assert asyncio.run(run()) == [{"id": "first"}, {"id": "c1"}]
@@ -0,0 +1,293 @@
+"""Unit tests for the local Cloze API emulator."""
+
+import gzip
+import json
+import statistics
+import time
+
+import pytest
+import requests
+from cloze_sdk import ClozeClient, RateLimiter
+from cloze_sdk.emulator import (NO_IDENTIFIERS, NOT_FOUND, ClozeEmulator,
+                                lognormal_latency, main)
+from cloze_sdk.exceptions import (ClozeAPIError, ClozeAuthenticationError,
+                                  ClozeRateLimitError)
+
+
+@pytest.fixture
+def emulator():
+    """Run a small emulator for one test."""
+    with ClozeEmulator(people=250, companies=30, projects=20, opens=150, seed=1) as emulator:
+        yield emulator
+
+
+@pytest.fixture
+def client(emulator):
+    """Create a client talking to the emulator."""
+    return ClozeClient(api_key="test_key", base_url=emulator.url)
+
+
+class TestRecords:
+    """Test people, company and project endpoints."""
+
+    def test_find_pages(self, client):
+        """Test that find pages through every record and counts them."""
+        assert client.people.find(countonly=True) == {"errorcode": 0, "availablecount": 250}
+        page = client.people.find(pagenumber=3, pagesize=100)
+        assert (page["availablecount"], len(page["people"])) == (250, 50)
+        assert page["people"][0]["direct"] == "P200"
+        assert len(list(client.people.iter_find(pagesize=40))) == 250
+        assert len(list(client.companies.iter_find())) == 30
+
+    def test_find_skips_deleted(self, client):
+        """Test that pages stay contiguous after deletes."""
+        for identifier in ("P0", "person3@example.com", "P4", "P100"):
+            assert client.people.delete(identifier) == {"errorcode": 0}
+        page = client.people.find(pagenumber=2, pagesize=3)["people"]
+        assert [person["direct"] for person in page] == ["P6", "P7", "P8"]
+        assert client.people.find(countonly=1)["availablecount"] == 246
+        with pytest.raises(ClozeAPIError) as error:
+            client.people.delete("P4")
+        assert error.value.errorcode == NOT_FOUND
+
+    def test_feed_follows_changes(self, client):
+        """Test that the feed returns every record once, changed ones last."""
+        client.people.update({"emails": [{"value": "person1@example.com"}], "stage": "out"})
+        client.people.update({"direct": "P1", "segment": "partner"})
+        client.people.create({"emails": [{"value": "new@example.com"}], "name": "New"})
+        client.people.delete("P2")
+
+        people = list(client.people.iter_feed(pagesize=60))
+        assert len(people) == 250
+        assert [person["direct"] for person in people[-2:]] == ["P1", "P250"]
+        assert (people[-2]["stage"], people[-2]["segment"]) == ("out", "partner")
+
+        page = client.projects.feed(pagesize=5)
+        assert len(page["projects"]) == 5
+        assert client.projects.feed(cursor=page["cursor"])["projects"][0]["direct"] == "J5"
+        with pytest.raises(ClozeAPIError, match="Invalid cursor"):
+            client.companies.feed(cursor="not-a-cursor")
+
+    def test_get(self, client):
+        """Test lookups by generated and stored identifiers."""
+        assert client.people.get("Person7@Example.com")["person"]["direct"] == "P7"
+        assert client.companies.get("company4.example.com")["company"]["name"] == "Company 4"
+        assert client.projects.get("J3")["project"]["segment"] == "project"
+        for identifier in ("P250", "nobody@example.com"):
+            with pytest.raises(ClozeAPIError, match="Person not found") as error:
+                client.people.get(identifier)
+            assert error.value.errorcode == NOT_FOUND
+
+    def test_create_and_update(self, client):
+        """Test creating, enhancing and updating records."""
+        created = client.people.create(
+            {"emails": [{"value": "ada@example.com"}], "phones": [{"value": "+1555"}]}
+        )
+        assert created == {"errorcode": 0, "direct": "P250"}
+        assert (
+            client.people.create({"email": "ada@example.com", "first": "Ada"})["direct"] == "P250"
+        )
+        assert client.people.get("+1555")["person"]["first"] == "Ada"
+        assert client.companies.update({"domains": ["company2.example.com"], "stage": "lead"})
+        assert client.companies.get("C2")["company"]["stage"] == "lead"
+        project = client.projects.create(
+            {"name": "Renovation", "appLinks": [{"uniqueid": "006j0"}]}
+        )
+        assert client.projects.get("006J0")["project"]["direct"] == project["direct"]
+        assert client.projects.create({"name": "Unlinked"})["direct"] == "J21"
+
+        with pytest.raises(ClozeAPIError, match="No identifiers available") as error:
+            client.people.create({"first": "Anonymous"})
+        assert error.value.errorcode == NO_IDENTIFIERS
+        with pytest.raises(ClozeAPIError) as error:
+            client.projects.update({"name": "Renovation"})
+        assert error.value.errorcode == NO_IDENTIFIERS
+        with pytest.raises(ClozeAPIError, match="Company not found"):
+            client.companies.update({"domain": "unknown.example.com"})
+
+
+class TestOtherEndpoints:
+    """Test the remaining endpoint surface."""
+
+    def test_message_opens(self, emulator, client):
+        """Test that opens are paged with more and next."""
+        first = client.timeline.get_message_opens(user="me")
+        assert (len(first["messages"]), first["more"]) == (100, True)
+        assert first["next"].startswith(emulator.url)
+        rest = client.session.get(first["next"]).json()
+        assert (len(rest["messages"]), rest["more"]) == (50, False)
+        assert "next" not in rest
+        recent = client.timeline.get_message_opens(from_timestamp=1_700_000_000_000 + 120 * 60_000)
+        assert recent["messages"][0]["id"] == "M120"
+
+    def test_metadata_team_and_analytics(self, emulator, client):
+        """Test account metadata, team, analytics and timeline endpoints."""
+        account = client.account
+        for call in (
+            account.get_fields,
+            account.get_profile,
+            account.get_segments_people,
+            account.get_segments_projects,
+            account.get_stages_people,
+            account.get_stages_projects,
+            account.get_steps,
+            account.get_views,
+            client.team.get_nodes,
+            client.team.get_roles,
+            client.analytics.get_team_activity_update,
+        ):
+            assert call()["errorcode"] == 0
+        assert account.get_profile()["user"]["email"] == "user@example.com"
+        assert len(client.team.list_members()["list"]) == 10
+        assert client.team.update_members([{"email": "member1@example.com"}])["errorcode"] == 0
+
+        results = client.analytics.query_funnel({"wins": {}, "losses": {}})["results"]
+        assert set(results) == {"wins", "losses"}
+        assert results == client.analytics.query_activity({"wins": {}, "losses": {}})["results"]
+
+        client.timeline.create_communication({"from": "a@example.com"})
+        client.timeline.create_content({"title": "Note"})
+        client.timeline.create_todo({"subject": "Call"})
+        assert emulator.timeline == 3
+
+    def test_webhooks(self, emulator, client):
+        """Test subscribing, listing and unsubscribing."""
+        first = client.webhooks.subscribe("person.change", "https://hook.example.com/a")
+        client.webhooks.subscribe(
+            "project.change", "https://hook.example.com/b", client_reference="mine"
+        )
+        listed = client.webhooks.list()["list"]
+        assert [hook["uniqueId"] for hook in listed][0] == first["uniqueid"]
+
+        client.webhooks.unsubscribe("person.change", uniqueid=first["uniqueid"])
+        client.webhooks.unsubscribe("project.change", client_reference="mine")
+        assert client.webhooks.list()["list"] == []
+        with pytest.raises(ClozeAPIError, match="Subscription not found"):
+            client.webhooks.unsubscribe("person.change", uniqueid=first["uniqueid"])
+        _, _, payload = emulator.handle(
+            "POST", "/v1/webhooks/subscribe", {"api_key": "k"}, {}, {"event": "x"}
+        )
+        assert payload["errorcode"] == NOT_FOUND
+
+    def test_unknown_endpoint(self, emulator):
+        """Test that unknown endpoints get 404."""
+        status, _, payload = emulator.handle("GET", "/v1/unknown", {}, {}, None)
+        assert (status, payload["message"]) == (404, "Unknown endpoint")
+        assert emulator.stats()["status"] == {"404": 1}
+
+
+class TestFaults:
+    """Test latency, errors, rate limits and authentication."""
+
+    def test_injected_errors(self):
+        """Test injected error codes and 503 responses."""
+        with ClozeEmulator(error_rate=1.0, errorcode=7) as emulator:
+            client = ClozeClient(api_key="k", base_url=emulator.url)
+            with pytest.raises(ClozeAPIError) as error:
+                client.account.get_profile()
+            assert error.value.errorcode == 7
+        with ClozeEmulator(server_error_rate=1.0) as emulator:
+            client = ClozeClient(api_key="k", base_url=emulator.url)
+            with pytest.raises(ClozeAPIError, match="Unavailable"):
+                client.account.get_profile()
+            stats = emulator.stats()
+            assert stats["status"] == {"503": 1} and stats["errorcodes"] == {"1": 1}
+
+    def test_rate_limited(self):
+        """Test that requests over a credential's budget get 429 with Retry-After."""
+        limiter = RateLimiter(rate=0.5, burst=2)
+        with ClozeEmulator(rate_limiter=limiter) as emulator:
+            client = ClozeClient(api_key="k", base_url=emulator.url)
+            client.account.get_profile()
+            client.account.get_profile()
+            with pytest.raises(ClozeRateLimitError) as error:
+                client.account.get_profile()
+            assert error.value.retry_after == 2
+            # Budgets are per credential
+            ClozeClient(oauth_token="other", base_url=emulator.url).account.get_profile()
+            response = requests.get(f"{emulator.url}/v1/user/profile?api_key=k")
+            assert response.status_code == 429
+
+    def test_authentication(self):
+        """Test that only the configured keys are accepted."""
+        with ClozeEmulator(api_keys=["good"]) as emulator:
+            assert ClozeClient(api_key="good", base_url=emulator.url).account.get_profile()
+            with pytest.raises(ClozeAuthenticationError):
+                ClozeClient(api_key="bad", base_url=emulator.url).account.get_profile()
+            assert requests.get(f"{emulator.url}/v1/user/profile").status_code == 401
+
+    def test_latency(self):
+        """Test that responses wait for the configured latency."""
+        with ClozeEmulator(latency=lambda endpoint: 0.05) as emulator:
+            client = ClozeClient(api_key="k", base_url=emulator.url)
+            started = time.monotonic()
+            client.account.get_profile()
+            assert time.monotonic() - started >= 0.05
+
+    def test_lognormal_latency(self):
+        """Test the median and tail of the log-normal distribution."""
+        sample = lognormal_latency(0.05, 0.5, seed=3)
+        values = sorted(sample("/v1/people/find") for _ in range(20_000))
+        assert statistics.median(values) == pytest.approx(0.05, rel=0.05)
+        assert values[int(len(values) * 0.99)] == pytest.approx(0.5, rel=0.15)
+        with pytest.raises(ValueError):
+            lognormal_latency(0.5, 0.05)
+
+
+class TestHTTP:
+    """Test request and response encoding."""
+
+    def test_compressed_bodies(self, emulator):
+        """Test gzip and zstd request bodies and gzip responses."""
+        person = {"emails": [{"value": "big@example.com"}], "notes": "x" * 4096}
+        for encoding in ("gzip", "zstd"):
+            client = ClozeClient(api_key="k", base_url=emulator.url, compress_requests=encoding)
+            assert client.people.create(person)["direct"] == "P250"
+
+        response = requests.get(
+            f"{emulator.url}/v1/people/find?api_key=k&pagesize=50",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert len(response.json()["people"]) == 50
+        response = requests.get(
+            f"{emulator.url}/v1/people/find?api_key=k&pagesize=50",
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert "Content-Encoding" not in response.headers
+
+    def test_unreadable_body(self, emulator):
+        """Test that a body that is not JSON gets 400."""
+        response = requests.post(
+            f"{emulator.url}/v1/people/create?api_key=k",
+            data=gzip.compress(b"not json"),
+            headers={"Content-Encoding": "gzip"},
+        )
+        assert response.status_code == 400
+        assert response.json()["message"] == "Unreadable body"
+
+    def test_millions_of_records(self):
+        """Test that a large dataset is served without materializing it."""
+        with ClozeEmulator(people=5_000_000) as emulator:
+            client = ClozeClient(api_key="k", base_url=emulator.url)
+            assert client.people.find(countonly=True)["availablecount"] == 5_000_000
+            last = client.people.find(pagenumber=50_000, pagesize=100)["people"][-1]
+            assert last["emails"][0]["value"] == "person4999999@example.com"
+
+
+class TestMain:
+    """Test the command line entry point."""
+
+    def test_runs_until_interrupted(self, monkeypatch, capsys):
+        """Test that the CLI serves until interrupted, then prints statistics."""
+
+        def serve_forever(self):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr("cloze_sdk.emulator.ThreadingHTTPServer.serve_forever", serve_forever)
+        argv = "--port 0 --people 5 --latency-median 0.01 --rate 5 --api-key a --seed 1"
+        assert main(argv.split()) == 0
+        output = capsys.readouterr().out
+        assert "Cloze API emulator listening on http://127.0.0.1:" in output
+        stats = json.loads(output[output.index("{"):])
+        assert stats["records"]["people"] == 5
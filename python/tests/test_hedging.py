@@ -0,0 +1,464 @@
+"""Unit tests for hedged requests."""
+
+import asyncio
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import requests
+from unittest.mock import Mock
+from cloze_sdk import AsyncClozeClient, ClozeAPIError, ClozeClient, HedgePolicy
+from cloze_sdk.hedging import HedgeTimer, Interrupt
+
+
+def eager_policy(**kwargs):
+    """Build a policy that may hedge every request after a short delay."""
+    return HedgePolicy(budget=1.0, initial_delay=0.01, **kwargs)
+
+
+class TestHedgePolicy:
+    """Test hedge delays and budget."""
+
+    def test_validation(self):
+        """Test that out-of-range settings are rejected."""
+        with pytest.raises(ValueError):
+            HedgePolicy(percentile=0)
+        with pytest.raises(ValueError):
+            HedgePolicy(budget=1.5)
+
+    def test_applies_to_hedged_gets_only(self):
+        """Test that only GETs to hedged endpoints qualify."""
+        policy = HedgePolicy()
+        assert policy.applies("GET", "/v1/people/get")
+        assert not policy.applies("POST", "/v1/people/get")
+        assert not policy.applies("GET", "/v1/people/find")
+
+    def test_delay_from_percentile(self):
+        """Test the initial delay and the percentile once enough samples exist."""
+        policy = HedgePolicy(percentile=90, min_samples=10, initial_delay=0.3, min_delay=0.05)
+        assert policy.delay_for("/v1/people/get") == 0.3
+        for i in range(1, 11):
+            policy.observe("/v1/people/get", i / 10)
+        assert policy.delay_for("/v1/people/get") == 1.0
+        policy = HedgePolicy(percentile=50, min_samples=1, min_delay=0.05)
+        policy.observe("/v1/people/get", 0.001)
+        assert policy.delay_for("/v1/people/get") == 0.05
+
+    def test_budget(self):
+        """Test that hedges are limited to the budgeted fraction of requests."""
+        policy = HedgePolicy(budget=0.25, window=4)
+        for _ in range(3):
+            policy.start()
+        assert not policy.try_hedge()
+        policy.start()
+        assert policy.try_hedge()
+        assert not policy.try_hedge()
+        assert policy.stats() == {"requests": 4, "hedges": 1}
+
+    def test_tokens_capped(self):
+        """Test that a quiet period cannot bank a burst of hedges."""
+        policy = HedgePolicy(budget=0.5, window=4)
+        for _ in range(100):
+            policy.start()
+        assert [policy.try_hedge() for _ in range(3)] == [True, True, False]
+
+
+class TestHedgeTimer:
+    """Test the timer that launches synchronous hedges."""
+
+    def test_runs_due_callbacks_in_order(self):
+        """Test ordering, cancellation, and the thread exiting and restarting."""
+        timer = HedgeTimer(linger=0.2)
+        fired = []
+        done = threading.Event()
+        timer.schedule(0.2, lambda: (fired.append("late"), done.set()))
+        timer.schedule(0.05, lambda: fired.append("early"))
+        timer.cancel(timer.schedule(0.01, lambda: fired.append("cancelled")))
+        assert done.wait(5)
+        assert fired == ["early", "late"]
+
+        # Scheduled while the thread lingers, then again after it has exited
+        for _ in range(2):
+            done.clear()
+            timer.schedule(0, done.set)
+            assert done.wait(5)
+            deadline = time.monotonic() + 5
+            while timer._running and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert not timer._running
+
+
+class TestInterrupt:
+    """Test aborting a blocked read."""
+
+    def test_fire_shuts_down_attached_socket(self):
+        """Test that firing wakes a reader, now or on a later attach."""
+        interrupt = Interrupt()
+        first, peer = socket.socketpair()
+        interrupt.attach(first)
+        interrupt.fire()
+        assert first.recv(1) == b""
+
+        second, other_peer = socket.socketpair()
+        interrupt.attach(second)
+        assert second.recv(1) == b""
+
+        unconnected = socket.socket()
+        interrupt.attach(unconnected)
+        interrupt.attach(object())
+        interrupt.detach()
+        interrupt.fire()
+        for sock in (first, peer, second, other_peer, unconnected):
+            sock.close()
+
+
+@pytest.fixture
+def slow_first_server(local_server):
+    """Run a JSON server that holds its first response until released."""
+    release = threading.Event()
+    paths = []
+    # Status codes by copy number; copies not listed get a 200
+    statuses = {}
+
+    def respond(request):
+        paths.append(request.path)
+        copy = len(paths)
+        if copy == 1:
+            release.wait(5)
+        return statuses.get(copy, 200), {"errorcode": 0, "copy": copy}, {}
+
+    yield SimpleNamespace(
+        url=local_server(respond), paths=paths, release=release, statuses=statuses
+    )
+    release.set()
+
+
+class TestClientHedging:
+    """Test hedging in the synchronous client."""
+
+    def test_slow_primary_loses(self, slow_first_server):
+        """Test that a winning hedge interrupts the slow primary on the caller's thread."""
+        server = slow_first_server
+        client = ClozeClient(
+            api_key="test_key", base_url=server.url, hedge_policy=eager_policy()
+        )
+
+        started = time.monotonic()
+        assert client.people.get("a@example.com") == {"errorcode": 0, "copy": 2}
+        assert time.monotonic() - started < 4
+        assert len(server.paths) == 2
+
+        snapshot = client.metrics.snapshot()
+        endpoint = snapshot["endpoints"]["/v1/people/get"]
+        assert (endpoint["hedges_sent"], endpoint["hedge_wins"]) == (1, 1)
+        # The interrupted copy is not recorded as a failed attempt
+        assert snapshot["requests"]["GET /v1/people/get"]["count"] == 1
+
+    def test_slow_hedge_loses(self, mock_response):
+        """Test that a primary answering first closes the hedge's response."""
+        client = ClozeClient(api_key="test_key", hedge_policy=eager_policy())
+        caller = threading.current_thread()
+        hedge_started, release = threading.Event(), threading.Event()
+        slow = Mock(status_code=200)
+
+        def request(**kwargs):
+            if threading.current_thread() is caller:
+                hedge_started.wait(5)
+                return mock_response
+            hedge_started.set()
+            release.wait(5)
+            return slow
+
+        client.session.request = Mock(side_effect=request)
+        assert client.people.get("a@example.com") == {"errorcode": 0, "data": "test"}
+        release.set()
+        client._hedge_executor.shutdown(wait=True)
+
+        slow.close.assert_called_once()
+        slow.json.assert_not_called()
+        endpoint = client.metrics.snapshot()["endpoints"]["/v1/people/get"]
+        assert endpoint["hedges_sent"] == 1 and "hedge_wins" not in endpoint
+
+    def test_primaries_not_limited_by_workers(self, mock_response):
+        """Test that more hedgeable calls than hedge workers run at once."""
+        policy = HedgePolicy(budget=0.0, initial_delay=0.001)
+        client = ClozeClient(api_key="test_key", hedge_policy=policy, pool_maxsize=2)
+        together = threading.Barrier(8, timeout=5)
+        threads = []
+
+        def request(**kwargs):
+            threads.append(threading.current_thread().name)
+            together.wait()
+            return mock_response
+
+        client.session.request = Mock(side_effect=request)
+        callers = [
+            threading.Thread(target=client.people.get, args=("a@example.com",))
+            for _ in range(8)
+        ]
+        for thread in callers:
+            thread.start()
+        for thread in callers:
+            thread.join()
+
+        assert not together.broken
+        assert sorted(threads) == sorted(thread.name for thread in callers)
+        assert client._hedge_executor._max_workers == 2
+
+    def test_workers_built_once(self, mock_response, monkeypatch):
+        """Test that concurrent first calls share one executor and timer."""
+        timers = []
+
+        class SlowTimer(HedgeTimer):
+            def __init__(self):
+                timers.append(self)
+                time.sleep(0.05)
+                super().__init__()
+
+        monkeypatch.setattr("cloze_sdk.client.HedgeTimer", SlowTimer)
+        policy = HedgePolicy(budget=0.0, initial_delay=5)
+        client = ClozeClient(api_key="test_key", hedge_policy=policy)
+        client.session.request = Mock(return_value=mock_response)
+        callers = [
+            threading.Thread(target=client.people.get, args=("a@example.com",))
+            for _ in range(8)
+        ]
+        for thread in callers:
+            thread.start()
+        for thread in callers:
+            thread.join()
+
+        assert timers == [client._hedge_timer]
+        assert client.session.request.call_count == 8
+
+    def test_fast_primary_not_hedged(self, mock_response):
+        """Test that a prompt response is used without a hedge."""
+        policy = HedgePolicy(budget=1.0, initial_delay=5)
+        client = ClozeClient(api_key="test_key", hedge_policy=policy)
+        client.session.request = Mock(return_value=mock_response)
+        client.companies.get("example.com")
+        assert client.session.request.call_count == 1
+        assert len(policy._latencies["/v1/companies/get"]) == 1
+
+    def test_budget_exhausted(self, mock_response):
+        """Test that a slow request waits for its own response without budget."""
+        policy = HedgePolicy(budget=0.0, initial_delay=0.001)
+        client = ClozeClient(api_key="test_key", hedge_policy=policy)
+        declined = threading.Event()
+        try_hedge = policy.try_hedge
+        policy.try_hedge = lambda: (declined.set(), try_hedge())[1]
+
+        def request(**kwargs):
+            declined.wait(5)
+            return mock_response
+
+        client.session.request = Mock(side_effect=request)
+        client.people.get("a@example.com")
+        assert declined.is_set()
+        assert client.session.request.call_count == 1
+        assert policy.stats() == {"requests": 1, "hedges": 0}
+
+    def test_failed_copies(self, mock_response):
+        """Test that a failed copy defers to the other, and both failing raises."""
+        client = ClozeClient(api_key="test_key", hedge_policy=eager_policy())
+        release = threading.Event()
+        outcomes = [requests.exceptions.ConnectionError("primary"), mock_response]
+
+        def request(**kwargs):
+            outcome = outcomes.pop(0)
+            if outcomes:
+                release.wait(5)
+            else:
+                release.set()
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        client.session.request = Mock(side_effect=request)
+        assert client.people.get("a@example.com") == {"errorcode": 0, "data": "test"}
+
+        release.clear()
+        outcomes[:] = [
+            requests.exceptions.ConnectionError("primary"),
+            requests.exceptions.ConnectionError("hedge"),
+        ]
+        with pytest.raises(ClozeAPIError, match="primary"):
+            client.people.get("a@example.com")
+
+    def test_failing_hedge_does_not_interrupt(self, slow_first_server):
+        """Test that a fast 503 hedge leaves the slow primary to succeed."""
+        server = slow_first_server
+        server.statuses[2] = 503
+        client = ClozeClient(
+            api_key="test_key", base_url=server.url, hedge_policy=eager_policy()
+        )
+        releaser = threading.Timer(0.2, server.release.set)
+        releaser.start()
+        try:
+            assert client.people.get("a@example.com") == {"errorcode": 0, "copy": 1}
+        finally:
+            releaser.cancel()
+        assert len(server.paths) == 2
+        endpoint = client.metrics.snapshot()["endpoints"]["/v1/people/get"]
+        assert endpoint["hedges_sent"] == 1 and "hedge_wins" not in endpoint
+
+    def race(self, client, primary, hedge, hedge_first):
+        """Hedge a call whose copies return the given responses in either order."""
+        caller = threading.current_thread()
+        hedge_started, primary_done = threading.Event(), threading.Event()
+
+        def request(**kwargs):
+            if threading.current_thread() is caller:
+                hedge_started.wait(5)
+                if hedge_first:
+                    time.sleep(0.05)
+                primary_done.set()
+                return primary
+            hedge_started.set()
+            if not hedge_first:
+                primary_done.wait(5)
+            return hedge
+
+        client.session.request = Mock(side_effect=request)
+        try:
+            return client.people.get("a@example.com")
+        finally:
+            client._hedge_executor.shutdown(wait=True)
+
+    def test_server_errors_do_not_win(self, mock_response):
+        """Test that a 5xx or 429 from either copy waits for the other copy."""
+        down = Mock(status_code=503, headers={})
+        down.json.return_value = {"errorcode": 1, "message": "down"}
+        ok = {"errorcode": 0, "data": "test"}
+
+        # A fast failing hedge does not interrupt the slow healthy primary
+        client = ClozeClient(api_key="test_key", hedge_policy=eager_policy())
+        assert self.race(client, mock_response, down, hedge_first=True) == ok
+        down.close.assert_called_once()
+        endpoint = client.metrics.snapshot()["endpoints"]["/v1/people/get"]
+        assert "hedge_wins" not in endpoint
+
+        # A failing primary defers to the hedge still in flight
+        down.reset_mock()
+        client = ClozeClient(api_key="test_key", hedge_policy=eager_policy())
+        assert self.race(client, down, mock_response, hedge_first=False) == ok
+        down.close.assert_called_once()
+        endpoint = client.metrics.snapshot()["endpoints"]["/v1/people/get"]
+        assert endpoint["hedge_wins"] == 1
+
+        # When both fail the first copy's response is used
+        client = ClozeClient(api_key="test_key", hedge_policy=eager_policy())
+        throttled = Mock(status_code=429, headers={})
+        with pytest.raises(ClozeAPIError, match="down"):
+            self.race(client, down, throttled, hedge_first=False)
+        throttled.close.assert_called_once()
+
+    def test_other_endpoints_not_hedged(self, mock_response):
+        """Test that requests outside the policy skip the worker pool."""
+        client = ClozeClient(api_key="test_key", hedge_policy=eager_policy())
+        client.session.request = Mock(return_value=mock_response)
+        client.people.find(query={"segment": "lead"})
+        assert client._hedge_executor is None
+
+
+class TestAsyncClientHedging:
+    """Test hedging in the asyncio client."""
+
+    def make_client(self, handler, **kwargs):
+        """Create an asyncio client hedging through a mock transport."""
+        client = AsyncClozeClient(api_key="test_key", hedge_policy=eager_policy(**kwargs))
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    def test_slow_primary_cancelled(self):
+        """Test that the hedge wins and the slow primary is cancelled."""
+        cancelled = []
+
+        async def handler(request):
+            if not cancelled:
+                cancelled.append(False)
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled[0] = True
+                    raise
+            return httpx.Response(200, json={"errorcode": 0, "person": {}})
+
+        client = self.make_client(handler)
+
+        async def run():
+            result = await client.people.get("a@example.com")
+            await asyncio.sleep(0)
+            return result
+
+        assert asyncio.run(run()) == {"errorcode": 0, "person": {}}
+        assert cancelled == [True]
+        endpoint = client.metrics.snapshot()["endpoints"]["/v1/people/get"]
+        assert endpoint["hedge_wins"] == 1
+
+    def test_fast_primary_and_failures(self):
+        """Test an unhedged fast response, a failed primary and both copies failing."""
+        script = []
+
+        async def handler(request):
+            delay, outcome = script.pop(0)
+            await asyncio.sleep(delay)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        client = self.make_client(handler)
+        ok = httpx.Response(200, json={"errorcode": 0})
+
+        async def run():
+            script[:] = [(0, ok)]
+            assert await client.people.get("a@example.com") == {"errorcode": 0}
+            script[:] = [(0.05, httpx.ConnectError("primary")), (0.1, ok)]
+            assert await client.people.get("a@example.com") == {"errorcode": 0}
+            script[:] = [
+                (0.05, httpx.ConnectError("primary")),
+                (0.02, httpx.ConnectError("hedge")),
+            ]
+            with pytest.raises(ClozeAPIError, match="primary"):
+                await client.people.get("a@example.com")
+            script[:] = [(0.05, ok), (0.02, httpx.ConnectError("hedge"))]
+            assert await client.people.get("a@example.com") == {"errorcode": 0}
+
+        asyncio.run(run())
+        assert client.hedge_policy.stats()["hedges"] == 3
+
+    def test_server_errors_do_not_win(self):
+        """Test that a 5xx or 429 from either copy waits for the other copy."""
+        script = []
+
+        async def handler(request):
+            delay, outcome = script.pop(0)
+            await asyncio.sleep(delay)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        client = self.make_client(handler)
+        ok = httpx.Response(200, json={"errorcode": 0})
+        down = httpx.Response(503, json={"errorcode": 1, "message": "down"})
+        throttled = httpx.Response(429, json={"errorcode": 1, "message": "slow down"})
+
+        async def run():
+            script[:] = [(0.1, ok), (0, down)]
+            assert await client.people.get("a@example.com") == {"errorcode": 0}
+            script[:] = [(0.05, down), (0.1, ok)]
+            assert await client.people.get("a@example.com") == {"errorcode": 0}
+            # Neither succeeds: the first copy's response, else the hedge's
+            script[:] = [(0.05, down), (0.02, throttled)]
+            with pytest.raises(ClozeAPIError, match="down"):
+                await client.people.get("a@example.com")
+            script[:] = [(0.05, httpx.ConnectError("primary")), (0.02, down)]
+            with pytest.raises(ClozeAPIError, match="down"):
+                await client.people.get("a@example.com")
+
+        asyncio.run(run())
+        endpoint = client.metrics.snapshot()["endpoints"]["/v1/people/get"]
+        assert (endpoint["hedges_sent"], endpoint["hedge_wins"]) == (4, 1)
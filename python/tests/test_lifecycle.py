@@ -0,0 +1,216 @@
+"""Unit tests for fork detection and concurrent use of one client."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from unittest.mock import Mock
+from cloze_sdk import (AsyncClozeClient, ClozeClient, ClozeClientPool,
+                       ConcurrencyLimiter, ResponseCache, SQLiteCacheBackend)
+from cloze_sdk.client import _live_clients, _reset_clients_after_fork
+
+
+@pytest.fixture
+def server(local_server):
+    """Run a local JSON server recording the client port of each request."""
+    ports = []
+
+    def respond(request):
+        ports.append(request.client_address[1])
+        cookie = f"seen={len(ports)}; Path=/"
+        return 200, {"errorcode": 0, "path": request.path}, {"Set-Cookie": cookie}
+
+    return local_server(respond), ports
+
+
+@pytest.fixture
+def forked(monkeypatch):
+    """Make the client believe it now runs in a forked child."""
+    pid = os.getpid() + 1
+    monkeypatch.setattr("cloze_sdk.client.os.getpid", lambda: pid)
+    monkeypatch.setattr("cloze_sdk.transport.os.getpid", lambda: pid)
+    monkeypatch.setattr("cloze_sdk.cache.os.getpid", lambda: pid)
+    monkeypatch.setattr("cloze_sdk.concurrency.os.getpid", lambda: pid)
+    monkeypatch.setattr("cloze_sdk.pool.os.getpid", lambda: pid)
+
+
+class TestForkDetection:
+    """Test that clients rebuild their transport after fork()."""
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_child_uses_own_connections(self, server, tmp_path):
+        """Test that a child opens its own connections and the parent keeps its own."""
+        url, ports = server
+        cache = ResponseCache(SQLiteCacheBackend(str(tmp_path / "cache.db")))
+        client = ClozeClient(api_key="test_key", base_url=url, cache=cache)
+        client.account.get_profile()
+        inherited = cache.backend._conn
+
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child process
+            try:
+                client.people.get("a@example.com")
+                client.people.get("a@example.com")
+                assert cache.backend._conn is not inherited
+                assert cache.stats()["hits"] == 1
+                os._exit(0)
+            except BaseException:
+                os._exit(1)
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+        client.people.find(query={"segment": "lead"})
+        assert cache.backend._conn is inherited
+        assert len(ports) == 3
+        assert ports[0] == ports[2] != ports[1]
+        # The profile was cached by the parent, the lookup by the child
+        assert len(cache.backend) == 2
+
+    def test_requests_transport_reset(self, mock_response, forked):
+        """Test that pooled connections and parent-thread state are dropped."""
+        client = ClozeClient(api_key="test_key", single_flight=True)
+        client._adapter._pid = 0
+        manager = client._adapter.poolmanager
+        flights = client._flights
+        client._hedge_executor = client._hedge_timer = Mock()
+        client.session.request = Mock(return_value=mock_response)
+
+        # The hook registered with os.register_at_fork() reaches every client
+        assert client in _live_clients
+        _reset_clients_after_fork()
+        assert client._adapter.poolmanager is not manager
+        assert client._flights is not flights
+        assert client._hedge_executor is None and client._hedge_timer is None
+        manager = client._adapter.poolmanager
+        client.account.get_profile()
+        assert client._adapter.poolmanager is manager
+
+    def test_sqlite_cache_reopened(self, mock_response, forked, tmp_path):
+        """Test that a SQLite cache gets its own connection, once per process."""
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+        first = ClozeClient(api_key="a", cache=ResponseCache(backend))
+        second = ClozeClient(api_key="b", cache=ResponseCache(backend))
+        backend._pid = 0
+        inherited = backend._conn
+
+        first._after_fork()
+        assert backend._conn is not inherited and backend._inherited == [inherited]
+        conn = backend._conn
+        second._after_fork()
+        assert backend._conn is conn
+
+        first.session.request = Mock(return_value=mock_response)
+        first.account.get_profile()
+        first.account.get_profile()
+        assert first.session.request.call_count == 1 and len(backend) == 1
+
+    def test_shared_adapter_reset_once(self, forked):
+        """Test that clients sharing a pool's adapter reset it once."""
+        pool = ClozeClientPool()
+        first, second = pool.client(api_key="a"), pool.client(api_key="b")
+        pool.adapter._pid = 0
+        first._after_fork()
+        manager = pool.adapter.poolmanager
+        second._after_fork()
+        assert pool.adapter.poolmanager is manager
+        assert first.session.get_adapter("https://api.cloze.com") is pool.adapter
+
+    def test_concurrency_slots_freed(self, forked):
+        """Test that a shared limiter forgets the parent's requests, once per process."""
+        limiter = ConcurrencyLimiter(initial_limit=2)
+        first = ClozeClient(api_key="a", concurrency_limiter=limiter)
+        second = ClozeClient(api_key="b", concurrency_limiter=limiter)
+        assert limiter.acquire(timeout=0) and limiter.acquire(timeout=0)
+        limiter._pid = 0
+
+        first._after_fork()
+        assert limiter.stats()["in_flight"] == 0
+        assert limiter.acquire(timeout=0)
+        second._after_fork()
+        assert limiter.stats()["in_flight"] == 1
+
+    def test_pool_slots_freed(self, forked):
+        """Test that pool tenants forget the parent's requests and share one condition."""
+        pool = ClozeClientPool(
+            pool_maxsize=2, max_in_flight_per_client=2, reserved_connections=0
+        )
+        first, second = pool.client(api_key="a"), pool.client(api_key="b")
+        a, b = first.concurrency_limiter, second.concurrency_limiter
+        assert a.acquire(timeout=0) and b.acquire(timeout=0)
+        slots, cond = pool._slots, pool._slots.cond
+        slots._pid = a._pid = b._pid = 0
+
+        first._after_fork()
+        second._after_fork()
+        assert slots.in_use == 0 and slots.cond is not cond
+        assert a._cond is b._cond is slots.cond
+        assert a.stats()["in_flight"] == b.stats()["in_flight"] == 0
+        assert a.acquire(timeout=0) and a.acquire(timeout=0)
+        assert not b.acquire(timeout=0)
+
+    def test_http2_session_rebuilt(self, forked):
+        """Test that the HTTP/2 client is replaced, keeping its headers."""
+        client = ClozeClient(api_key="test_key", http2=True)
+        session = client.session
+        client._after_fork()
+        assert client.session is not session
+        assert client.session.headers["Authorization"] == "Bearer test_key"
+
+    def test_async_session_rebuilt(self, forked):
+        """Test that the asyncio client replaces its httpx client."""
+        client = AsyncClozeClient(api_key="test_key", single_flight=True)
+        session, flights = client.session, client._flights
+        client._after_fork()
+        assert client.session is not session and client._flights is not flights
+        assert client.session.headers["Authorization"] == "Bearer test_key"
+        assert isinstance(client.session, httpx.AsyncClient)
+
+        client = AsyncClozeClient(api_key="test_key", http2=True)
+        client._after_fork()
+        assert client.session._transport._pool._http2
+
+
+class TestThreadSafety:
+    """Test one client shared by many threads."""
+
+    def test_concurrent_endpoint_calls(self, server):
+        """Test that threads sharing a client get their own results."""
+        url, ports = server
+        client = ClozeClient(api_key="test_key", base_url=url, pool_maxsize=8, pool_block=True)
+
+        def call(i):
+            return client.people.get(f"user{i}@example.com")["path"]
+
+        with ThreadPoolExecutor(16) as pool:
+            paths = list(pool.map(call, range(200)))
+
+        assert paths == [
+            f"/v1/people/get?identifier=user{i}%40example.com" for i in range(200)
+        ]
+        snapshot = client.metrics.snapshot()["requests"]["GET /v1/people/get"]
+        assert snapshot["count"] == 200
+
+        # One pool for the host, whose connections are reused: with a
+        # blocking pool it never opens more than pool_maxsize of them
+        pools = client._adapter.poolmanager.pools
+        assert len(pools) == 1
+        pool = pools[next(iter(pools.keys()))]
+        assert pool.num_connections <= 8
+        assert len(set(ports)) == pool.num_connections
+
+    def test_concurrent_cookie_updates(self, server):
+        """Test that threads storing cookies on one shared session do not interfere."""
+        url, ports = server
+        client = ClozeClient(api_key="test_key", base_url=url, pool_maxsize=8)
+
+        # A requests.Session keeps its cookies in an http.cookiejar.CookieJar,
+        # which takes its own lock in every method, and the adapter's urllib3
+        # pools hand each connection to one thread at a time
+        with ThreadPoolExecutor(16) as pool:
+            results = list(pool.map(lambda i: client.account.get_profile(), range(200)))
+
+        assert all(result["errorcode"] == 0 for result in results)
+        assert len(ports) == 200
+        assert list(client.session.cookies.keys()) == ["seen"]
+        assert 1 <= int(client.session.cookies["seen"]) <= 200
@@ -0,0 +1,224 @@
+"""Unit tests for client metrics."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from cloze_sdk import AsyncClozeClient, ClozeAPIError, ClozeClient, RateLimiter
+from cloze_sdk.metrics import ClientMetrics
+from cloze_sdk.retry import RetryPolicy
+
+
+class TestClientMetrics:
+    """Test ClientMetrics counters and timers."""
+
+    def test_counters_and_timers(self):
+        """Test that counters and timers accumulate."""
+        metrics = ClientMetrics()
+        metrics.increment("requests")
+        metrics.increment("requests", 2)
+        metrics.observe("decode", 0.25)
+        metrics.observe("decode", 0.5)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"] == {"requests": 3}
+        assert snapshot["timers"] == {"decode": {"count": 2, "total_seconds": 0.75}}
+
+    def test_reset(self):
+        """Test that reset clears all metrics."""
+        metrics = ClientMetrics()
+        metrics.increment("requests", endpoint="/v1/people/find")
+        metrics.observe("decode", 1.0)
+        metrics.reset()
+        assert metrics.snapshot() == {
+            "counters": {},
+            "endpoints": {},
+            "timers": {},
+            "requests": {},
+            "gauges": {},
+        }
+
+    def test_endpoint_counters(self):
+        """Test that counters can also be attributed to an endpoint."""
+        metrics = ClientMetrics()
+        metrics.increment("bytes", 10, endpoint="/v1/people/create")
+        metrics.increment("bytes", 5, endpoint="/v1/people/create")
+        metrics.increment("bytes", 1)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"] == {"bytes": 16}
+        assert snapshot["endpoints"] == {"/v1/people/create": {"bytes": 15}}
+
+    def test_thread_safety(self):
+        """Test that concurrent updates are not lost."""
+        metrics = ClientMetrics()
+
+        def worker():
+            for _ in range(1000):
+                metrics.increment("n")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert metrics.snapshot()["counters"]["n"] == 8000
+
+    def test_request_series(self):
+        """Test latency histograms, status and errorcode counts per request."""
+        metrics = ClientMetrics(buckets=(0.1, 1.0))
+        metrics.observe_request("GET", "/v1/people/get", 0.05, 200)
+        metrics.observe_request("GET", "/v1/people/get", 0.5, 503)
+        metrics.observe_request("GET", "/v1/people/get", 3.0)
+        metrics.increment_request("GET", "/v1/people/get", "retries", 2)
+        metrics.record_error("GET", "/v1/people/get", 7)
+
+        assert metrics.snapshot()["requests"] == {
+            "GET /v1/people/get": {
+                "count": 3,
+                "latency": {"buckets": {"0.1": 1, "1.0": 2, "+Inf": 3}, "sum": 3.55},
+                "status": {"200": 1, "503": 1, "error": 1},
+                "errorcodes": {"7": 1},
+                "retries": 2,
+            }
+        }
+
+    def test_exited_threads_retired(self):
+        """Test that shards of exited threads are folded and still counted."""
+        metrics = ClientMetrics()
+
+        def worker():
+            metrics.increment("n", endpoint="/v1/a")
+            metrics.observe("decode", 1.0)
+            metrics.observe_request("GET", "/v1/a", 0.01, 200)
+
+        for _ in range(3):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            metrics.snapshot()
+        worker()
+
+        snapshot = metrics.snapshot()
+        assert len(metrics._shards) == 1
+        assert snapshot["counters"] == {"n": 4}
+        assert snapshot["endpoints"] == {"/v1/a": {"n": 4}}
+        assert snapshot["timers"]["decode"] == {"count": 4, "total_seconds": 4.0}
+        assert snapshot["requests"]["GET /v1/a"]["status"] == {"200": 4}
+
+        metrics.reset()
+        assert metrics.snapshot()["counters"] == {}
+
+
+class TestPrometheus:
+    """Test Prometheus text rendering."""
+
+    def test_empty(self):
+        """Test that no metrics render as empty text."""
+        assert ClientMetrics().to_prometheus() == ""
+
+    def test_exposition(self):
+        """Test histogram, counter and summary families."""
+        metrics = ClientMetrics(buckets=(0.5,))
+        metrics.observe_request("GET", "/v1/people/get", 0.25, 200)
+        metrics.increment_request("GET", "/v1/people/get", "response_bytes", 120)
+        metrics.record_error("GET", "/v1/people/get", 2)
+        metrics.increment("cache.hits", 3, endpoint="/v1/people/get")
+        metrics.increment("cache.hits", 1)
+        metrics.increment("shared", endpoint="/v1/team/roles")
+        metrics.increment("plain", 0.5)
+        metrics.observe("decode", 0.25)
+
+        labels = 'method="GET",endpoint="/v1/people/get"'
+        assert metrics.to_prometheus(prefix="app").splitlines() == [
+            "# TYPE app_request_duration_seconds histogram",
+            f'app_request_duration_seconds_bucket{{{labels},le="0.5"}} 1',
+            f'app_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1',
+            f"app_request_duration_seconds_sum{{{labels}}} 0.25",
+            f"app_request_duration_seconds_count{{{labels}}} 1",
+            "# TYPE app_responses_total counter",
+            f'app_responses_total{{{labels},status="200"}} 1',
+            "# TYPE app_api_errors_total counter",
+            f'app_api_errors_total{{{labels},errorcode="2"}} 1',
+            "# TYPE app_response_bytes_total counter",
+            f"app_response_bytes_total{{{labels}}} 120",
+            "# TYPE app_cache_hits_total counter",
+            'app_cache_hits_total{endpoint="/v1/people/get"} 3',
+            "app_cache_hits_total 1",
+            "# TYPE app_plain_total counter",
+            "app_plain_total 0.5",
+            "# TYPE app_shared_total counter",
+            'app_shared_total{endpoint="/v1/team/roles"} 1',
+            "# TYPE app_decode_seconds summary",
+            "app_decode_seconds_sum 0.25",
+            "app_decode_seconds_count 1",
+        ]
+
+    def test_label_escaping(self):
+        """Test that quotes, backslashes and newlines in labels are escaped."""
+        metrics = ClientMetrics()
+        metrics.increment("n", endpoint='/v1/"a"\\b\n')
+        assert 'endpoint="/v1/\\"a\\"\\\\b\\n"' in metrics.to_prometheus()
+
+
+class TestClientRequestMetrics:
+    """Test per-request metrics recorded by the clients."""
+
+    def test_sizes_status_and_decode(self, mock_response):
+        """Test that a request records latency, status, sizes and decode time."""
+        client = ClozeClient(api_key="test_key")
+        mock_response.content = b'{"errorcode":0}'
+        mock_response.request = Mock(body="a=b")
+        client.session.request = Mock(return_value=mock_response)
+        client.people.get("a@example.com")
+
+        series = client.metrics.snapshot()["requests"]["GET /v1/people/get"]
+        assert series["count"] == 1 and series["status"] == {"200": 1}
+        assert (series["request_bytes"], series["response_bytes"]) == (3, 15)
+        assert series["decode_seconds"] >= 0
+
+    def test_errors_retries_and_rate_limits(self, mock_response):
+        """Test errorcode, retry, 429 and rate-limit wait counters."""
+        limiter = Mock(spec=RateLimiter)
+        limiter.reserve.return_value = 0.001
+        client = ClozeClient(
+            api_key="test_key",
+            rate_limiter=limiter,
+            retry_policy=RetryPolicy(max_attempts=2, backoff_base=0, jitter=False),
+        )
+        limited = Mock(status_code=429, headers={"Retry-After": "0"})
+        mock_response.json.return_value = {"errorcode": 5, "message": "Bad"}
+        client.session.request = Mock(side_effect=[limited, mock_response])
+        with patch("cloze_sdk.client.time.sleep"), pytest.raises(ClozeAPIError):
+            client.people.get("a@example.com")
+
+        series = client.metrics.snapshot()["requests"]["GET /v1/people/get"]
+        assert series["status"] == {"429": 1, "200": 1}
+        assert series["errorcodes"] == {"5": 1}
+        assert (series["retries"], series["rate_limited"], series["rate_limit_waits"]) == (
+            1,
+            1,
+            2,
+        )
+
+    def test_transport_errors(self):
+        """Test that failed attempts are recorded with an 'error' status."""
+        client = ClozeClient(api_key="test_key")
+        client.session.request = Mock(side_effect=requests.exceptions.ConnectionError())
+        with pytest.raises(ClozeAPIError):
+            client.account.get_profile()
+        series = client.metrics.snapshot()["requests"]["GET /v1/user/profile"]
+        assert series["status"] == {"error": 1}
+
+    def test_async_client(self):
+        """Test that the asyncio client records request bodies and responses."""
+        handler = Mock(return_value=httpx.Response(200, json={"errorcode": 0}))
+        client = AsyncClozeClient(api_key="test_key")
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        asyncio.run(client._make_request("POST", "/v1/people/create", json_data={"a": 1}))
+        series = client.metrics.snapshot()["requests"]["POST /v1/people/create"]
+        assert series["status"] == {"200": 1}
+        assert series["request_bytes"] > 0 and series["response_bytes"] > 0
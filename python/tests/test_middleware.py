@@ -0,0 +1,270 @@
+"""Unit tests for request middleware."""
+
+import asyncio
+
+import httpx
+import pytest
+from unittest.mock import Mock
+from cloze_sdk import (AsyncClozeClient, ClozeAPIError, ClozeClient, Middleware,
+                       RequestContext, ResponseCache)
+from cloze_sdk.middleware import current_request
+
+
+class Recorder(Middleware):
+    """Middleware recording the hooks it sees."""
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    def before_request(self, context):
+        self.log.append((self.name, "before", context.method, context.endpoint))
+
+    def after_response(self, context):
+        self.log.append((self.name, "after", context.result, context.elapsed >= 0))
+
+    def on_error(self, context):
+        self.log.append((self.name, "error", type(context.error).__name__))
+
+
+class TestRequestContext:
+    """Test the request context."""
+
+    def test_defaults(self):
+        """Test that a new context has no result, error or timing yet."""
+        context = RequestContext("GET", "/v1/user/profile")
+        assert context.params is None and context.body is None
+        assert context.elapsed is None and context.result is None
+        assert context.error is None and context.state == {}
+
+    def test_base_hooks_are_no_ops(self):
+        """Test that the base middleware hooks do nothing."""
+        context = RequestContext("GET", "/v1/user/profile")
+        middleware = Middleware()
+        middleware.before_request(context)
+        middleware.after_response(context)
+        middleware.on_error(context)
+
+
+class TestClientMiddleware:
+    """Test middleware in the synchronous client."""
+
+    @pytest.fixture
+    def client(self, mock_response):
+        """Create a client with a mocked session."""
+        client = ClozeClient(api_key="test_key")
+        client.session.request = Mock(return_value=mock_response)
+        return client
+
+    def test_hook_order(self, client):
+        """Test that middleware wrap the call in registration order."""
+        log = []
+        client.middleware = [Recorder("outer", log), Recorder("inner", log)]
+        result = client.account.get_profile()
+        assert log == [
+            ("outer", "before", "GET", "/v1/user/profile"),
+            ("inner", "before", "GET", "/v1/user/profile"),
+            ("inner", "after", result, True),
+            ("outer", "after", result, True),
+        ]
+
+    def test_on_error(self, client, mock_response):
+        """Test that errors reach on_error hooks and are re-raised."""
+        log = []
+        client.middleware.append(Recorder("only", log))
+        mock_response.json.return_value = {"errorcode": 1, "message": "Bad"}
+        with pytest.raises(ClozeAPIError):
+            client.account.get_profile()
+        assert log[-1] == ("only", "error", "ClozeAPIError")
+
+    def test_rewrites_request_and_result(self, client):
+        """Test that hooks may change params, body and result."""
+
+        class Rewrite(Middleware):
+            def before_request(self, context):
+                if context.params is not None:
+                    context.params = dict(context.params, extra="1")
+                if context.body is not None:
+                    context.body = dict(context.body, source="middleware")
+
+            def after_response(self, context):
+                context.result = dict(context.result, rewritten=True)
+
+        client.middleware.append(Rewrite())
+        assert client.people.get("a@example.com")["rewritten"] is True
+        assert client.session.request.call_args[1]["params"]["extra"] == "1"
+        client.people.create({"name": "A", "emails": [{"value": "a@example.com"}]})
+        assert client.session.request.call_args[1]["json"]["source"] == "middleware"
+
+    def test_form_body(self, client):
+        """Test that a form body is passed through as form data."""
+
+        class Tag(Middleware):
+            def before_request(self, context):
+                context.body = {"tag": "x"}
+
+        client.middleware.append(Tag())
+        client._make_request("POST", "/v1/example", data={"a": "b"})
+        assert client.session.request.call_args[1]["data"] == {"tag": "x"}
+
+    def test_sees_cache_hits(self, mock_response):
+        """Test that hooks run for responses served from the cache."""
+        client = ClozeClient(api_key="test_key", cache=ResponseCache())
+        client.session.request = Mock(return_value=mock_response)
+        log = []
+        client.middleware.append(Recorder("only", log))
+        client.account.get_profile()
+        client.account.get_profile()
+        assert [entry[1] for entry in log] == ["before", "after", "before", "after"]
+        assert client.session.request.call_count == 1
+
+    def test_current_request(self, client, mock_response):
+        """Test that the call in progress is visible to code it runs."""
+        seen = []
+
+        def request(**kwargs):
+            seen.append(current_request())
+            return mock_response
+
+        client.session.request = Mock(side_effect=request)
+        client.middleware.append(Middleware())
+        mock_response.content = b"{}"
+        client.account.get_profile()
+        assert seen[0].endpoint == "/v1/user/profile"
+        assert (seen[0].attempts, seen[0].status, seen[0].response_bytes) == (1, 200, 2)
+        assert current_request() is None
+
+    def test_streamed_call(self, client, mock_response):
+        """Test that hooks of a streamed call finish once the page is read."""
+        log = []
+        sizes = []
+
+        class Size(Middleware):
+            def after_response(self, context):
+                sizes.append((context.stream, context.response_bytes))
+
+        client.middleware = [Recorder("only", log), Size()]
+        mock_response.iter_content.return_value = [b'{"errorcode":0,', b'"people":[1]}']
+        page = client.people.feed(stream=True, segment="lead")
+        assert log == [("only", "before", "GET", "/v1/people/feed")]
+        assert list(page) == [1]
+        assert log[1] == ("only", "after", page, True)
+        assert sizes == [(True, 28)]
+        page.close()
+        assert len(log) == 2
+
+        mock_response.iter_content.return_value = [b'{"errorcode":3,"people":[]}']
+        with pytest.raises(ClozeAPIError):
+            list(client.people.feed(stream=True))
+        assert log[-1] == ("only", "error", "ClozeAPIError")
+
+        mock_response.status_code = 429
+        with pytest.raises(ClozeAPIError):
+            client.people.feed(stream=True)
+        assert log[-2:] == [
+            ("only", "before", "GET", "/v1/people/feed"),
+            ("only", "error", "ClozeRateLimitError"),
+        ]
+
+    def test_constructor_argument(self):
+        """Test that middleware can be passed to the constructor."""
+        middleware = Middleware()
+        assert ClozeClient(api_key="test_key", middleware=[middleware]).middleware == [
+            middleware
+        ]
+
+
+class TestAsyncClientMiddleware:
+    """Test middleware in the asyncio client."""
+
+    def test_sync_and_async_hooks(self):
+        """Test that plain and coroutine hooks both run."""
+        log = []
+
+        class AsyncRecorder(Middleware):
+            async def before_request(self, context):
+                await asyncio.sleep(0)
+                log.append("async-before")
+
+            async def on_error(self, context):
+                log.append("async-error")
+
+        def handler(request):
+            if request.url.path == "/v1/team/roles":
+                return httpx.Response(200, json={"errorcode": 0})
+            return httpx.Response(200, json={"errorcode": 2, "message": "Bad"})
+
+        client = AsyncClozeClient(
+            api_key="test_key", middleware=[AsyncRecorder(), Recorder("sync", log)]
+        )
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            await client.team.get_roles()
+            await client._make_request("POST", "/v1/team/roles", json_data={"a": 1})
+            with pytest.raises(ClozeAPIError):
+                await client.account.get_profile()
+
+        asyncio.run(run())
+        assert log == [
+            "async-before",
+            ("sync", "before", "GET", "/v1/team/roles"),
+            ("sync", "after", {"errorcode": 0}, True),
+            "async-before",
+            ("sync", "before", "POST", "/v1/team/roles"),
+            ("sync", "after", {"errorcode": 0}, True),
+            "async-before",
+            ("sync", "before", "GET", "/v1/user/profile"),
+            ("sync", "error", "ClozeAPIError"),
+            "async-error",
+        ]
+
+    def test_streamed_call(self):
+        """Test that hooks of an async streamed call finish once the page is read."""
+        log = []
+
+        class AsyncRecorder(Middleware):
+            async def after_response(self, context):
+                log.append(("async-after", context.response_bytes))
+
+        body = b'{"errorcode":0,"projects":[{"id":1}]}'
+        client = AsyncClozeClient(
+            api_key="test_key", middleware=[AsyncRecorder(), Recorder("sync", log)]
+        )
+        client.session = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        )
+
+        async def run():
+            page = await client.projects.find(stream=True)
+            assert len(log) == 1
+            return page, [record async for record in page]
+
+        page, records = asyncio.run(run())
+        assert records == [{"id": 1}]
+        assert log == [
+            ("sync", "before", "GET", "/v1/projects/find"),
+            ("sync", "after", page, True),
+            ("async-after", len(body)),
+        ]
+
+        client.session = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=b'{"errorcode":4}')
+            )
+        )
+
+        async def consume():
+            page = await client.projects.find(stream=True)
+            return [record async for record in page]
+
+        with pytest.raises(ClozeAPIError):
+            asyncio.run(consume())
+        assert log[-1] == ("sync", "error", "ClozeAPIError")
+
+        client.session = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(401))
+        )
+        with pytest.raises(ClozeAPIError):
+            asyncio.run(client.projects.find(stream=True))
+        assert log[-1] == ("sync", "error", "ClozeAuthenticationError")
@@ -0,0 +1,136 @@
+"""Unit tests for the multi-tenant client pool."""
+
+import threading
+import time
+
+import pytest
+from cloze_sdk import ClozeClient, ClozeClientPool, RateLimiter, RetryPolicy
+
+
+@pytest.fixture
+def server(local_server):
+    """Run a local JSON server recording each request's credential and connection."""
+    seen = []
+
+    def respond(request):
+        seen.append((request.headers["Authorization"], request.client_address[1]))
+        return 200, {"errorcode": 0}, {}
+
+    return local_server(respond), seen
+
+
+class TestClozeClientPool:
+    """Test per-credential clients over one connection pool."""
+
+    def test_one_client_per_credential(self):
+        """Test that clients are cached per credential and share the adapter."""
+        pool = ClozeClientPool(pool_maxsize=8)
+        first = pool.client(api_key="key-a")
+        assert pool.client(api_key="key-a") is first
+        second = pool.client(oauth_token="token-b")
+        assert len(pool) == 2
+
+        assert first.session is not second.session
+        assert first.session.get_adapter("https://api.cloze.com") is pool.adapter
+        assert second.session.get_adapter("http://localhost") is pool.adapter
+        assert first.session.headers["Authorization"] == "Bearer key-a"
+        assert second.session.headers["Authorization"] == "Bearer token-b"
+        assert first.metrics is not second.metrics
+        assert first.concurrency_limiter is not second.concurrency_limiter
+        assert first.concurrency_limiter.limit == 4
+
+    def test_shared_options(self):
+        """Test that the rate limiter and client options apply to every client."""
+        limiter = RateLimiter(rate=10)
+        policy = RetryPolicy()
+        pool = ClozeClientPool(
+            rate_limiter=limiter,
+            max_in_flight_per_client=2,
+            base_url="https://example.test",
+            retry_policy=policy,
+        )
+        first, second = pool.client(api_key="a"), pool.client(api_key="b")
+        assert first.rate_limiter is second.rate_limiter is limiter
+        assert first._credential_key != second._credential_key
+        assert (first.base_url, first.retry_policy) == ("https://example.test", policy)
+        assert second.concurrency_limiter.limit == 2
+
+    def test_rejects_managed_options(self):
+        """Test that options the pool manages cannot be overridden per client."""
+        for option in ({"adapter": None}, {"concurrency_limiter": None}, {"http2": True}):
+            with pytest.raises(ValueError, match=next(iter(option))):
+                ClozeClientPool(**option)
+        with pytest.raises(ValueError):
+            ClozeClientPool(pool_maxsize=4, reserved_connections=4)
+
+    def test_fixed_cap_leaves_connections_for_others(self):
+        """Test that busy tenants cannot take the connections an idle tenant needs."""
+        pool = ClozeClientPool(pool_maxsize=4)
+        assert pool.reserved_connections == 1
+        a, b, c = (pool.client(api_key=key).concurrency_limiter for key in "abc")
+        assert a.acquire(timeout=0) and a.acquire(timeout=0)
+        assert not a.acquire(timeout=0)
+        # A second request for b would leave nothing for tenants without one
+        assert b.acquire(timeout=0) and not b.acquire(timeout=0)
+        assert c.acquire(timeout=0)
+
+        # 429s and slow responses do not move a tenant's cap
+        started = time.monotonic()
+        a.release("/v1/people/get", started, rate_limited=True)
+        a.release("/v1/people/get", started, 30.0)
+        assert a.limit == 2 and a.stats()["decreases"] == 0
+
+    def test_waiting_tenant_woken_by_another(self):
+        """Test that a connection freed by one tenant wakes another's waiting request."""
+        pool = ClozeClientPool(
+            pool_maxsize=2, max_in_flight_per_client=2, reserved_connections=0
+        )
+        a, b = (pool.client(api_key=key).concurrency_limiter for key in "ab")
+        assert a.acquire() and a.acquire(timeout=0)
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(b.acquire(5)))
+        waiter.start()
+        time.sleep(0.05)
+        a.release("/v1/people/get", time.monotonic())
+        waiter.join()
+        assert acquired == [True]
+
+    def test_missing_credential(self):
+        """Test that a credential is required."""
+        with pytest.raises(ValueError):
+            ClozeClientPool().client()
+
+    def test_remove_and_close(self):
+        """Test dropping one client and closing the pool."""
+        pool = ClozeClientPool()
+        pool.client(api_key="a")
+        pool.client(api_key="b")
+        assert pool.remove(api_key="a") and not pool.remove(api_key="a")
+        assert pool.stats()["clients"] == 1
+        pool.close()
+        assert len(pool) == 0
+
+    def test_connections_shared_between_tenants(self, server):
+        """Test that tenants reuse each other's connections with their own auth."""
+        url, seen = server
+        pool = ClozeClientPool(pool_maxsize=1, base_url=url)
+        for api_key in ("tenant-1", "tenant-2", "tenant-1"):
+            pool.client(api_key=api_key).account.get_profile()
+
+        assert [auth for auth, _ in seen] == [
+            "Bearer tenant-1",
+            "Bearer tenant-2",
+            "Bearer tenant-1",
+        ]
+        assert len({port for _, port in seen}) == 1
+        stats = pool.stats()
+        assert (stats["clients"], stats["pool_maxsize"], stats["saturated"]) == (2, 1, 0)
+        assert pool.client(api_key="tenant-2").metrics.snapshot()["requests"][
+            "GET /v1/user/profile"
+        ]["count"] == 1
+
+    def test_adapter_argument(self):
+        """Test that a ClozeClient can be given an adapter to share."""
+        pool = ClozeClientPool()
+        client = ClozeClient(api_key="a", adapter=pool.adapter)
+        assert client.pool_stats() == pool.adapter.stats()
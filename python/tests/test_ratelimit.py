@@ -0,0 +1,148 @@
+"""Unit tests for client-side rate limiting."""
+
+import threading
+
+import pytest
+from unittest.mock import Mock, patch
+from cloze_sdk import ClozeClient, FileRateLimiter, RateLimiter
+from cloze_sdk.ratelimit import DEFAULT_GROUP
+
+
+class TestRateLimiter:
+    """Test the in-process token bucket."""
+
+    def test_invalid_rate(self):
+        """Test that the rate must be positive."""
+        with pytest.raises(ValueError, match="rate must be positive"):
+            RateLimiter(rate=0)
+
+    def test_default_burst(self):
+        """Test default burst sizing."""
+        assert RateLimiter(rate=5).burst == 5
+        assert RateLimiter(rate=0.5).burst == 1.0
+
+    def test_group_resolution_prefers_longest_prefix(self):
+        """Test that the most specific group prefix wins."""
+        limiter = RateLimiter(
+            rate=10,
+            groups={"/v1/analytics": (1, 1), "/v1/analytics/team": (2, 2)},
+        )
+        assert limiter.group_for("/v1/analytics/activity") == "/v1/analytics"
+        assert limiter.group_for("/v1/analytics/team/activity") == "/v1/analytics/team"
+        assert limiter.group_for("/v1/people/get") == DEFAULT_GROUP
+        assert limiter.limits_for("/v1/analytics") == (1, 1)
+        assert limiter.limits_for(DEFAULT_GROUP) == (10, 10)
+
+    @patch("cloze_sdk.ratelimit.time.monotonic", return_value=100.0)
+    def test_reserve_paces_after_burst(self, mock_clock):
+        """Test that reservations queue once the burst is spent."""
+        limiter = RateLimiter(rate=2, burst=2)
+        waits = [limiter.reserve("cred", "/v1/people/get") for _ in range(4)]
+        assert waits == [0.0, 0.0, 0.5, 1.0]
+
+    @patch("cloze_sdk.ratelimit.time.monotonic")
+    def test_bucket_refills_over_time(self, mock_clock):
+        """Test that tokens refill at the configured rate."""
+        limiter = RateLimiter(rate=1, burst=1)
+        mock_clock.return_value = 0.0
+        assert limiter.reserve("cred", "/v1/people/get") == 0.0
+        assert limiter.reserve("cred", "/v1/people/get") == 1.0
+        mock_clock.return_value = 10.0
+        assert limiter.reserve("cred", "/v1/people/get") == 0.0
+
+    @patch("cloze_sdk.ratelimit.time.monotonic", return_value=0.0)
+    def test_wait_beyond_max_not_reserved(self, mock_clock):
+        """Test that a token due after max_wait is left in the bucket."""
+        limiter = RateLimiter(rate=1, burst=1)
+        assert limiter.reserve("cred", "/v1/x", max_wait=0) == 0.0
+        assert limiter.reserve("cred", "/v1/x", max_wait=1.0) == 1.0
+        assert limiter.reserve("cred", "/v1/x", max_wait=1.5) == 1.0
+        assert limiter.reserve("cred", "/v1/x") == 2.0
+
+    @patch("cloze_sdk.ratelimit.time.monotonic", return_value=0.0)
+    def test_budgets_are_separate(self, mock_clock):
+        """Test separate budgets per credential and per group."""
+        limiter = RateLimiter(rate=1, burst=1, groups={"/v1/analytics": (1, 1)})
+        assert limiter.reserve("a", "/v1/people/get") == 0.0
+        assert limiter.reserve("b", "/v1/people/get") == 0.0
+        assert limiter.reserve("a", "/v1/analytics/activity") == 0.0
+        assert limiter.reserve("a", "/v1/people/get") == 1.0
+
+    @patch("cloze_sdk.ratelimit.time.sleep")
+    def test_acquire_sleeps_when_needed(self, mock_sleep):
+        """Test that acquire blocks for the reserved wait."""
+        limiter = RateLimiter(rate=1, burst=1)
+        with patch.object(limiter, "reserve", side_effect=[0.0, 0.75]):
+            assert limiter.acquire("cred", "/v1/x") == 0.0
+            assert limiter.acquire("cred", "/v1/x") == 0.75
+        mock_sleep.assert_called_once_with(0.75)
+
+    def test_thread_safety(self):
+        """Test that concurrent reservations never over-issue tokens."""
+        limiter = RateLimiter(rate=0.001, burst=50)
+        waits = []
+
+        def worker():
+            for _ in range(10):
+                waits.append(limiter.reserve("cred", "/v1/x"))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sum(1 for w in waits if w == 0.0) == 50
+
+
+class TestFileRateLimiter:
+    """Test the file-backed, process-shared token bucket."""
+
+    @patch("cloze_sdk.ratelimit.time.time", return_value=1000.0)
+    def test_instances_share_budget(self, mock_clock, tmp_path):
+        """Test that limiters on the same file share one budget."""
+        path = str(tmp_path / "limits.json")
+        first = FileRateLimiter(path, rate=1, burst=2)
+        second = FileRateLimiter(path, rate=1, burst=2)
+
+        assert first.reserve("cred", "/v1/people/get") == 0.0
+        assert second.reserve("cred", "/v1/people/get") == 0.0
+        assert first.reserve("cred", "/v1/people/get") == 1.0
+        assert second.reserve("other", "/v1/people/get") == 0.0
+        # A declined token leaves the shared state as it was
+        assert second.reserve("cred", "/v1/people/get", max_wait=1.0) == 2.0
+        assert first.reserve("cred", "/v1/people/get") == 2.0
+
+    @patch("cloze_sdk.ratelimit.time.time", return_value=1000.0)
+    def test_corrupt_state_is_reset(self, mock_clock, tmp_path):
+        """Test that an unreadable state file starts a fresh budget."""
+        path = tmp_path / "limits.json"
+        path.write_text("{not json")
+        limiter = FileRateLimiter(str(path), rate=1, burst=1)
+        assert limiter.reserve("cred", "/v1/x") == 0.0
+        assert limiter.reserve("cred", "/v1/x") == 1.0
+
+
+class TestClientRateLimiting:
+    """Test rate limiter integration in ClozeClient."""
+
+    def test_limiter_called_before_each_request(self, mock_response):
+        """Test that the limiter is consulted with a hashed credential key."""
+        limiter = Mock()
+        limiter.reserve.return_value = 0.0
+        client = ClozeClient(api_key="secret_key", rate_limiter=limiter)
+        client.session.request = Mock(return_value=mock_response)
+
+        client._make_request("GET", "/v1/people/get")
+
+        credential, endpoint, max_wait = limiter.reserve.call_args[0]
+        assert endpoint == "/v1/people/get" and max_wait is None
+        assert "secret_key" not in credential
+        assert len(credential) == 16
+
+    def test_credentials_get_distinct_keys(self):
+        """Test that different credentials map to different budgets."""
+        first = ClozeClient(api_key="one")
+        second = ClozeClient(api_key="two")
+        assert first._credential_key != second._credential_key
+        assert first.rate_limiter is None
@@ -0,0 +1,195 @@
+"""Unit tests for request debug logging."""
+
+import asyncio
+import logging
+
+import httpx
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from cloze_sdk import (AsyncClozeClient, ClozeAPIError, ClozeClient,
+                       RequestLogger, RetryPolicy)
+from cloze_sdk.request_log import REDACTED
+
+
+def records(caplog):
+    """Get the structured records logged by the SDK."""
+    return [record.cloze for record in caplog.records if record.name == "cloze_sdk"]
+
+
+class TestRequestLogger:
+    """Test sampling, redaction and body capture."""
+
+    def test_validation(self):
+        """Test that an out-of-range sample rate is rejected."""
+        with pytest.raises(ValueError):
+            RequestLogger(sample_rate=1.5)
+
+    def test_sample(self, caplog):
+        """Test that requests are only sampled when the level is enabled."""
+        logger = RequestLogger()
+        assert not logger.sample()
+        caplog.set_level(logging.DEBUG, logger="cloze_sdk")
+        assert logger.sample()
+        assert not RequestLogger(sample_rate=0.0).sample()
+        with patch("cloze_sdk.request_log.random.random", return_value=0.2):
+            assert RequestLogger(sample_rate=0.25).sample()
+            assert not RequestLogger(sample_rate=0.1).sample()
+
+    def test_record(self, caplog):
+        """Test the summary message and the redacted structured record."""
+        caplog.set_level(logging.DEBUG, logger="cloze_sdk")
+        response = Mock(
+            status_code=200,
+            headers={"Set-Cookie": "session=1", "Content-Type": "application/json"},
+            content=b'{"errorcode":11,"message":"Invalid person"}',
+        )
+        RequestLogger(max_body_bytes=16).log_attempt(
+            {
+                "method": "POST",
+                "url": "https://api.cloze.com/v1/people/create",
+                "params": {"api_key": "secret", "team": "1"},
+                "json": {"person": {"name": "Rhea Bhatia"}},
+            },
+            {"Authorization": "Bearer secret", "Accept": "application/json"},
+            2,
+            0.0125,
+            response=response,
+        )
+
+        assert caplog.records[0].getMessage() == (
+            "cloze POST https://api.cloze.com/v1/people/create attempt 2 -> 200 in 12.5 ms"
+        )
+        assert records(caplog) == [
+            {
+                "method": "POST",
+                "url": "https://api.cloze.com/v1/people/create",
+                "params": {"api_key": REDACTED, "team": "1"},
+                "request_headers": {"Authorization": REDACTED, "Accept": "application/json"},
+                "request_body": '{"person": {"nam... (19 more)',
+                "attempt": 2,
+                "elapsed_ms": 12.5,
+                "status": 200,
+                "response_headers": {"Set-Cookie": REDACTED, "Content-Type": "application/json"},
+                "response_body": '{"errorcode":11,... (27 more)',
+            }
+        ]
+
+    def test_error_and_url_redacted(self, caplog):
+        """Test that redacted parameters are scrubbed from URLs and error messages."""
+        caplog.set_level(logging.DEBUG, logger="cloze_sdk")
+        error = requests.exceptions.ConnectionError(
+            "Max retries exceeded with url: /v1/people/get?api_key=secret&team=1 "
+            "(Caused by NewConnectionError('refused'))"
+        )
+        request = {"method": "GET", "url": "https://api.cloze.com/v1/people/get?api_key=secret"}
+        RequestLogger().log_attempt(request, {}, 1, 0.01, error=error)
+        RequestLogger(redact_params=()).log_attempt(request, {}, 1, 0.01, error=error)
+
+        redacted, kept = records(caplog)
+        assert redacted["url"] == f"https://api.cloze.com/v1/people/get?api_key={REDACTED}"
+        assert redacted["error"] == (
+            f"ConnectionError: Max retries exceeded with url: /v1/people/get?api_key={REDACTED}"
+            "&team=1 (Caused by NewConnectionError('refused'))"
+        )
+        assert "secret" not in caplog.records[0].getMessage()
+        assert "api_key=secret" in kept["error"]
+
+    def test_request_bodies(self):
+        """Test how encoded, compressed, form and absent bodies are rendered."""
+        logger = RequestLogger()
+        body = logger._request_body
+        assert body({"content": b'{"a":1}'}, {}) == '{"a":1}'
+        assert body({"data": b"\x1f\x8b..."}, {"Content-Encoding": "gzip"}) == "<5 bytes gzip>"
+        assert body({"data": {"name": "A"}}, {}) == '{"name": "A"}'
+        assert body({"data": "a=1"}, {}) == "a=1"
+        assert body({}, {}) is None
+
+
+class TestClientLogging:
+    """Test request logging in the synchronous client."""
+
+    def test_disabled_logger_skips_work(self, mock_response):
+        """Test that nothing is rendered when the logger is not enabled."""
+        request_logger = RequestLogger(logger=logging.getLogger("cloze_sdk.disabled"))
+        request_logger.logger.setLevel(logging.WARNING)
+        request_logger.log_attempt = Mock()
+        client = ClozeClient(api_key="test_key", request_logger=request_logger)
+        client.session.request = Mock(return_value=mock_response)
+        client.account.get_profile()
+        request_logger.log_attempt.assert_not_called()
+
+    def test_logs_each_attempt(self, caplog, mock_response):
+        """Test that every attempt of a retried request is logged."""
+        caplog.set_level(logging.DEBUG, logger="cloze_sdk")
+        client = ClozeClient(
+            api_key="test_key",
+            request_logger=RequestLogger(),
+            retry_policy=RetryPolicy(backoff_base=0, jitter=False, retry_methods=["POST"]),
+        )
+        mock_response.content = b'{"errorcode":0}'
+        client.session.request = Mock(
+            side_effect=[requests.exceptions.ConnectionError("reset"), mock_response]
+        )
+        client.people.create({"name": "A", "emails": [{"value": "a@example.com"}]})
+
+        first, second = records(caplog)
+        assert first["error"] == "ConnectionError: reset" and "status" not in first
+        assert first["request_headers"]["Authorization"] == REDACTED
+        assert '"a@example.com"' in first["request_body"]
+        assert (second["attempt"], second["status"]) == (2, 200)
+        assert second["response_body"] == '{"errorcode":0}'
+
+    def test_transport_error_redacted(self, caplog):
+        """Test that a failed connection's error does not log the api_key parameter."""
+        caplog.set_level(logging.DEBUG, logger="cloze_sdk")
+        client = ClozeClient(
+            api_key="SECRETKEY", base_url="http://127.0.0.1:1", request_logger=RequestLogger()
+        )
+        with pytest.raises(ClozeAPIError):
+            client._make_request("GET", "/v1/user/profile", use_api_key_param=True)
+
+        record = records(caplog)[0]
+        assert record["error"].startswith("ConnectionError: ")
+        assert f"api_key={REDACTED}" in record["error"]
+        assert "SECRETKEY" not in str(record)
+        assert "SECRETKEY" not in caplog.records[0].getMessage()
+
+    def test_streamed_body_not_read(self, caplog, mock_response):
+        """Test that streamed responses are logged without their body."""
+        caplog.set_level(logging.DEBUG, logger="cloze_sdk")
+        client = ClozeClient(api_key="test_key", request_logger=RequestLogger())
+        mock_response.content = b"{}"
+        client.session.request = Mock(return_value=mock_response)
+        client._stream_request("GET", "/v1/people/feed")
+        assert "response_body" not in records(caplog)[0]
+
+
+class TestAsyncClientLogging:
+    """Test request logging in the asyncio client."""
+
+    def test_logs_attempts(self, caplog):
+        """Test that async attempts, including failures, are logged."""
+        caplog.set_level(logging.DEBUG, logger="cloze_sdk")
+        outcomes = [httpx.ConnectError("refused"), httpx.Response(200, json={"errorcode": 0})]
+
+        def handler(request):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        client = AsyncClozeClient(
+            api_key="test_key",
+            request_logger=RequestLogger(),
+            retry_policy=RetryPolicy(backoff_base=0, jitter=False),
+        )
+        client.session = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), headers=client._default_headers()
+        )
+        asyncio.run(client.team.get_roles())
+
+        first, second = records(caplog)
+        assert first["error"] == "ConnectError: refused"
+        assert second["request_headers"]["authorization"] == REDACTED
+        assert second["response_body"] == '{"errorcode":0}'
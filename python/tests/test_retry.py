@@ -0,0 +1,235 @@
+"""Unit tests for the retry policy."""
+
+import pytest
+from unittest.mock import Mock, patch
+from cloze_sdk import ClozeClient, RetryPolicy
+from cloze_sdk.exceptions import ClozeAPIError, ClozeRateLimitError
+from cloze_sdk.retry import parse_retry_after, transport_exceptions
+import requests
+import sys
+
+
+def make_response(status_code, headers=None, body=None):
+    """Create a mock response with the given status and headers."""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = body if body is not None else {"errorcode": 0}
+    return response
+
+
+class TestParseRetryAfter:
+    """Test Retry-After and rate-limit header parsing."""
+
+    def test_no_headers(self):
+        """Test that missing headers yield None."""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after({}) is None
+
+    def test_retry_after_seconds(self):
+        """Test Retry-After given in seconds."""
+        assert parse_retry_after({"Retry-After": "7"}) == 7.0
+
+    def test_retry_after_negative_clamped(self):
+        """Test that negative delays are clamped to zero."""
+        assert parse_retry_after({"Retry-After": "-3"}) == 0.0
+
+    def test_retry_after_http_date(self):
+        """Test Retry-After given as an HTTP date."""
+        headers = {"Retry-After": "Wed, 21 Oct 2015 07:28:10 GMT"}
+        assert parse_retry_after(headers, now=1445412480.0) == 10.0
+
+    def test_retry_after_invalid_falls_through(self):
+        """Test that an unparseable Retry-After falls back to reset headers."""
+        headers = {"Retry-After": "soon", "X-RateLimit-Reset": "4"}
+        assert parse_retry_after(headers) == 4.0
+
+    def test_ratelimit_reset_epoch(self):
+        """Test X-RateLimit-Reset given as epoch seconds."""
+        headers = {"X-RateLimit-Reset": "1700000012"}
+        assert parse_retry_after(headers, now=1700000000.0) == 12.0
+
+    def test_ratelimit_reset_invalid_skipped(self):
+        """Test that invalid reset headers are skipped."""
+        headers = {"RateLimit-Reset": "x", "X-RateLimit-Reset": "2"}
+        assert parse_retry_after(headers) == 2.0
+
+    def test_non_string_headers_ignored(self):
+        """Test that non-string header values are ignored."""
+        headers = Mock()
+        assert parse_retry_after(headers) is None
+
+
+class TestRetryPolicy:
+    """Test RetryPolicy decisions."""
+
+    def test_invalid_max_attempts(self):
+        """Test that max_attempts must be positive."""
+        with pytest.raises(ValueError, match="max_attempts"):
+            RetryPolicy(max_attempts=0)
+
+    def test_backoff_without_jitter(self):
+        """Test exponential backoff growth and cap."""
+        policy = RetryPolicy(backoff_base=1.0, backoff_cap=5.0, jitter=False)
+        assert policy.backoff(1) == 1.0
+        assert policy.backoff(2) == 2.0
+        assert policy.backoff(3) == 4.0
+        assert policy.backoff(4) == 5.0
+
+    def test_backoff_with_full_jitter(self):
+        """Test that full jitter stays within the backoff window."""
+        policy = RetryPolicy(backoff_base=1.0, backoff_cap=5.0)
+        for _ in range(50):
+            assert 0 <= policy.backoff(3) <= 4.0
+
+    def test_should_retry_exception(self):
+        """Test exception retry decisions."""
+        policy = RetryPolicy(max_attempts=2)
+        error = requests.exceptions.ConnectionError("boom")
+        assert policy.should_retry_exception("GET", error, 1)
+        assert not policy.should_retry_exception("GET", error, 2)
+        assert not policy.should_retry_exception("POST", error, 1)
+        assert not policy.should_retry_exception(
+            "GET", requests.exceptions.InvalidURL("bad"), 1
+        )
+
+    def test_transport_exceptions_follow_imported_libraries(self):
+        """Test that only exceptions of already imported HTTP libraries are used."""
+        assert requests.exceptions.Timeout in transport_exceptions()
+        with patch.dict(sys.modules, {"requests": None, "httpx": None}):
+            assert transport_exceptions() == ()
+
+    def test_should_retry_response(self):
+        """Test status retry decisions."""
+        policy = RetryPolicy(max_attempts=2)
+        assert policy.should_retry_response("GET", make_response(503), 1)
+        assert policy.should_retry_response("POST", make_response(429), 1)
+        assert not policy.should_retry_response("POST", make_response(503), 1)
+        assert not policy.should_retry_response("GET", make_response(200), 1)
+        assert not policy.should_retry_response("GET", make_response(503), 2)
+
+    def test_custom_configuration(self):
+        """Test custom status codes, exceptions and methods."""
+        policy = RetryPolicy(
+            retry_on_status=[408],
+            retry_on_exceptions=[requests.exceptions.InvalidURL],
+            retry_methods=["post"],
+        )
+        assert policy.should_retry_response("POST", make_response(408), 1)
+        assert not policy.should_retry_response("GET", make_response(503), 1)
+        assert policy.should_retry_exception(
+            "POST", requests.exceptions.InvalidURL("bad"), 1
+        )
+
+    def test_delay_honors_retry_after(self):
+        """Test that Retry-After overrides computed backoff."""
+        policy = RetryPolicy()
+        assert policy.delay_for_response(make_response(429, {"Retry-After": "3"}), 1) == 3.0
+
+    def test_delay_gives_up_on_long_retry_after(self):
+        """Test that an excessive Retry-After aborts the retry."""
+        policy = RetryPolicy(max_retry_after=10)
+        assert policy.delay_for_response(make_response(429, {"Retry-After": "60"}), 1) is None
+
+    def test_delay_ignores_retry_after_when_disabled(self):
+        """Test that Retry-After can be ignored."""
+        policy = RetryPolicy(respect_retry_after=False, jitter=False, backoff_base=2.0)
+        assert policy.delay_for_response(make_response(429, {"Retry-After": "60"}), 1) == 2.0
+
+    def test_delay_falls_back_to_backoff(self):
+        """Test backoff is used when no header is present."""
+        policy = RetryPolicy(jitter=False, backoff_base=0.25)
+        assert policy.delay_for_response(make_response(503), 2) == 0.5
+
+
+class TestClientRetries:
+    """Test retry behavior in ClozeClient._make_request."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a client with a retry policy."""
+        client = ClozeClient(
+            api_key="test_key",
+            retry_policy=RetryPolicy(max_attempts=3, jitter=False, backoff_base=0.1),
+        )
+        client.session.request = Mock()
+        return client
+
+    def test_default_client_has_no_retries(self):
+        """Test that retries are disabled by default."""
+        client = ClozeClient(api_key="test_key")
+        client.session.request = Mock(return_value=make_response(503))
+        client._make_request("GET", "/v1/user/profile")
+        assert client.retry_policy is None
+        assert client.session.request.call_count == 1
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_retries_rate_limit_then_succeeds(self, mock_sleep, client):
+        """Test that a 429 is retried honoring Retry-After."""
+        limited = make_response(429, {"Retry-After": "2"})
+        client.session.request.side_effect = [limited, make_response(200)]
+
+        result = client._make_request("POST", "/v1/people/create", json_data={"a": 1})
+
+        assert result == {"errorcode": 0}
+        assert client.session.request.call_count == 2
+        limited.close.assert_called_once()
+        mock_sleep.assert_called_once_with(2.0)
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_rate_limit_exhausted_raises(self, mock_sleep, client):
+        """Test that ClozeRateLimitError is raised once attempts run out."""
+        client.session.request.return_value = make_response(429, {"Retry-After": "1"})
+
+        with pytest.raises(ClozeRateLimitError) as exc_info:
+            client._make_request("GET", "/v1/user/profile")
+
+        assert client.session.request.call_count == 3
+        assert mock_sleep.call_count == 2
+        assert exc_info.value.retry_after == 1.0
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_long_retry_after_raises_immediately(self, mock_sleep, client):
+        """Test that a Retry-After beyond the limit is not waited on."""
+        client.session.request.return_value = make_response(429, {"Retry-After": "3600"})
+
+        with pytest.raises(ClozeRateLimitError):
+            client._make_request("GET", "/v1/user/profile")
+
+        assert client.session.request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_retries_transport_errors(self, mock_sleep, client):
+        """Test that connection errors are retried with backoff."""
+        client.session.request.side_effect = [
+            requests.exceptions.ConnectionError("reset"),
+            requests.exceptions.Timeout("slow"),
+            make_response(200),
+        ]
+
+        assert client._make_request("GET", "/v1/user/profile") == {"errorcode": 0}
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.1, 0.2]
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_transport_error_exhausted_raises(self, mock_sleep, client):
+        """Test that persistent transport errors become ClozeAPIError."""
+        client.session.request.side_effect = requests.exceptions.ConnectionError("down")
+
+        with pytest.raises(ClozeAPIError, match="Request failed"):
+            client._make_request("GET", "/v1/user/profile")
+
+        assert client.session.request.call_count == 3
+
+    @patch("cloze_sdk.client.time.sleep")
+    def test_post_not_retried_on_server_error(self, mock_sleep, client):
+        """Test that non-idempotent requests are not retried on 5xx."""
+        client.session.request.return_value = make_response(
+            500, body={"errorcode": 1, "message": "boom"}
+        )
+
+        with pytest.raises(ClozeAPIError, match="boom"):
+            client._make_request("POST", "/v1/people/create", json_data={"a": 1})
+
+        assert client.session.request.call_count == 1
+        mock_sleep.assert_not_called()
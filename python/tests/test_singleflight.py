@@ -0,0 +1,269 @@
+"""Unit tests for single-flight request coalescing."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from unittest.mock import Mock
+from cloze_sdk import AsyncClozeClient, ClozeClient, ClozeTimeoutError, deadline
+from cloze_sdk.exceptions import ClozeAPIError
+from cloze_sdk.singleflight import AsyncSingleFlight, SingleFlight, request_key
+
+
+class TestRequestKey:
+    """Test request key normalization."""
+
+    def test_param_order_ignored(self):
+        """Test that parameter order does not change the key."""
+        first = request_key("get", "/v1/people/get", {"a": 1, "b": "x"})
+        second = request_key("GET", "/v1/people/get", {"b": "x", "a": 1})
+        assert first == second
+
+    def test_distinct_requests(self):
+        """Test that endpoints and parameter values are distinguished."""
+        assert request_key("GET", "/v1/a", None) == request_key("GET", "/v1/a", {})
+        assert request_key("GET", "/v1/a", {"x": 1}) != request_key("GET", "/v1/a", {"x": 2})
+        assert request_key("GET", "/v1/a", {}) != request_key("GET", "/v1/b", {})
+
+
+class TestSingleFlight:
+    """Test thread single-flight."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers arriving during a call wait for its result."""
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"value": 1}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flights.do("k", fn)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(flights.do("k", fn)))
+            for _ in range(4)
+        ]
+        for t in followers:
+            t.start()
+        while len(flights._calls["k"].done._cond._waiters) < 4:
+            pass
+        release.set()
+        for t in [leader] + followers:
+            t.join()
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False] + [True] * 4
+        assert all(result is results[0][0] for result, _ in results)
+        assert flights._calls == {}
+
+    def test_error_shared(self):
+        """Test that waiting callers receive the leader's exception."""
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def fn():
+            started.set()
+            release.wait(5)
+            raise ClozeAPIError("boom")
+
+        def call():
+            try:
+                flights.do("k", fn)
+            except ClozeAPIError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=call)
+        follower.start()
+        while not flights._calls["k"].done._cond._waiters:
+            pass
+        release.set()
+        leader.join()
+        follower.join()
+        assert len(errors) == 2 and errors[0] is errors[1]
+
+    def test_waiter_timeout(self):
+        """Test that a waiting caller gives up when its timeout expires."""
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fn():
+            started.set()
+            release.wait(5)
+
+        leader = threading.Thread(target=flights.do, args=("k", fn))
+        leader.start()
+        started.wait(5)
+        with pytest.raises(ClozeTimeoutError):
+            flights.do("k", fn, timeout=0.01)
+        release.set()
+        leader.join()
+
+    def test_sequential_calls_not_shared(self):
+        """Test that results are not remembered after a call completes."""
+        flights = SingleFlight()
+        fn = Mock(side_effect=[1, 2])
+        assert flights.do("k", fn) == (1, False)
+        assert flights.do("k", fn) == (2, False)
+
+
+class TestAsyncSingleFlight:
+    """Test asyncio single-flight."""
+
+    def test_concurrent_tasks_share_one_call(self):
+        """Test that concurrent tasks share one awaited call."""
+        flights = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": 1}
+
+        async def run():
+            return await asyncio.gather(*(flights.do("k", fn) for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert [shared for _, shared in results] == [False] + [True] * 4
+        assert all(result is results[0][0] for result, _ in results)
+
+    def test_error_shared(self):
+        """Test that waiting tasks receive the leader's exception."""
+        flights = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ClozeAPIError("boom")
+
+        async def run():
+            return await asyncio.gather(
+                flights.do("k", fn), flights.do("k", fn), return_exceptions=True
+            )
+
+        first, second = asyncio.run(run())
+        assert isinstance(first, ClozeAPIError) and first is second
+
+    def test_leader_cancelled(self):
+        """Test that cancelling the leader hands the call to a waiter."""
+        flights = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return len(calls)
+
+        async def run():
+            leader = asyncio.ensure_future(flights.do("k", fn))
+            await asyncio.sleep(0)
+            waiters = [asyncio.ensure_future(flights.do("k", fn)) for _ in range(2)]
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await asyncio.gather(leader, *waiters, return_exceptions=True)
+
+        leader, first, second = asyncio.run(run())
+        assert isinstance(leader, asyncio.CancelledError)
+        assert (first, second) == ((2, False), (2, True))
+        assert len(calls) == 2
+
+    def test_waiter_timeout(self):
+        """Test that a waiting task gives up without cancelling the call."""
+        flights = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def run():
+            leader = asyncio.ensure_future(flights.do("k", fn))
+            await asyncio.sleep(0)
+            with pytest.raises(ClozeTimeoutError):
+                await flights.do("k", fn, timeout=0.001)
+            return await leader
+
+        assert asyncio.run(run()) == ("done", False)
+
+
+class TestClientSingleFlight:
+    """Test single-flight in the clients."""
+
+    def test_disabled_by_default(self):
+        """Test that single-flight is opt-in."""
+        assert ClozeClient(api_key="test_key")._flights is None
+
+    def test_concurrent_gets_share_one_request(self, mock_response):
+        """Test that concurrent identical GETs make one API call."""
+        client = ClozeClient(api_key="test_key", single_flight=True)
+        release = threading.Event()
+
+        def slow_request(**kwargs):
+            release.wait(5)
+            return mock_response
+
+        client.session.request = Mock(side_effect=slow_request)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(client.people.get("a@example.com"))
+            )
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        key = next(iter(client._flights._calls), None)
+        while key is None or len(client._flights._calls[key].done._cond._waiters) < 4:
+            key = next(iter(client._flights._calls), None)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert client.session.request.call_count == 1
+        assert len(results) == 5
+        shared = client.metrics.snapshot()["endpoints"]["/v1/people/get"]
+        assert shared["single_flight_shared"] == 4
+
+    def test_writes_not_coalesced(self, mock_response):
+        """Test that non-GET requests always go to the network."""
+        client = ClozeClient(api_key="test_key", single_flight=True)
+        client.session.request = Mock(return_value=mock_response)
+        client.people.create({"name": "A", "emails": [{"value": "a@example.com"}]})
+        client.people.create({"name": "A", "emails": [{"value": "a@example.com"}]})
+        assert client.session.request.call_count == 2
+
+    def test_async_client_coalesces(self):
+        """Test that concurrent identical GETs share one call on asyncio."""
+        calls = []
+
+        async def handler(request):
+            calls.append(request.url.path)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"errorcode": 0, "fields": []})
+
+        client = AsyncClozeClient(api_key="test_key", single_flight=True)
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            with deadline(5):
+                return await asyncio.gather(
+                    *(client.account.get_fields() for _ in range(3))
+                )
+
+        results = asyncio.run(run())
+        assert calls == ["/v1/user/fields"]
+        assert results[0] is results[1] is results[2]
+        snapshot = client.metrics.snapshot()
+        assert snapshot["endpoints"]["/v1/user/fields"]["single_flight_shared"] == 2
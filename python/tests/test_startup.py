@@ -0,0 +1,75 @@
+"""Unit tests for lazy imports and lazy endpoint construction."""
+
+import subprocess
+import sys
+import threading
+
+import cloze_sdk
+import pytest
+from cloze_sdk import ClozeClient
+from cloze_sdk.client import USER_AGENT, _Endpoint
+from cloze_sdk.people import People
+
+
+class TestLazyImports:
+    """Test that importing cloze_sdk defers heavy dependencies."""
+
+    def test_import_does_not_load_http_libraries(self):
+        """Test that requests and httpx are not imported with the package."""
+        code = (
+            "import sys, cloze_sdk; "
+            "print(sorted(m for m in ('requests', 'httpx', 'asyncio') if m in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout
+        assert output.strip() == "[]"
+
+    def test_async_client_loaded_on_access(self):
+        """Test that AsyncClozeClient is resolved lazily from the package."""
+        from cloze_sdk.async_client import AsyncClozeClient
+
+        assert cloze_sdk.AsyncClozeClient is AsyncClozeClient
+
+    def test_unknown_attribute(self):
+        """Test that unknown package attributes still raise AttributeError."""
+        with pytest.raises(AttributeError, match="no attribute 'Missing'"):
+            cloze_sdk.Missing
+
+
+class TestLazyEndpoints:
+    """Test endpoint namespaces built on first access."""
+
+    def test_not_built_until_accessed(self):
+        """Test that the client is created without endpoint instances."""
+        client = ClozeClient(api_key="test_key")
+        assert "people" not in vars(client)
+
+        people = client.people
+        assert isinstance(people, People)
+        assert people.client is client
+        assert client.people is people
+
+    def test_descriptor_on_class(self):
+        """Test that class attribute access returns the descriptor."""
+        assert isinstance(ClozeClient.people, _Endpoint)
+
+    def test_concurrent_first_access(self):
+        """Test that threads racing on first access share one instance."""
+        client = ClozeClient(api_key="test_key")
+        seen = []
+        threads = [
+            threading.Thread(target=lambda: seen.append(client.companies))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert all(namespace is client.companies for namespace in seen)
+
+    def test_user_agent(self):
+        """Test that the User-Agent carries the package version."""
+        client = ClozeClient(api_key="test_key")
+        assert USER_AGENT == f"cloze-sdk-python/{cloze_sdk.__version__}"
+        assert client.session.headers["User-Agent"] == USER_AGENT
@@ -0,0 +1,209 @@
+"""Unit tests for incremental parsing of list responses."""
+
+import asyncio
+import json
+import sys
+
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from cloze_sdk import AsyncClozeClient, ClozeClient, StreamedPage
+from cloze_sdk.exceptions import ClozeAPIError, ClozeRateLimitError
+
+
+FEED_BODY = json.dumps({
+    "errorcode": 0,
+    "availablecount": 3,
+    "people": [
+        {"name": "Abby Vine", "customFields": [{"id": "w", "value": 1.5}]},
+        {"name": "Grape Vine", "tags": ["a", ["b"]]},
+        "etc etc",
+    ],
+    "cursor": "next-cursor",
+}).encode()
+
+
+def chunked(body, size=7):
+    """Split a body into small chunks."""
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestStreamedPage:
+    """Test StreamedPage parsing."""
+
+    def test_yields_records_incrementally(self):
+        """Test that records are yielded before the whole body is read."""
+        chunks = chunked(FEED_BODY)
+        consumed = []
+
+        def source():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        page = StreamedPage(source())
+        iterator = iter(page)
+        first = next(iterator)
+
+        assert first["name"] == "Abby Vine"
+        assert first["customFields"][0]["value"] == 1.5
+        assert len(consumed) < len(chunks)
+        assert page.availablecount == 3
+        assert page.cursor is None
+
+        rest = list(iterator)
+        assert rest == [{"name": "Grape Vine", "tags": ["a", ["b"]]}, "etc etc"]
+        assert page.cursor == "next-cursor"
+        assert page.complete
+        assert page.fields["errorcode"] == 0
+
+    def test_results_key_and_count_only(self):
+        """Test includeauditedchanges results and countonly responses."""
+        body = json.dumps({"errorcode": 0, "results": [{"person": {"name": "B"}}]}).encode()
+        assert list(StreamedPage([body])) == [{"person": {"name": "B"}}]
+
+        page = StreamedPage([b'{"errorcode":0,"availablecount":6577}'])
+        assert list(page) == []
+        assert page.availablecount == 6577
+
+    def test_api_error_raised_after_iteration(self):
+        """Test that a non-zero errorcode is raised at the end of iteration."""
+        page = StreamedPage([b'{"errorcode":11,"message":"bad field"}'])
+        with pytest.raises(ClozeAPIError, match="bad field") as exc_info:
+            list(page)
+        assert exc_info.value.errorcode == 11
+
+    def test_invalid_json(self):
+        """Test that malformed bodies raise ClozeAPIError."""
+        with pytest.raises(ClozeAPIError, match="Invalid response format"):
+            list(StreamedPage([b"<html>"]))
+
+    def test_truncated_json(self):
+        """Test that truncated bodies raise ClozeAPIError."""
+        with pytest.raises(ClozeAPIError, match="Invalid response format"):
+            list(StreamedPage([b'{"people":[{"a":1}']))
+
+    def test_close_and_on_complete_called(self):
+        """Test that the connection is released and parse time reported."""
+        close = Mock()
+        on_complete = Mock()
+        page = StreamedPage(chunked(FEED_BODY), close=close, on_complete=on_complete)
+        list(page)
+        page.close()
+        close.assert_called_once()
+        assert on_complete.call_args[0][0] >= 0
+
+    def test_missing_ijson(self):
+        """Test that a helpful error is raised without ijson."""
+        with patch.dict(sys.modules, {"ijson": None}):
+            with pytest.raises(ImportError, match="cloze-sdk\\[streaming\\]"):
+                StreamedPage([])
+
+
+class TestEndpointStreaming:
+    """Test stream=True on find and feed endpoints."""
+
+    @pytest.mark.parametrize("namespace,method,path", [
+        ("people", "find", "/v1/people/find"),
+        ("people", "feed", "/v1/people/feed"),
+        ("companies", "find", "/v1/companies/find"),
+        ("companies", "feed", "/v1/companies/feed"),
+        ("projects", "find", "/v1/projects/find"),
+        ("projects", "feed", "/v1/projects/feed"),
+    ])
+    def test_stream_flag_routes_to_stream_request(self, mock_client, namespace, method, path):
+        """Test that stream=True uses _stream_request with the same params."""
+        endpoint = getattr(mock_client, namespace)
+        with patch.object(mock_client, "_stream_request") as mock_stream:
+            mock_stream.return_value = "page"
+            result = getattr(endpoint, method)(stream=True, segment="lead")
+        mock_stream.assert_called_once_with("GET", path, params={"segment": "lead"})
+        assert result == "page"
+
+
+@pytest.fixture
+def feed_server(local_server):
+    """Run a local server returning a feed page or an error status."""
+    def respond(request):
+        if "limited" in request.path:
+            return 429, b"", {}
+        return 200, FEED_BODY, {}
+
+    return local_server(respond)
+
+class TestClientStreaming:
+    """Test streaming through the client transports."""
+
+    @pytest.mark.parametrize("http2", [False, True])
+    def test_stream_feed(self, feed_server, http2):
+        """Test streaming a feed page over requests and httpx."""
+        client = ClozeClient(api_key="test_key", base_url=feed_server, http2=http2)
+        page = client.people.feed(stream=True)
+        names = [record if isinstance(record, str) else record["name"] for record in page]
+        assert names == ["Abby Vine", "Grape Vine", "etc etc"]
+        assert page.cursor == "next-cursor"
+        assert client.metrics.snapshot()["timers"]["decode"]["count"] == 1
+
+    def test_stream_rate_limited(self, feed_server):
+        """Test that error statuses are raised before streaming."""
+        client = ClozeClient(api_key="test_key", base_url=feed_server)
+        with pytest.raises(ClozeRateLimitError):
+            client._stream_request("GET", "/limited")
+
+    def test_stream_transport_error(self, mock_client):
+        """Test that transport errors are wrapped."""
+        import requests
+
+        mock_client.session.request.side_effect = requests.exceptions.ConnectionError("x")
+        with pytest.raises(ClozeAPIError, match="Request failed"):
+            mock_client.people.find(stream=True)
+        assert mock_client.session.request.call_args[1]["stream"] is True
+
+
+class TestAsyncClientStreaming:
+    """Test streaming with AsyncClozeClient."""
+
+    def make_client(self, response):
+        """Create an async client backed by a MockTransport."""
+        client = AsyncClozeClient(api_key="test_key")
+        client.session = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: response)
+        )
+        return client
+
+    def test_async_stream_feed(self):
+        """Test async iteration over a streamed page."""
+        client = self.make_client(httpx.Response(200, content=FEED_BODY))
+
+        async def run():
+            page = await client.companies.feed(stream=True)
+            records = [record async for record in page]
+            await page.aclose()
+            return page, records
+
+        page, records = asyncio.run(run())
+        assert len(records) == 3
+        assert page.cursor == "next-cursor"
+        assert page.availablecount == 3
+
+    def test_async_stream_error_status(self):
+        """Test that error statuses are raised before streaming."""
+        client = self.make_client(httpx.Response(401))
+        with pytest.raises(Exception) as exc_info:
+            asyncio.run(client.projects.find(stream=True))
+        assert "Authentication failed" in str(exc_info.value)
+
+    def test_async_records_completed_on_close(self):
+        """Test that records completed by the final parser flush are yielded."""
+        async def no_chunks():
+            return
+            yield  # pragma: no cover
+
+        from cloze_sdk import AsyncStreamedPage
+
+        page = AsyncStreamedPage(no_chunks())
+        with patch.object(page._parser, "close", return_value=[{"a": 1}]):
+            async def run():
+                return [record async for record in page]
+
+            assert asyncio.run(run()) == [{"a": 1}]
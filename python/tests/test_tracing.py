@@ -0,0 +1,205 @@
+"""Unit tests for OpenTelemetry tracing."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode, get_current_span
+from unittest.mock import Mock
+from cloze_sdk import (AsyncClozeClient, ClozeAPIError, ClozeClient, Middleware,
+                       trace_operation)
+from cloze_sdk import tracing
+from cloze_sdk.middleware import RequestContext
+from cloze_sdk.tracing import TracingMiddleware, get_tracer, propagate, set_tracer
+
+
+@pytest.fixture
+def exporter():
+    """Report spans to an in-memory exporter for the duration of a test."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    saved = tracing._tracer
+    set_tracer(provider.get_tracer("test"))
+    yield exporter
+    tracing._tracer = saved
+
+
+def spans_by_name(exporter):
+    """Index finished spans by name."""
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+class TestTracer:
+    """Test tracer resolution and operation spans."""
+
+    def test_default_tracer(self):
+        """Test that the global OpenTelemetry tracer is used by default."""
+        saved = tracing._tracer
+        tracing._tracer = tracing._UNSET
+        try:
+            assert get_tracer() is not None
+            assert get_tracer() is tracing._tracer
+        finally:
+            tracing._tracer = saved
+
+    def test_disabled(self):
+        """Test that operations and clients skip tracing without a tracer."""
+        saved = tracing._tracer
+        set_tracer(None)
+        try:
+            with trace_operation("sync") as span:
+                assert span is None
+            assert ClozeClient(api_key="test_key", tracing=True).middleware == []
+        finally:
+            tracing._tracer = saved
+
+    def test_operation_span(self, exporter):
+        """Test that operations open a span with their attributes."""
+        with trace_operation("crm-sync", batch=3) as span:
+            assert span.is_recording()
+        assert spans_by_name(exporter)["crm-sync"].attributes["batch"] == 3
+
+
+class TestClientTracing:
+    """Test spans for API calls."""
+
+    @pytest.fixture
+    def client(self, exporter, mock_response):
+        """Create a tracing client with a mocked session."""
+        client = ClozeClient(api_key="test_key", tracing=True)
+        mock_response.content = b'{"errorcode":0,"data":"test"}'
+        client.session.request = Mock(return_value=mock_response)
+        return client
+
+    def test_request_span(self, client, exporter):
+        """Test that a call produces a client span under the operation span."""
+        with trace_operation("lookup"):
+            client.people.get("a@example.com")
+
+        spans = spans_by_name(exporter)
+        span = spans["cloze GET /v1/people/get"]
+        assert span.parent.span_id == spans["lookup"].context.span_id
+        assert dict(span.attributes) == {
+            "http.request.method": "GET",
+            "cloze.endpoint": "/v1/people/get",
+            "cloze.attempts": 1,
+            "cloze.retries": 0,
+            "cloze.request_bytes": 0,
+            "cloze.response_bytes": 29,
+            "http.response.status_code": 200,
+        }
+
+    def test_error_span(self, client, exporter, mock_response):
+        """Test that API errors mark the span failed with the errorcode."""
+        mock_response.json.return_value = {"errorcode": 11, "message": "Bad"}
+        with pytest.raises(ClozeAPIError):
+            client.people.get("a@example.com")
+        span = spans_by_name(exporter)["cloze GET /v1/people/get"]
+        assert span.attributes["cloze.errorcode"] == 11
+        assert span.status.status_code == StatusCode.ERROR
+        assert span.events[0].name == "exception"
+
+    def test_streamed_span(self, client, exporter, mock_response):
+        """Test that a streamed call's span covers reading the page."""
+        mock_response.iter_content.return_value = [b'{"errorcode":0,"people":[1]}']
+        with trace_operation("export") as operation:
+            page = client.people.feed(stream=True)
+            # The call's span is not current while the caller iterates
+            assert get_current_span() is operation
+            assert exporter.get_finished_spans() == ()
+            assert list(page) == [1]
+        spans = spans_by_name(exporter)
+        span = spans["cloze GET /v1/people/feed"]
+        assert span.parent.span_id == spans["export"].context.span_id
+        assert span.attributes["cloze.response_bytes"] == 28
+
+        mock_response.iter_content.return_value = [b'{"errorcode":11,"people":[]}']
+        with pytest.raises(ClozeAPIError):
+            list(client.people.feed(stream=True))
+        span = exporter.get_finished_spans()[-1]
+        assert span.status.status_code == StatusCode.ERROR
+        assert span.events[0].name == "exception"
+
+    def test_failure_before_span(self, client, exporter):
+        """Test that a middleware failing before the span starts is tolerated."""
+
+        class Reject(Middleware):
+            def before_request(self, context):
+                raise ValueError("rejected")
+
+        client.middleware.insert(0, Reject())
+        with pytest.raises(ValueError):
+            client.people.get("a@example.com")
+        assert exporter.get_finished_spans() == ()
+
+    def test_pagination_span(self, client, exporter, mock_response):
+        """Test that page requests are children of one iteration span."""
+        mock_response.json.side_effect = [
+            {"errorcode": 0, "people": [{"id": 1}, {"id": 2}], "cursor": "c"},
+            {"errorcode": 0, "people": []},
+        ]
+        assert len(list(client.people.iter_feed())) == 2
+
+        spans = exporter.get_finished_spans()
+        parent = spans_by_name(exporter)["cloze paginate people"]
+        pages = [s for s in spans if s.name == "cloze GET /v1/people/feed"]
+        assert len(pages) == 2
+        assert all(s.parent.span_id == parent.context.span_id for s in pages)
+        assert (parent.attributes["cloze.pages"], parent.attributes["cloze.records"]) == (2, 2)
+
+    def test_propagate_to_threads(self, client, exporter):
+        """Test that propagate() carries the trace into worker threads."""
+        with trace_operation("bulk") as operation:
+            with ThreadPoolExecutor(4) as pool:
+                list(pool.map(propagate(client.people.get), ["a", "b", "c", "d"]))
+
+        spans = [s for s in exporter.get_finished_spans() if s.name.startswith("cloze GET")]
+        assert len(spans) == 4
+        assert {s.parent.span_id for s in spans} == {operation.get_span_context().span_id}
+
+    def test_finish_without_span(self):
+        """Test that finishing a context without a span does nothing."""
+        middleware = TracingMiddleware(Mock())
+        middleware.on_error(RequestContext("GET", "/v1/user/profile"))
+
+
+class TestAsyncClientTracing:
+    """Test spans for asyncio API calls."""
+
+    def test_tasks_share_parent(self, exporter):
+        """Test that concurrent tasks report spans under the operation span."""
+        handler = Mock(return_value=httpx.Response(200, json={"errorcode": 0, "roles": []}))
+        client = AsyncClozeClient(api_key="test_key", tracing=True)
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def run():
+            with trace_operation("roles") as operation:
+                await asyncio.gather(*(client.team.get_roles() for _ in range(3)))
+            return operation
+
+        operation = asyncio.run(run())
+        spans = [s for s in exporter.get_finished_spans() if s.name.startswith("cloze GET")]
+        assert len(spans) == 3
+        assert {s.parent.span_id for s in spans} == {operation.get_span_context().span_id}
+
+    def test_async_pagination_span(self, exporter):
+        """Test that async iteration reports one span for all pages."""
+        pages = [
+            httpx.Response(200, json={"errorcode": 0, "people": [{"id": 1}], "cursor": "c"}),
+            httpx.Response(200, json={"errorcode": 0, "people": []}),
+        ]
+        client = AsyncClozeClient(api_key="test_key", tracing=True)
+        client.session = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: pages.pop(0))
+        )
+
+        async def run():
+            return [record async for record in client.people.iter_feed()]
+
+        assert asyncio.run(run()) == [{"id": 1}]
+        assert spans_by_name(exporter)["cloze paginate people"].attributes["cloze.pages"] == 2
@@ -0,0 +1,177 @@
+"""Unit tests for HTTP transport configuration."""
+
+import asyncio
+import json
+import socket
+import sys
+import threading
+
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from cloze_sdk import AsyncClozeClient, ClozeClient
+from cloze_sdk.exceptions import ClozeAPIError
+from cloze_sdk.transport import (PoolingHTTPAdapter, create_http2_session,
+                                 keepalive_socket_options)
+from requests.adapters import HTTPAdapter
+
+
+class TestKeepaliveSocketOptions:
+    """Test TCP keep-alive socket option construction."""
+
+    def test_enables_keepalive(self):
+        """Test that SO_KEEPALIVE is always enabled."""
+        options = keepalive_socket_options(30)
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in options
+
+    def test_idle_is_at_least_one_second(self):
+        """Test that sub-second idle values are rounded up to one second."""
+        options = keepalive_socket_options(0.2)
+        assert all(value >= 1 for _, _, value in options if _ == socket.IPPROTO_TCP)
+
+
+class TestPoolingHTTPAdapter:
+    """Test PoolingHTTPAdapter pooling and accounting."""
+
+    def test_pool_configuration(self):
+        """Test that pool settings reach the pool manager."""
+        adapter = PoolingHTTPAdapter(pool_connections=4, pool_maxsize=50, pool_block=True)
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 50
+        assert adapter.poolmanager.connection_pool_kw["block"] is True
+        assert "socket_options" not in adapter.poolmanager.connection_pool_kw
+
+    def test_keepalive_socket_options_applied(self):
+        """Test that TCP keep-alive options are passed to the pool manager."""
+        adapter = PoolingHTTPAdapter(tcp_keepalive=60)
+        options = adapter.poolmanager.connection_pool_kw["socket_options"]
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in options
+
+    def test_counts_saturation(self):
+        """Test that sends beyond pool_maxsize are counted as saturated."""
+        adapter = PoolingHTTPAdapter(pool_maxsize=1)
+        release = threading.Event()
+        started = threading.Barrier(3)
+
+        def slow_send(self, request, **kwargs):
+            started.wait()
+            release.wait(5)
+            return "response"
+
+        with patch.object(HTTPAdapter, "send", slow_send):
+            threads = [
+                threading.Thread(target=adapter.send, args=(Mock(),)) for _ in range(2)
+            ]
+            for t in threads:
+                t.start()
+            started.wait()
+            assert adapter.stats()["in_flight"] == 2
+            release.set()
+            for t in threads:
+                t.join()
+
+        stats = adapter.stats()
+        assert stats["in_flight"] == 0
+        assert stats["peak_in_flight"] == 2
+        assert stats["saturated"] == 1
+        assert stats["pool_maxsize"] == 1
+        assert stats["pool_block"] is False
+
+    def test_in_flight_released_on_error(self):
+        """Test that failed sends are no longer counted as in flight."""
+        adapter = PoolingHTTPAdapter()
+        with patch.object(HTTPAdapter, "send", side_effect=OSError("boom")):
+            try:
+                adapter.send(Mock())
+            except OSError:
+                pass
+        assert adapter.stats()["in_flight"] == 0
+
+
+class TestClientPooling:
+    """Test pooling options on ClozeClient."""
+
+    def test_default_adapter_mounted(self):
+        """Test that the pooling adapter handles both schemes."""
+        client = ClozeClient(api_key="test_key")
+        assert client.session.get_adapter("https://api.cloze.com") is client._adapter
+        assert client.session.get_adapter("http://localhost") is client._adapter
+        assert client.pool_stats()["pool_maxsize"] == 10
+
+    def test_custom_pool_settings(self):
+        """Test that pool settings are passed through from the client."""
+        client = ClozeClient(
+            api_key="test_key", pool_maxsize=64, pool_block=True, tcp_keepalive=30
+        )
+        stats = client.pool_stats()
+        assert stats["pool_maxsize"] == 64
+        assert stats["pool_block"] is True
+        assert client._adapter.tcp_keepalive == 30
+
+
+class TestHTTP2Transport:
+    """Test the optional HTTP/2 transport."""
+
+    @pytest.fixture
+    def http11_server(self, local_server):
+        """Run a local HTTP/1.1-only JSON server."""
+        def respond(request):
+            return 200, {"errorcode": 0, "path": request.path}, {}
+
+        return local_server(respond)
+
+    def test_missing_dependencies(self):
+        """Test that a helpful error is raised without h2."""
+        with patch.dict(sys.modules, {"h2": None}):
+            with pytest.raises(ImportError, match="cloze-sdk\\[http2\\]"):
+                create_http2_session({}, 10, 10)
+
+    def test_sync_client_uses_http2_session(self):
+        """Test that the sync client builds an HTTP/2-enabled httpx client."""
+        client = ClozeClient(api_key="test_key", http2=True, pool_maxsize=4)
+        assert isinstance(client.session, httpx.Client)
+        assert client.session._transport._pool._http2 is True
+        assert client.session.headers["Authorization"] == "Bearer test_key"
+        assert client.pool_stats() == {}
+        client.session.close()
+
+    def test_http2_pool_settings(self):
+        """Test that pool settings map to httpx limits and socket options."""
+        client = ClozeClient(api_key="test_key", http2=True, pool_maxsize=4)
+        pool = client.session._transport._pool
+        assert (pool._max_connections, pool._max_keepalive_connections) == (
+            sys.maxsize,
+            4,
+        )
+        assert pool._socket_options is None
+
+        client = ClozeClient(
+            api_key="test_key", http2=True, pool_maxsize=4, pool_block=True, tcp_keepalive=30
+        )
+        pool = client.session._transport._pool
+        assert (pool._max_connections, pool._max_keepalive_connections) == (4, 4)
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in pool._socket_options
+
+        with pytest.raises(ValueError, match="pool_connections"):
+            ClozeClient(api_key="test_key", http2=True, pool_connections=4)
+
+    def test_async_client_uses_http2_session(self):
+        """Test that the async client builds an HTTP/2-enabled httpx client."""
+        client = AsyncClozeClient(api_key="test_key", http2=True)
+        assert isinstance(client.session, httpx.AsyncClient)
+        assert client.session._transport._pool._http2 is True
+        asyncio.run(client.aclose())
+
+    def test_falls_back_to_http11(self, http11_server):
+        """Test that requests succeed against a server without HTTP/2."""
+        client = ClozeClient(api_key="test_key", http2=True, base_url=http11_server)
+        result = client._make_request("GET", "/v1/user/profile")
+        assert result == {"errorcode": 0, "path": "/v1/user/profile"}
+        client.session.close()
+
+    def test_transport_errors_wrapped(self):
+        """Test that httpx errors become ClozeAPIError."""
+        client = ClozeClient(api_key="test_key", http2=True)
+        client.session = Mock()
+        client.session.request.side_effect = httpx.ConnectError("refused")
+        with pytest.raises(ClozeAPIError, match="Request failed"):
+            client._make_request("GET", "/v1/user/profile")